@@ -2,14 +2,16 @@
 Main - Ponto de entrada do compilador
 """
 
+import argparse
 import sys
 import os
-from src.lexer import Lexer
-from src.parser import Parser, SyntaxError
 
 
 def compile_file(filepath):
     """Compila um arquivo"""
+    from src.lexer import Lexer
+    from src.parser import Parser, SyntaxError
+
     print(f"{'='*60}")
     print(f"Compilador MiniLanguage")
     print(f"{'='*60}")
@@ -80,13 +82,411 @@ def compile_file(filepath):
         return False
 
 
+def load_program(arquivos, build_dir=None, instrumentar=False, otimizar=False):
+    """Compila e liga os arquivos (unidades) num único programa, ou carrega um .mcb"""
+    if is_binary(arquivos) and not instrumentar:
+        from src.binario import carregar
+        return carregar(arquivos[0])
+
+    from src.ligador import Construtor, compilar_e_ligar
+
+    if build_dir:
+        return Construtor(build_dir, instrumentar, otimizar).construir(arquivos)
+    fontes = []
+    for arquivo in arquivos:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            fontes.append((arquivo, f.read()))
+    return compilar_e_ligar(fontes, instrumentar, otimizar)
+
+
+def run_program(arquivos, build_dir=None, input_path=None, output_path=None,
+                checkpoint=None, checkpoint_every=None, resume=False, jit=True, coverage=None,
+                otimizar=False):
+    """Executa o programa formado pelos arquivos; read() consome a entrada padrão"""
+    import signal
+    from contextlib import ExitStack
+    from src.maquina import MaquinaVirtual, EntradaArquivo, SaidaArquivo, ExecutionError, Estado
+    from src.checkpoint import Checkpoints, CheckpointError, carregar
+    from src.binario import FormatError
+    from src.cobertura import CoverageError, mesclar
+
+    erros = (ExecutionError, CheckpointError, FormatError, CoverageError)
+    if not is_binary(arquivos) or coverage:
+        erros += compile_errors()
+    maquina = None
+    # --input/--output abertos aqui são fechados ao sair, com ou sem erro
+    abertos = ExitStack()
+    try:
+        programa = load_program(arquivos, build_dir, instrumentar=bool(coverage), otimizar=otimizar)
+        retomar = bool(resume and checkpoint and os.path.exists(checkpoint))
+        if input_path:
+            arquivo_entrada = abertos.enter_context(open(input_path, 'rb'))
+        else:
+            arquivo_entrada = sys.stdin.buffer
+        if output_path:
+            modo = 'r+' if retomar and os.path.exists(output_path) else 'w'
+            arquivo_saida = abertos.enter_context(
+                open(output_path, modo, encoding='utf-8', newline=''))
+        else:
+            arquivo_saida = sys.stdout
+        entrada, saida = EntradaArquivo(arquivo_entrada), SaidaArquivo(arquivo_saida)
+
+        if retomar:
+            maquina = carregar(programa, checkpoint, entrada, saida)
+            maquina.compilar = jit
+            print(f"↻ Retomando de {checkpoint} ({maquina.instrucoes} instruções)", file=sys.stderr)
+        else:
+            maquina = MaquinaVirtual(programa, entrada, saida, compilar=jit)
+
+        if checkpoint:
+            execucao = Checkpoints(maquina, checkpoint, checkpoint_every)
+            # SIGUSR1 grava um checkpoint; SIGINT/SIGTERM gravam e encerram
+            signal.signal(signal.SIGUSR1, lambda *_: execucao.pedir())
+            signal.signal(signal.SIGINT, lambda *_: execucao.pedir(parar=True))
+            signal.signal(signal.SIGTERM, lambda *_: execucao.pedir(parar=True))
+            estado = execucao.executar()
+        else:
+            estado = maquina.executar()
+        saida.flush()
+
+        if estado != Estado.FINALIZADO:
+            print(f"⏸ Execução interrompida; checkpoint em {checkpoint}", file=sys.stderr)
+            return False
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        return True
+
+    except FileNotFoundError as e:
+        print(f"✗ Erro: Arquivo '{e.filename}' não encontrado", file=sys.stderr)
+    except erros as e:
+        print(f"✗ {e}", file=sys.stderr)
+    finally:
+        # A cobertura de execuções com erro também conta
+        if coverage and maquina is not None:
+            try:
+                mesclar(coverage, programa, maquina.cobertura)
+            except CoverageError as e:
+                print(f"✗ {e}", file=sys.stderr)
+        abertos.close()
+    return False
+
+
+def run_prefork(arquivos, alvo_entradas, build_dir=None, jobs=None, jit=True, otimizar=False):
+    """Executa o programa para cada entrada do glob em processos pré-carregados (JSON lines)"""
+    import glob
+    import json
+    from src.maquina import Estado
+    from src.binario import FormatError
+    from src.prefork import PoolPreFork
+
+    erros = (FormatError,) if is_binary(arquivos) else (FormatError,) + compile_errors()
+    try:
+        # Só a imagem fica referenciada: as listas do programa ligado são liberadas antes do fork
+        pool = PoolPreFork(load_program(arquivos, build_dir, otimizar=otimizar),
+                           processos=jobs, jit=jit)
+    except FileNotFoundError as e:
+        print(f"✗ Erro: Arquivo '{e.filename}' não encontrado", file=sys.stderr)
+        return False
+    except erros as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return False
+
+    entradas = (caminho for caminho in sorted(glob.iglob(alvo_entradas))
+                if os.path.isfile(caminho) and not caminho.endswith(PoolPreFork.EXTENSAO_SAIDA))
+    execucoes = falhas = 0
+    for resultado in pool.executar(entradas):
+        execucoes += 1
+        if resultado["estado"] != Estado.FINALIZADO:
+            falhas += 1
+        print(json.dumps(resultado, ensure_ascii=False))
+    print(json.dumps({"resumo": {"execucoes": execucoes, "falhas": falhas,
+                                 "trabalhadores": pool.trabalhadores,
+                                 "memoria": pool.resumo_memoria()}}, ensure_ascii=False))
+    return execucoes > 0 and falhas == 0
+
+
+def coverage_report(caminho, arquivos, build_dir=None):
+    """Relatório por linha da cobertura acumulada em 'caminho'"""
+    from src.cobertura import CoverageError, carregar, relatorio, formatar
+
+    try:
+        programa = load_program(arquivos, build_dir, instrumentar=True)
+        print(formatar(relatorio(programa, carregar(caminho, programa))))
+    except FileNotFoundError as e:
+        print(f"✗ Erro: Arquivo '{e.filename}' não encontrado", file=sys.stderr)
+        return False
+    except (CoverageError,) + compile_errors() as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def emit_program(arquivos, destino, build_dir=None, otimizar=False):
+    """Compila e liga os arquivos e grava o programa no formato binário .mcb"""
+    from src.binario import salvar, EXTENSAO
+
+    if destino is True:
+        destino = os.path.splitext(arquivos[0])[0] + EXTENSAO
+    try:
+        programa = load_program(arquivos, build_dir, otimizar=otimizar)
+        salvar(programa, destino)
+    except FileNotFoundError as e:
+        print(f"✗ Erro: Arquivo '{e.filename}' não encontrado", file=sys.stderr)
+        return False
+    except compile_errors() as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return False
+    print(f"✓ {destino} ({len(programa)} instruções, {os.path.getsize(destino)} bytes)")
+    return True
+
+
+def analyze_program(arquivos):
+    """Resumo da análise de intervalos de cada arquivo: o que -O elimina (JSON lines)"""
+    import json
+    from src.lexer import Lexer
+    from src.parser import Parser
+    from src.analise import analisar
+
+    sucesso = True
+    for arquivo in arquivos:
+        try:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                arvore = Parser(Lexer(f.read()).tokenize()).parse()
+        except FileNotFoundError as e:
+            print(f"✗ Erro: Arquivo '{e.filename}' não encontrado", file=sys.stderr)
+            sucesso = False
+            continue
+        except compile_errors() as e:
+            print(f"✗ {arquivo}: {e}", file=sys.stderr)
+            sucesso = False
+            continue
+        print(json.dumps({"arquivo": arquivo, **analisar(arvore).resumo()}, ensure_ascii=False))
+    return sucesso
+
+
+def specialize_program(arquivo, valores, destino=None, orcamento=None):
+    """Avalia parcialmente o programa com os primeiros valores de read() conhecidos"""
+    from src.lexer import Lexer
+    from src.parser import Parser
+    from src.especializador import especializar, gerar_fonte
+
+    entradas = valores.split()
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            arvore = Parser(Lexer(f.read()).tokenize()).parse()
+        residual, consumidos = especializar(arvore, entradas, orcamento)
+    except FileNotFoundError as e:
+        print(f"✗ Erro: Arquivo '{e.filename}' não encontrado", file=sys.stderr)
+        return False
+    except compile_errors() as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return False
+    fonte = gerar_fonte(residual)
+    if destino:
+        with open(destino, 'w', encoding='utf-8') as f:
+            f.write(fonte)
+    else:
+        sys.stdout.write(fonte)
+    print(f"✓ {consumidos} de {len(entradas)} valores de entrada incorporados ao programa",
+          file=sys.stderr)
+    return True
+
+
+def is_binary(arquivos):
+    """Um único programa já compilado (.mcb)?"""
+    return len(arquivos) == 1 and arquivos[0].endswith(".mcb")
+
+
+def compile_errors():
+    """Exceções de compilação e ligação (importa o compilador)"""
+    import builtins
+    from src.parser import SyntaxError
+    from src.gerador import SemanticError
+    from src.ligador import LinkError, BuildError
+
+    return (SyntaxError, builtins.SyntaxError, SemanticError, LinkError, BuildError)
+
+
+def batch_compile(alvo, jobs, fail_fast, executor="auto"):
+    """Compila em lote, emitindo uma linha JSON por arquivo"""
+    from src.lote import compilar_lote
+
+    resumo = compilar_lote(alvo, processos=jobs, parar_no_erro=fail_fast, saida=sys.stdout,
+                           executor=executor)
+    return resumo["arquivos"] > 0 and resumo["falhas"] == 0
+
+
+def index_add(banco, alvo, jobs):
+    """Acrescenta ao índice de similaridade os arquivos novos ou alterados de 'alvo'"""
+    import json
+    from src.similaridade import IndiceSimilaridade, SimilarityError
+
+    try:
+        with IndiceSimilaridade(banco) as indice:
+            resumo = indice.adicionar(alvo, processos=jobs)
+    except SimilarityError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return False
+    print(json.dumps({"resumo": resumo}, ensure_ascii=False))
+    return True
+
+
+def find_similar(banco, arquivos, top):
+    """Os arquivos indexados mais parecidos com cada arquivo informado (JSON lines)"""
+    import json
+    import builtins
+    from src.similaridade import IndiceSimilaridade, SimilarityError
+
+    sucesso = True
+    try:
+        with IndiceSimilaridade(banco) as indice:
+            for arquivo in arquivos:
+                try:
+                    similares = indice.consultar_arquivo(arquivo, top)
+                except (OSError, builtins.SyntaxError) as e:
+                    print(f"✗ {arquivo}: {e}", file=sys.stderr)
+                    sucesso = False
+                    continue
+                print(json.dumps({"arquivo": arquivo, "similares": similares},
+                                 ensure_ascii=False))
+    except SimilarityError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return False
+    return sucesso
+
+
+def serve(caminho_socket, tempo_ocioso):
+    """Executa o daemon de compilação no socket Unix informado"""
+    from src.servidor import servir
+
+    servir(caminho_socket, tempo_ocioso)
+    return True
+
+
+def connect(caminho_socket, arquivos, stats):
+    """Compila arquivos através de um daemon já em execução"""
+    import json
+    from src.cliente import ClienteCompilacao
+
+    sucesso = True
+    with ClienteCompilacao(caminho_socket) as cliente:
+        for arquivo in arquivos:
+            resultado = cliente.compilar_arquivo(arquivo)
+            sucesso = sucesso and resultado["ok"]
+            print(json.dumps(resultado, ensure_ascii=False))
+        if stats:
+            print(json.dumps({"stats": cliente.estatisticas()}, ensure_ascii=False))
+    return sucesso
+
+
 def main():
-    if len(sys.argv) > 1:
-        arquivo = sys.argv[1]
+    cli = argparse.ArgumentParser(description="Compilador MiniLanguage")
+    cli.add_argument("arquivos", nargs="*", metavar="arquivo",
+                     help="arquivo(s) .mc a compilar (padrão: tests/programa_ckp2_sexta.mc)")
+    cli.add_argument("--batch", metavar="DIR_OU_GLOB",
+                     help="compila todos os .mc de um diretório ou glob (saída em JSON lines)")
+    cli.add_argument("-j", "--jobs", type=int, default=None,
+                     help="número de processos no modo --batch, em --index-add "
+                          "e em --run --inputs "
+                          "(padrão: núcleos da CPU)")
+    cli.add_argument("--executor", choices=("auto", "threads", "processes"), default="auto",
+                     help="no modo --batch, trabalhadores em threads ou processos (padrão: "
+                          "auto, threads só no Python sem GIL)")
+    cli.add_argument("--fail-fast", action="store_true",
+                     help="no modo --batch, interrompe na primeira falha")
+    cli.add_argument("--index", metavar="BANCO",
+                     help="índice de similaridade (SQLite) usado por --index-add e --similar")
+    cli.add_argument("--index-add", metavar="DIR_OU_GLOB",
+                     help="acrescenta ao índice os .mc novos ou alterados (em paralelo, com -j)")
+    cli.add_argument("--similar", action="store_true",
+                     help="lista os programas indexados mais parecidos com cada arquivo")
+    cli.add_argument("--top", type=int, default=10, metavar="K",
+                     help="com --similar, quantos resultados por arquivo (padrão: 10)")
+    cli.add_argument("--run", action="store_true",
+                     help="liga os arquivos num programa (ou carrega um .mcb) e o executa; "
+                          "read() lê a entrada padrão")
+    cli.add_argument("--inputs", metavar="GLOB",
+                     help="com --run, executa o programa uma vez para cada arquivo do glob, "
+                          "em -j processos criados com fork (saída em '<entrada>.out')")
+    cli.add_argument("--build-dir", metavar="DIR",
+                     help="com --run ou --emit, cache de objetos para recompilar só o que mudou")
+    cli.add_argument("--emit", nargs="?", const=True, metavar="SAIDA.mcb",
+                     help="compila e liga os arquivos e grava o programa binário "
+                          "(padrão: nome do primeiro arquivo com extensão .mcb)")
+    cli.add_argument("-O", "--optimize", action="store_true",
+                     help="com --run, --inputs ou --emit, usa a análise de intervalos para "
+                          "tirar verificações de divisão por zero e de tipo que nunca falham "
+                          "e desvios de condição constante")
+    cli.add_argument("--analyze", action="store_true",
+                     help="exibe o resumo da análise de intervalos de cada arquivo "
+                          "(o que -O elimina, em JSON lines)")
+    cli.add_argument("--specialize", metavar="VALORES",
+                     help="gera o programa residual para os primeiros valores de read() "
+                          "(separados por espaço); o resto da entrada é lido na execução")
+    cli.add_argument("--unroll-budget", type=int, metavar="N",
+                     help="com --specialize, máximo de comandos gerados ao desenrolar um while "
+                          "(padrão: 1000)")
+    cli.add_argument("--input", metavar="ARQUIVO",
+                     help="com --run, lê os valores de read() deste arquivo em vez da entrada padrão")
+    cli.add_argument("--output", metavar="ARQUIVO",
+                     help="com --run, escreve a saída de console.log neste arquivo; "
+                          "com --specialize, grava nele o programa residual")
+    cli.add_argument("--checkpoint", metavar="ARQUIVO",
+                     help="com --run, grava o estado da execução neste arquivo "
+                          "(SIGUSR1 grava; SIGINT/SIGTERM gravam e encerram)")
+    cli.add_argument("--checkpoint-every", type=int, metavar="N",
+                     help="com --checkpoint, grava automaticamente a cada N instruções")
+    cli.add_argument("--resume", action="store_true",
+                     help="com --checkpoint, retoma a execução do checkpoint, se existir")
+    cli.add_argument("--no-jit", action="store_true",
+                     help="com --run, não compila laços quentes (só o interpretador)")
+    cli.add_argument("--coverage", metavar="ARQUIVO",
+                     help="com --run, instrumenta o programa e acumula a cobertura neste arquivo")
+    cli.add_argument("--coverage-report", metavar="ARQUIVO",
+                     help="exibe, por linha, a cobertura acumulada para os arquivos informados")
+    cli.add_argument("--serve", metavar="SOCKET",
+                     help="inicia o daemon de compilação no socket Unix informado")
+    cli.add_argument("--idle-timeout", type=float, default=600.0, metavar="SEGUNDOS",
+                     help="encerra o daemon após esse tempo sem pedidos (padrão: 600)")
+    cli.add_argument("--connect", metavar="SOCKET",
+                     help="compila os arquivos através de um daemon já em execução")
+    cli.add_argument("--stats", action="store_true",
+                     help="com --connect, exibe as estatísticas do daemon")
+    args = cli.parse_args()
+    arquivos = args.arquivos or ["tests/programa_ckp2_sexta.mc"]
+
+    if args.batch:
+        sucesso = batch_compile(args.batch, args.jobs, args.fail_fast, args.executor)
+    elif args.index_add or args.similar:
+        if not args.index:
+            cli.error("--index-add e --similar exigem --index BANCO")
+        if args.similar and not args.arquivos:
+            cli.error("--similar exige ao menos um arquivo para consultar")
+        sucesso = (index_add(args.index, args.index_add, args.jobs) if args.index_add
+                   else find_similar(args.index, args.arquivos, args.top))
+    elif args.coverage_report:
+        sucesso = coverage_report(args.coverage_report, arquivos, args.build_dir)
+    elif args.specialize is not None:
+        sucesso = specialize_program(arquivos[0], args.specialize, args.output, args.unroll_budget)
+    elif args.analyze:
+        sucesso = analyze_program(arquivos)
+    elif args.emit:
+        sucesso = emit_program(arquivos, args.emit, args.build_dir, args.optimize)
+    elif args.run and args.inputs:
+        sucesso = run_prefork(arquivos, args.inputs, args.build_dir, args.jobs, not args.no_jit,
+                              args.optimize)
+    elif args.run:
+        sucesso = run_program(arquivos, args.build_dir, args.input, args.output,
+                              args.checkpoint, args.checkpoint_every, args.resume,
+                              not args.no_jit, args.coverage, args.optimize)
+    elif args.serve:
+        sucesso = serve(args.serve, args.idle_timeout)
+    elif args.connect:
+        sucesso = connect(args.connect, args.arquivos, args.stats)
     else:
-        arquivo = "tests/programa_ckp2_sexta.mc"
+        sucesso = all([compile_file(arquivo) for arquivo in arquivos])
 
-    if compile_file(arquivo):
+    if sucesso:
         sys.exit(0)
     else:
         sys.exit(1)
@@ -1,6 +1,28 @@
 # Package SRC
-from .token_types import Token, TokenType
-from .lexer import Lexer
-from .parser import Parser, SyntaxError
+# Os nomes são importados sob demanda (PEP 562): executar um programa .mcb
+# não carrega o lexer nem o parser
 
-__all__ = ['Token', 'TokenType', 'Lexer', 'Parser', 'SyntaxError']
+_MODULOS = {
+    'Token': 'token_types', 'TokenType': 'token_types',
+    'Lexer': 'lexer',
+    'Parser': 'parser', 'SyntaxError': 'parser', 'ParserEventos': 'eventos',
+    'GeradorCodigo': 'gerador', 'SemanticError': 'gerador', 'compilar_programa': 'gerador',
+    'MaquinaVirtual': 'maquina', 'ExecutionError': 'maquina',
+}
+
+__all__ = ['Token', 'TokenType', 'Lexer', 'Parser', 'SyntaxError', 'ParserEventos',
+           'GeradorCodigo', 'SemanticError', 'compilar_programa',
+           'MaquinaVirtual', 'ExecutionError']
+
+
+def __getattr__(nome):
+    if nome not in _MODULOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    from importlib import import_module
+    valor = getattr(import_module(f".{_MODULOS[nome]}", __name__), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,642 @@
+"""
+Análise - Interpretação abstrata de intervalos sobre a árvore sintática
+Cada variável é aproximada por um intervalo [mínimo, máximo] (que dá também o
+sinal) com o tipo, number ou float, propagado pelos comandos de cada função;
+na cabeça de um while os intervalos são alargados até estabilizar. O resultado
+prova divisores que nunca são zero, atribuições que não precisam de conversão
+e condições de valor conhecido, que o gerador troca por instruções sem
+verificação (ver GeradorCodigo com 'otimizar')
+"""
+
+import math
+import sys
+
+from .arvore import (Atribuicao, Chamada, Leitura, Escrita, Condicional, Repeticao, Bloco,
+                     Binaria, Numero, Variavel)
+from .maquina import dividir_inteiros
+
+
+INF = math.inf
+
+RELACIONAIS = ("LT", "GT", "LTE", "GTE", "EQ", "NEQ")
+ARITMETICOS = ("PLUS", "MINUS", "MULT", "DIV", "MOD")
+# Relacional equivalente com os lados trocados, e a negação de cada um
+TROCADO = {"LT": "GT", "GT": "LT", "LTE": "GTE", "GTE": "LTE", "EQ": "EQ", "NEQ": "NEQ"}
+NEGADO = {"LT": "GTE", "GTE": "LT", "GT": "LTE", "LTE": "GT", "EQ": "NEQ", "NEQ": "EQ"}
+
+# O que foi provado sobre uma divisão (quanto maior, menos verificações)
+NAO_VERIFICADA = 0
+DIVISOR_NAO_NULO = 1      # DIV_NC / MOD_NC: sem o teste de divisão por zero
+MESMO_SINAL = 2           # IDIV / IMOD: inteiros de mesmo sinal, // e % do Python bastam
+
+# Voltas de um while calculadas exatamente antes de alargar a cabeça
+ATRASO_ALARGAMENTO = 3
+
+# Inteiros até aqui viram float sem OverflowError
+MAIOR_REAL = int(sys.float_info.max)
+
+
+class Intervalo:
+    """
+    Valores possíveis de uma expressão: de 'minimo' a 'maximo' (-inf e inf
+    quando não há limite), se são float ('real') e, em floats, se podem ser
+    NaN. Em inteiros os infinitos só indicam ausência de limite; em floats o
+    próprio infinito pode ser um dos valores.
+    """
+    __slots__ = ('minimo', 'maximo', 'real', 'nan')
+
+    def __init__(self, minimo, maximo, real=False, nan=False):
+        self.minimo = minimo
+        self.maximo = maximo
+        self.real = real
+        self.nan = nan
+
+    @classmethod
+    def qualquer(cls, real):
+        return cls(-INF, INF, real, real)
+
+    @classmethod
+    def constante(cls, valor):
+        if type(valor) is float:
+            if math.isnan(valor):
+                return cls.qualquer(True)
+            return cls(valor, valor, True)
+        return cls(valor, valor)
+
+    def __repr__(self):
+        nan = " ou NaN" if self.nan else ""
+        return f"[{self.minimo!r}, {self.maximo!r}]{nan}"
+
+    def contem_zero(self):
+        return self.minimo <= 0 <= self.maximo
+
+    def ilimitado(self):
+        return self.minimo == -INF or self.maximo == INF
+
+    def como_real(self):
+        """O intervalo depois da conversão para float (operação com um float)"""
+        if self.real:
+            return self
+        return Intervalo(_real(self.minimo, False), _real(self.maximo, True), True)
+
+    def juntar(self, outro):
+        return Intervalo(min(self.minimo, outro.minimo), max(self.maximo, outro.maximo),
+                         self.real, self.nan or outro.nan)
+
+    def alargar(self, novo):
+        """Limites que ainda crescem vão direto ao infinito (garante o ponto fixo)"""
+        return Intervalo(self.minimo if novo.minimo >= self.minimo else -INF,
+                         self.maximo if novo.maximo <= self.maximo else INF,
+                         self.real, self.nan or novo.nan)
+
+    def contido(self, outro):
+        return (outro.minimo <= self.minimo and self.maximo <= outro.maximo
+                and (outro.nan or not self.nan))
+
+
+def _real(valor, para_cima):
+    """Limite como float, arredondado para fora quando a conversão não é exata"""
+    try:
+        limite = float(valor)
+    except OverflowError:
+        return INF if valor > 0 else -INF
+    if type(valor) is int and limite != valor:
+        limite = math.nextafter(limite, INF if para_cima else -INF)
+    return limite
+
+
+def _truncar(valor):
+    """int() de um limite float (os infinitos continuam sem limite)"""
+    return valor if math.isinf(valor) else int(valor)
+
+
+def converter(valor, real):
+    """Intervalo depois do STORE numa variável do tipo indicado"""
+    if valor.real == real:
+        return valor
+    if real:
+        return valor.como_real()
+    # int() de NaN ou infinito é erro na máquina: esses valores não passam
+    return Intervalo(_truncar(valor.minimo), _truncar(valor.maximo))
+
+
+def verdade(valor):
+    """True/False se o valor, como condição, é sempre verdadeiro/falso"""
+    if not valor.contem_zero():
+        return True         # NaN também é verdadeiro
+    if valor.minimo == valor.maximo == 0 and not valor.nan:
+        return False
+    return None
+
+
+def comparar(operador, a, b):
+    """True/False se a comparação tem sempre o mesmo resultado, senão None"""
+    if operador == "LT":
+        sempre, nunca = a.maximo < b.minimo, a.minimo >= b.maximo
+    elif operador == "GT":
+        sempre, nunca = a.minimo > b.maximo, a.maximo <= b.minimo
+    elif operador == "LTE":
+        sempre, nunca = a.maximo <= b.minimo, a.minimo > b.maximo
+    elif operador == "GTE":
+        sempre, nunca = a.minimo >= b.maximo, a.maximo < b.minimo
+    else:
+        iguais = a.minimo == a.maximo == b.minimo == b.maximo
+        distintos = a.maximo < b.minimo or b.maximo < a.minimo
+        sempre, nunca = (iguais, distintos) if operador == "EQ" else (distintos, iguais)
+    # Comparações com NaN são falsas (exceto !=, sempre verdadeira)
+    if a.nan or b.nan:
+        if operador == "NEQ":
+            nunca = False
+        else:
+            sempre = False
+    return True if sempre else False if nunca else None
+
+
+def _booleano(decisao):
+    if decisao is None:
+        return Intervalo(0, 1)
+    return Intervalo.constante(1 if decisao else 0)
+
+
+def _cantos(funcao, a, b, real):
+    """Menor e maior valor de funcao(x, y) nos extremos dos dois intervalos"""
+    valores = [funcao(x, y) for x in (a.minimo, a.maximo) for y in (b.minimo, b.maximo)]
+    if any(valor is None or valor != valor for valor in valores):
+        return Intervalo.qualquer(real)
+    return Intervalo(min(valores), max(valores), real)
+
+
+def _multiplicar(x, y):
+    """Produto de limites inteiros: zero vezes um lado sem limite é zero"""
+    if x == 0 or y == 0:
+        return 0
+    return x * y
+
+
+def _dividir_inteiros(x, y):
+    infinito_x, infinito_y = math.isinf(x), math.isinf(y)
+    if infinito_y:
+        return None if infinito_x else 0
+    if infinito_x:
+        return x if y > 0 else -x
+    return dividir_inteiros(x, y)
+
+
+def operar(operador, a, b):
+    """Intervalo do resultado de 'a operador b' com a semântica da máquina"""
+    if operador in RELACIONAIS:
+        return _booleano(comparar(operador, a, b))
+    if operador in ("AND", "OR"):
+        x, y = verdade(a), verdade(b)
+        if operador == "AND":
+            decisao = False if False in (x, y) else True if x and y else None
+        else:
+            decisao = True if True in (x, y) else False if x is False and y is False else None
+        return _booleano(decisao)
+
+    real = a.real or b.real
+    if real:
+        a, b = a.como_real(), b.como_real()
+    if operador == "PLUS":
+        resultado = _cantos(lambda x, y: x + y, a, b, real)
+    elif operador == "MINUS":
+        resultado = _cantos(lambda x, y: x - y, a, b, real)
+    elif operador == "MULT":
+        resultado = _cantos(_multiplicar if not real else lambda x, y: x * y, a, b, real)
+    elif operador == "DIV":
+        resultado = _divisao(a, b, real)
+    else:
+        resultado = _resto(a, b, real)
+    if real:
+        resultado.nan = resultado.nan or a.nan or b.nan or _gera_nan(operador, a, b)
+    return resultado
+
+
+def _gera_nan(operador, a, b):
+    """inf - inf, 0 * inf e inf / inf dão NaN"""
+    if operador == "PLUS":
+        return a.maximo == INF and b.minimo == -INF or a.minimo == -INF and b.maximo == INF
+    if operador == "MINUS":
+        return a.maximo == INF and b.maximo == INF or a.minimo == -INF and b.minimo == -INF
+    if operador == "MULT":
+        return a.contem_zero() and b.ilimitado() or b.contem_zero() and a.ilimitado()
+    return operador == "DIV" and a.ilimitado() and b.ilimitado()
+
+
+def _divisao(a, b, real):
+    if real:
+        if b.contem_zero():
+            return Intervalo.qualquer(True)
+        return _cantos(lambda x, y: x / y, a, b, True)
+    # Só os divisores diferentes de zero chegam ao resultado
+    partes = [Intervalo(minimo, maximo) for minimo, maximo in
+              ((b.minimo, min(b.maximo, -1)), (max(b.minimo, 1), b.maximo)) if minimo <= maximo]
+    if not partes:
+        return Intervalo.qualquer(False)
+    resultado = _cantos(_dividir_inteiros, a, partes[0], False)
+    for parte in partes[1:]:
+        resultado = resultado.juntar(_cantos(_dividir_inteiros, a, parte, False))
+    return resultado
+
+
+def _resto(a, b, real):
+    """O resto tem o sinal do dividendo e é menor que o divisor em módulo"""
+    limite = max(abs(b.minimo), abs(b.maximo))
+    if not real:
+        if not limite:
+            return Intervalo.qualquer(False)
+        limite -= 1
+    zero = 0.0 if real else 0
+    minimo = zero if a.minimo >= 0 else max(a.minimo, -limite)
+    maximo = zero if a.maximo <= 0 else min(a.maximo, limite)
+    return Intervalo(minimo, maximo, real)
+
+
+def _abaixo(limite, real, estrito):
+    """Maior valor do tipo que é < (ou <=) limite"""
+    if real:
+        teto = _real(limite, True)
+        return math.nextafter(teto, -INF) if estrito else teto
+    if math.isinf(limite):
+        return limite
+    return math.ceil(limite) - 1 if estrito else math.floor(limite)
+
+
+def _acima(limite, real, estrito):
+    """Menor valor do tipo que é > (ou >=) limite"""
+    if real:
+        piso = _real(limite, False)
+        return math.nextafter(piso, INF) if estrito else piso
+    if math.isinf(limite):
+        return limite
+    return math.floor(limite) + 1 if estrito else math.ceil(limite)
+
+
+def restringir(atual, operador, limite):
+    """O intervalo de x sabendo que 'x operador limite' é verdadeiro (None: impossível)"""
+    real = atual.real
+    minimo, maximo = atual.minimo, atual.maximo
+    if operador in ("LT", "LTE", "EQ"):
+        maximo = min(maximo, _abaixo(limite.maximo, real, operador == "LT"))
+    if operador in ("GT", "GTE", "EQ"):
+        minimo = max(minimo, _acima(limite.minimo, real, operador == "GT"))
+    if operador == "NEQ" and limite.minimo == limite.maximo and not limite.nan:
+        if minimo == limite.minimo:
+            minimo = _acima(minimo, real, True)
+        if maximo == limite.maximo:
+            maximo = _abaixo(maximo, real, True)
+    if minimo > maximo or (not real and (minimo == INF or maximo == -INF)):
+        return None
+    # Só != é verdadeiro com NaN
+    return Intervalo(minimo, maximo, real, atual.nan and operador == "NEQ")
+
+
+def juntar(a, b):
+    """União de dois estados (None é um ponto inalcançável)"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return {nome: a[nome].juntar(b[nome]) for nome in a}
+
+
+def _alargar(cabeca, nova):
+    if cabeca is None:
+        return nova
+    return {nome: cabeca[nome].alargar(nova[nome]) for nome in cabeca}
+
+
+def _contido(a, b):
+    if a is None:
+        return True
+    if b is None:
+        return False
+    return all(a[nome].contido(b[nome]) for nome in a)
+
+
+def lidas(no):
+    """Variáveis usadas numa expressão"""
+    if isinstance(no, Variavel):
+        return {no.nome}
+    if isinstance(no, Binaria):
+        return lidas(no.esquerda) | lidas(no.direita)
+    return set()
+
+
+def modificadas(no):
+    """Variáveis atribuídas ou lidas com read() num comando"""
+    if isinstance(no, (Atribuicao, Leitura)):
+        return {no.nome}
+    if isinstance(no, Bloco):
+        return set().union(*(modificadas(comando) for comando in no.comandos))
+    if isinstance(no, Condicional):
+        return modificadas(no.entao) | (modificadas(no.senao) if no.senao else set())
+    if isinstance(no, Repeticao):
+        return modificadas(no.corpo)
+    return set()
+
+
+class AnaliseIntervalos:
+    """
+    Interpretação abstrata das funções de uma unidade (árvore do Parser).
+
+    Depois de funcao(no) para cada função, guarda o que foi provado por nó:
+        divisoes     Binaria DIV/MOD -> NAO_VERIFICADA, DIVISOR_NAO_NULO ou MESMO_SINAL
+        atribuicoes  Atribuicao -> True se o valor já tem o tipo da variável
+        condicoes    Condicional/Repeticao -> True/False se a condição, que não
+                     pode falhar, tem sempre esse valor (None se não se sabe)
+        invariantes  condições dentro de um while que não dependem dele
+    Cada fato vale em todas as visitas ao nó; código inalcançável não é visitado.
+    As chamadas não mudam as variáveis de quem chama, então cada função é
+    analisada sozinha, com os parâmetros sem limite.
+    """
+
+    def __init__(self):
+        self.divisoes = {}
+        self.divisores = {}
+        self.atribuicoes = {}
+        self.condicoes = {}
+        self.invariantes = {}
+        self.origem = {}                # nó -> função, para o resumo
+        self.tipos = {}                 # função -> {variável: é float}
+        self.registrando = True
+        self.reais = {}
+        self.lacos = []                 # variáveis modificadas por cada while aberto
+        self.cabecas = {}               # Repeticao -> última cabeça, dentro de outro laço
+        self.nome_funcao = None
+
+    def funcao(self, no):
+        self.nome_funcao = no.nome
+        self.reais = {d.nome: d.tipo == "FLOAT" for d in no.parametros + no.declaracoes}
+        self.tipos[no.nome] = self.reais
+        estado = {nome: Intervalo.constante(0.0 if real else 0) for nome, real in self.reais.items()}
+        for parametro in no.parametros:
+            estado[parametro.nome] = Intervalo.qualquer(self.reais[parametro.nome])
+        self.registrando = True
+        for comando in no.comandos:
+            estado = self.comando(comando, estado)
+        return self
+
+    # Fatos
+
+    def _registrar(self, tabela, no, fato):
+        """Um fato só continua provado se valer em todas as visitas"""
+        if self.registrando:
+            tabela[no] = min(tabela.get(no, fato), fato)
+            self.origem[no] = self.nome_funcao
+
+    def _decidir(self, no, decisao):
+        if self.registrando:
+            if no in self.condicoes and self.condicoes[no] != decisao:
+                decisao = None
+            self.condicoes[no] = decisao
+            self.origem[no] = self.nome_funcao
+
+    def _invariante(self, no, condicao):
+        if self.registrando and self.lacos and not lidas(condicao) & self.lacos[-1]:
+            self.invariantes[no] = self.nome_funcao
+
+    # Expressões
+
+    def valor(self, no, estado, registrar=True):
+        """Intervalo da expressão no estado (None para textos)"""
+        if isinstance(no, Numero):
+            return Intervalo.constante(no.valor)
+        if isinstance(no, Variavel):
+            valor = estado.get(no.nome)
+            return valor if valor is not None else Intervalo.qualquer(False)
+        if not isinstance(no, Binaria):
+            return None
+        a = self.valor(no.esquerda, estado, registrar)
+        b = self.valor(no.direita, estado, registrar)
+        if registrar and no.operador in ("DIV", "MOD"):
+            if b.contem_zero():
+                nivel = NAO_VERIFICADA
+            elif not (a.real or b.real) and (a.minimo >= 0 and b.minimo > 0
+                                             or a.maximo <= 0 and b.maximo < 0):
+                nivel = MESMO_SINAL
+            else:
+                nivel = DIVISOR_NAO_NULO
+            self._registrar(self.divisoes, no, nivel)
+            if self.registrando:
+                anterior = self.divisores.get(no)
+                self.divisores[no] = b if anterior is None else anterior.juntar(b)
+        return operar(no.operador, a, b)
+
+    def falivel(self, no, estado):
+        """A avaliação da expressão pode levantar erro na máquina?"""
+        if not isinstance(no, Binaria):
+            return False
+        if self.falivel(no.esquerda, estado) or self.falivel(no.direita, estado):
+            return True
+        if no.operador not in ARITMETICOS:
+            return False
+        a = self.valor(no.esquerda, estado, False)
+        b = self.valor(no.direita, estado, False)
+        # Inteiro grande demais para virar float
+        for inteiro, outro in ((a, b), (b, a)):
+            if outro.real and not inteiro.real and not (-MAIOR_REAL <= inteiro.minimo
+                                                        and inteiro.maximo <= MAIOR_REAL):
+                return True
+        if no.operador in ("DIV", "MOD") and b.contem_zero():
+            return True
+        # fmod de infinito
+        return no.operador == "MOD" and (a.real or b.real) and a.como_real().ilimitado()
+
+    def refinar(self, condicao, estado, valor):
+        """O estado sabendo que a condição tem o valor dado (None: impossível)"""
+        if estado is None:
+            return None
+        decisao = verdade(self.valor(condicao, estado, False))
+        if decisao is not None and decisao != valor:
+            return None
+        if not isinstance(condicao, Binaria):
+            if isinstance(condicao, Variavel) and condicao.nome in estado:
+                novo = restringir(estado[condicao.nome], "NEQ" if valor else "EQ",
+                                  Intervalo.constante(0))
+                return None if novo is None else {**estado, condicao.nome: novo}
+            return estado
+        operador = condicao.operador
+        if operador in ("AND", "OR"):
+            if (operador == "AND") == valor:
+                # Os dois lados têm o valor da condição
+                return self.refinar(condicao.direita,
+                                    self.refinar(condicao.esquerda, estado, valor), valor)
+            return juntar(self.refinar(condicao.esquerda, estado, valor),
+                          self.refinar(condicao.direita, estado, valor))
+        if operador not in RELACIONAIS:
+            return estado
+        a = self.valor(condicao.esquerda, estado, False)
+        b = self.valor(condicao.direita, estado, False)
+        if not valor:
+            if a.nan or b.nan:
+                return estado       # a negação não vale para NaN
+            operador = NEGADO[operador]
+        novo = estado
+        for lado, limite, relacao in ((condicao.esquerda, b, operador),
+                                      (condicao.direita, a, TROCADO[operador])):
+            if isinstance(lado, Variavel) and lado.nome in novo:
+                intervalo = restringir(novo[lado.nome], relacao, limite)
+                if intervalo is None:
+                    return None
+                novo = {**novo, lado.nome: intervalo}
+        return novo
+
+    # Comandos
+
+    def comando(self, no, estado):
+        """Estado depois do comando (None: ponto inalcançável)"""
+        if estado is None:
+            return None
+        if isinstance(no, Atribuicao):
+            valor = self.valor(no.expressao, estado)
+            real = self.reais.get(no.nome)
+            if real is None:
+                return estado
+            self._registrar(self.atribuicoes, no, valor.real == real)
+            return {**estado, no.nome: converter(valor, real)}
+        if isinstance(no, Leitura):
+            if no.nome not in self.reais:
+                return estado
+            return {**estado, no.nome: Intervalo.qualquer(self.reais[no.nome])}
+        if isinstance(no, Escrita):
+            self.valor(no.expressao, estado)
+            return estado
+        if isinstance(no, Chamada):
+            for argumento in no.argumentos:
+                self.valor(argumento, estado)
+            return estado
+        if isinstance(no, Condicional):
+            return self.condicional(no, estado)
+        if isinstance(no, Repeticao):
+            return self.repeticao(no, estado)
+        if isinstance(no, Bloco):
+            for comando in no.comandos:
+                estado = self.comando(comando, estado)
+            return estado
+        return estado
+
+    def condicional(self, no, estado):
+        decisao = verdade(self.valor(no.condicao, estado))
+        self._decidir(no, None if self.falivel(no.condicao, estado) else decisao)
+        if decisao is None:
+            self._invariante(no, no.condicao)
+        entao = self.comando(no.entao, self.refinar(no.condicao, estado, True))
+        senao = self.refinar(no.condicao, estado, False)
+        if no.senao is not None:
+            senao = self.comando(no.senao, senao)
+        return juntar(entao, senao)
+
+    def repeticao(self, no, estado):
+        """
+        Ponto fixo da cabeça do laço: as primeiras voltas são exatas, depois
+        os limites que ainda crescem são alargados; uma volta a mais a partir
+        do ponto fixo (estreitamento) recupera limites dados pela condição.
+        Os fatos só são registrados na última passada, com a cabeça estável.
+
+        Dentro do ponto fixo de um laço externo (sem registrar), o laço é
+        revisitado a cada volta de fora: parte da cabeça da visita anterior,
+        alarga logo e não estreita, para o custo não multiplicar a cada nível
+        de aninhamento. A análise completa é feita uma vez, na passada em que
+        o laço externo registra os fatos.
+        """
+        registrando, self.registrando = self.registrando, False
+        self.lacos.append(modificadas(no.corpo))
+
+        def volta(cabeca):
+            return juntar(estado, self.comando(no.corpo, self.refinar(no.condicao, cabeca, True)))
+
+        if not registrando:
+            cabeca = juntar(self.cabecas.get(no), estado)
+            if no in self.cabecas:
+                cabeca = _alargar(self.cabecas[no], cabeca)
+            while True:
+                nova = volta(cabeca)
+                if _contido(nova, cabeca):
+                    break
+                cabeca = _alargar(cabeca, nova)
+            self.cabecas[no] = cabeca
+            self.lacos.pop()
+            return self.refinar(no.condicao, cabeca, False)
+
+        cabeca, voltas = estado, 0
+        while True:
+            nova = volta(cabeca)
+            if _contido(nova, cabeca):
+                break
+            voltas += 1
+            cabeca = _alargar(cabeca, nova) if voltas > ATRASO_ALARGAMENTO else nova
+        estreita = volta(cabeca)
+        if _contido(volta(estreita), estreita):
+            cabeca = estreita
+
+        self.registrando = registrando
+        decisao = verdade(self.valor(no.condicao, cabeca))
+        # Só "nunca executa" muda o código; "sempre" seria um laço sem fim
+        self._decidir(no, False if decisao is False and not self.falivel(no.condicao, cabeca)
+                      else None)
+        if decisao is None:
+            self._invariante(no, no.condicao)
+        self.comando(no.corpo, self.refinar(no.condicao, cabeca, True))
+        self.lacos.pop()
+        return self.refinar(no.condicao, cabeca, False)
+
+    # Resumo
+
+    def eliminacoes(self):
+        """Verificações e desvios que o gerador pode remover, por linha"""
+        resultado = []
+        for no, nivel in self.divisoes.items():
+            if nivel == NAO_VERIFICADA:
+                continue
+            operacao = "/" if no.operador == "DIV" else "%"
+            if nivel == MESMO_SINAL:
+                tipo, detalhe = "divisao_direta", f"'{operacao}' entre inteiros de mesmo sinal"
+            else:
+                tipo, detalhe = "divisor_nao_nulo", f"'{operacao}' sem teste de divisão por zero"
+            resultado.append((no, tipo, f"{detalhe}: divisor em {self.divisores[no]}"))
+        for no, exato in self.atribuicoes.items():
+            if exato:
+                resultado.append((no, "sem_conversao", f"'{no.nome}' recebe o próprio tipo"))
+        for no, decisao in self.condicoes.items():
+            if decisao is None:
+                continue
+            if isinstance(no, Repeticao):
+                resultado.append((no, "laco_removido", "condição falsa na entrada"))
+            else:
+                ramo = "senão" if decisao else "então"
+                resultado.append((no, "condicao_constante",
+                                  f"condição sempre {'verdadeira' if decisao else 'falsa'}: "
+                                  f"{ramo} removido"))
+        return [{"funcao": self.origem[no], "linha": no.linha, "tipo": tipo, "detalhe": detalhe}
+                for no, tipo, detalhe in sorted(resultado, key=lambda r: (r[0].linha, r[1]))]
+
+    def inteiras(self):
+        """Variáveis number, por função, que nunca recebem um float (nem o truncam)"""
+        atribuidas = {}
+        for no, exato in self.atribuicoes.items():
+            chave = (self.origem[no], no.nome)
+            atribuidas[chave] = atribuidas.get(chave, True) and exato
+        resultado = {}
+        for (funcao, nome), exato in atribuidas.items():
+            if exato and not self.tipos[funcao][nome]:
+                resultado.setdefault(funcao, []).append(nome)
+        return {funcao: sorted(nomes) for funcao, nomes in resultado.items()}
+
+    def resumo(self):
+        eliminacoes = self.eliminacoes()
+        totais = {}
+        for eliminacao in eliminacoes:
+            totais[eliminacao["tipo"]] = totais.get(eliminacao["tipo"], 0) + 1
+        return {"eliminacoes": eliminacoes, "totais": totais, "inteiras": self.inteiras(),
+                "invariantes": sorted(({"funcao": funcao, "linha": no.linha}
+                                       for no, funcao in self.invariantes.items()),
+                                      key=lambda i: i["linha"])}
+
+
+def analisar(programa):
+    """Analisa todas as funções de uma unidade e devolve a AnaliseIntervalos"""
+    analise = AnaliseIntervalos()
+    for funcao in programa.funcoes:
+        analise.funcao(funcao)
+    return analise
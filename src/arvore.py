@@ -0,0 +1,149 @@
+"""
+Árvore - Nós da árvore sintática abstrata
+Construída pelo Parser; cada nó guarda a linha do token que o originou
+"""
+
+
+class No:
+    """Nó base da árvore sintática"""
+    __slots__ = ('linha',)
+
+    def __repr__(self):
+        campos = []
+        for classe in type(self).__mro__:
+            for nome in getattr(classe, '__slots__', ()):
+                if nome != 'linha':
+                    campos.append(f"{nome}={getattr(self, nome)!r}")
+        return f"{type(self).__name__}({', '.join(campos)})"
+
+
+class Programa(No):
+    """Unidade de compilação: uma ou mais funções"""
+    __slots__ = ('funcoes',)
+
+    def __init__(self, funcoes, linha):
+        self.funcoes = funcoes
+        self.linha = linha
+
+
+class Funcao(No):
+    """'function' nome '(' parametros ')' '{' corpo '}' — parametros são Declaracao"""
+    __slots__ = ('nome', 'parametros', 'declaracoes', 'comandos')
+
+    def __init__(self, nome, parametros, declaracoes, comandos, linha):
+        self.nome = nome
+        self.parametros = parametros
+        self.declaracoes = declaracoes
+        self.comandos = comandos
+        self.linha = linha
+
+
+class Declaracao(No):
+    """('let' | 'const') ID ':' tipo — tipo é TokenType.NUMBER ou TokenType.FLOAT"""
+    __slots__ = ('nome', 'tipo', 'constante')
+
+    def __init__(self, nome, tipo, constante, linha):
+        self.nome = nome
+        self.tipo = tipo
+        self.constante = constante
+        self.linha = linha
+
+
+class Atribuicao(No):
+    __slots__ = ('nome', 'expressao')
+
+    def __init__(self, nome, expressao, linha):
+        self.nome = nome
+        self.expressao = expressao
+        self.linha = linha
+
+
+class Chamada(No):
+    """Chamada de função como comando: nome '(' argumentos ')' ';'"""
+    __slots__ = ('nome', 'argumentos')
+
+    def __init__(self, nome, argumentos, linha):
+        self.nome = nome
+        self.argumentos = argumentos
+        self.linha = linha
+
+
+class Leitura(No):
+    __slots__ = ('nome',)
+
+    def __init__(self, nome, linha):
+        self.nome = nome
+        self.linha = linha
+
+
+class Escrita(No):
+    __slots__ = ('expressao',)
+
+    def __init__(self, expressao, linha):
+        self.expressao = expressao
+        self.linha = linha
+
+
+class Condicional(No):
+    """'if' (condicao) entao ['else' senao] — senao é None quando ausente"""
+    __slots__ = ('condicao', 'entao', 'senao')
+
+    def __init__(self, condicao, entao, senao, linha):
+        self.condicao = condicao
+        self.entao = entao
+        self.senao = senao
+        self.linha = linha
+
+
+class Repeticao(No):
+    __slots__ = ('condicao', 'corpo')
+
+    def __init__(self, condicao, corpo, linha):
+        self.condicao = condicao
+        self.corpo = corpo
+        self.linha = linha
+
+
+class Bloco(No):
+    __slots__ = ('comandos',)
+
+    def __init__(self, comandos, linha):
+        self.comandos = comandos
+        self.linha = linha
+
+
+class Binaria(No):
+    """Operação binária — operador é o TokenType do operador (PLUS, LT, AND, ...)"""
+    __slots__ = ('operador', 'esquerda', 'direita')
+
+    def __init__(self, operador, esquerda, direita, linha):
+        self.operador = operador
+        self.esquerda = esquerda
+        self.direita = direita
+        self.linha = linha
+
+
+class Numero(No):
+    """Literal NUMINT (int) ou NUMREAL (float)"""
+    __slots__ = ('valor',)
+
+    def __init__(self, valor, linha):
+        self.valor = valor
+        self.linha = linha
+
+
+class Variavel(No):
+    __slots__ = ('nome',)
+
+    def __init__(self, nome, linha):
+        self.nome = nome
+        self.linha = linha
+
+
+class Texto(No):
+    """Literal STRING (só aparece em console.log)"""
+    __slots__ = ('valor',)
+
+    def __init__(self, valor, linha):
+        self.valor = valor
+        self.linha = linha
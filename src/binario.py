@@ -0,0 +1,361 @@
+"""
+Binário - Formato .mcb de programas compilados
+Grava um ProgramaCompilado ligado e o carrega via mmap, executando direto do
+buffer: não depende do lexer nem do parser
+
+Layout (little-endian, seções alinhadas a 8 bytes):
+    cabeçalho      mágico, versão, contagens e deslocamentos das seções
+    constantes     marcador + valor (int64, inteiro grande, double ou UTF-8)
+    funções        nome, entrada, parâmetros e (nome, tipo) de cada variável
+    ops            um byte por instrução
+    args           int32 por instrução
+    linhas         pares (repetições, delta da linha) em varint
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+
+from .instrucoes import ProgramaCompilado, FuncaoCompilada, OpCode, NOMES, OPERADORES_BINARIOS
+
+
+MAGICO = b"MCB\x00"
+# Mude a cada alteração do conjunto de instruções (instrucoes.OpCode): uma
+# máquina antiga não pode aceitar um arquivo com opcodes que não conhece
+VERSAO = 2
+EXTENSAO = ".mcb"
+
+# mágico, versão, reservado, instruções, constantes, funções, principal,
+# deslocamentos de constantes, funções, ops, args e linhas, tamanho das linhas
+CABECALHO = struct.Struct("<4sHHIIII6I")
+
+INT64, INTEIRO_GRANDE, REAL, TEXTO = 0, 1, 2, 3
+TIPOS = ["NUMBER", "FLOAT"]
+
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+I64 = struct.Struct("<q")
+DOUBLE = struct.Struct("<d")
+FUNCAO = struct.Struct("<IHH")              # entrada, parâmetros, variáveis
+
+# Opcodes cujo argumento é índice de variável, de destino de salto ou de função
+VARIAVEIS = {OpCode.LOAD, OpCode.STORE, OpCode.STORE_RAW, OpCode.READ}
+SALTOS = {OpCode.JUMP, OpCode.JUMP_FALSE, OpCode.LOOP}
+# MARK não aparece: programas instrumentados não são gravados em .mcb
+VALIDOS = set(NOMES) - {OpCode.MARK}
+# Valores (desempilhados, empilhados) por instrução; CALL desempilha os parâmetros
+EFEITOS = {op: (0, 0) for op in VALIDOS}
+EFEITOS.update({OpCode.CONST: (0, 1), OpCode.LOAD: (0, 1), OpCode.STORE: (1, 0),
+                OpCode.STORE_RAW: (1, 0), OpCode.WRITE: (1, 0), OpCode.JUMP_FALSE: (1, 0)})
+EFEITOS.update((op, (2, 1)) for op in OPERADORES_BINARIOS.values())
+EFEITOS.update((op, (2, 1)) for op in (OpCode.DIV_NC, OpCode.MOD_NC, OpCode.IDIV, OpCode.IMOD))
+
+
+class FormatError(Exception):
+    """Arquivo .mcb inválido ou de versão não suportada"""
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return f"Erro de Formato: {self.message}"
+
+
+def _varint(saida, valor):
+    while valor >= 0x80:
+        saida.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    saida.append(valor)
+
+
+def _alinhar(saida):
+    saida.extend(b"\x00" * (-len(saida) % 8))
+    return len(saida)
+
+
+def _texto(saida, texto, tamanho=U16):
+    dados = texto.encode('utf-8')
+    saida += tamanho.pack(len(dados))
+    saida += dados
+
+
+class TabelaLinhas:
+    """Linha de cada instrução, decodificada da tabela compacta no primeiro acesso"""
+
+    def __init__(self, buffer, instrucoes):
+        self.buffer = buffer
+        self.instrucoes = instrucoes
+        self._linhas = None
+
+    def __len__(self):
+        return self.instrucoes
+
+    def __getitem__(self, pc):
+        if self._linhas is None:
+            self._linhas = self._decodificar()
+        return self._linhas[pc]
+
+    def __iter__(self):
+        return (self[pc] for pc in range(self.instrucoes))
+
+    def _decodificar(self):
+        linhas = array('i')
+        dados, posicao, linha = self.buffer, 0, 0
+        while len(linhas) < self.instrucoes:
+            numeros = []
+            for _ in range(2):
+                valor = deslocamento = 0
+                while True:
+                    if posicao >= len(dados):
+                        raise FormatError("tabela de linhas truncada")
+                    byte = dados[posicao]
+                    posicao += 1
+                    valor |= (byte & 0x7F) << deslocamento
+                    if byte < 0x80:
+                        break
+                    deslocamento += 7
+                numeros.append(valor)
+            repeticoes, delta = numeros
+            linha += delta // 2 if delta % 2 == 0 else -(delta + 1) // 2
+            linhas.extend([linha] * repeticoes)
+        return linhas
+
+
+def serializar(programa):
+    """Bytes do arquivo .mcb de um ProgramaCompilado"""
+    if programa.blocos:
+        raise FormatError("programas instrumentados para cobertura não são gravados em .mcb")
+    n = len(programa.ops)
+    corpo = bytearray(CABECALHO.size)
+
+    inicio_constantes = _alinhar(corpo)
+    for valor in programa.constantes:
+        if type(valor) is int and -2 ** 63 <= valor < 2 ** 63:
+            corpo.append(INT64)
+            corpo += I64.pack(valor)
+        elif type(valor) is int:
+            dados = valor.to_bytes((valor.bit_length() + 8) // 8, 'little', signed=True)
+            corpo.append(INTEIRO_GRANDE)
+            corpo += U32.pack(len(dados))
+            corpo += dados
+        elif type(valor) is float:
+            corpo.append(REAL)
+            corpo += DOUBLE.pack(valor)
+        else:
+            corpo.append(TEXTO)
+            _texto(corpo, valor, U32)
+
+    inicio_funcoes = _alinhar(corpo)
+    for funcao in programa.funcoes:
+        _texto(corpo, funcao.nome)
+        corpo += FUNCAO.pack(funcao.entrada, funcao.parametros, len(funcao.variaveis))
+        for nome, tipo in zip(funcao.variaveis, funcao.tipos):
+            _texto(corpo, nome)
+            corpo.append(TIPOS.index(tipo))
+
+    inicio_ops = _alinhar(corpo)
+    corpo += bytes(programa.ops)
+    inicio_args = _alinhar(corpo)
+    args = array('i', programa.args)
+    if sys.byteorder == 'big':
+        args.byteswap()
+    corpo += args.tobytes()
+
+    inicio_linhas = _alinhar(corpo)
+    linhas = list(programa.linhas)
+    anterior, pc = 0, 0
+    while pc < n:
+        fim = pc
+        while fim < n and linhas[fim] == linhas[pc]:
+            fim += 1
+        delta = linhas[pc] - anterior
+        _varint(corpo, fim - pc)
+        _varint(corpo, delta * 2 if delta >= 0 else -delta * 2 - 1)
+        anterior, pc = linhas[pc], fim
+
+    CABECALHO.pack_into(corpo, 0, MAGICO, VERSAO, 0, n, len(programa.constantes),
+                        len(programa.funcoes), programa.principal, inicio_constantes,
+                        inicio_funcoes, inicio_ops, inicio_args, inicio_linhas,
+                        len(corpo) - inicio_linhas)
+    return bytes(corpo)
+
+
+def de_buffer(buffer):
+    """
+    ProgramaCompilado cujas instruções são views do buffer (sem cópia).
+
+    As tabelas pequenas (constantes e funções) são decodificadas na hora e as
+    instruções são validadas (opcodes e índices de constante, variável, salto
+    e função), para que um arquivo corrompido falhe aqui com FormatError e não
+    dentro da máquina; a tabela de linhas só é decodificada quando alguma
+    linha é consultada (erros, listagem).
+    """
+    dados = memoryview(buffer)
+    if len(dados) < CABECALHO.size:
+        raise FormatError("arquivo truncado")
+    (magico, versao, _, n, n_constantes, n_funcoes, principal, inicio_constantes,
+     inicio_funcoes, inicio_ops, inicio_args, inicio_linhas, tamanho_linhas) = \
+        CABECALHO.unpack_from(dados)
+    if magico != MAGICO:
+        raise FormatError("não é um programa compilado (.mcb)")
+    if versao != VERSAO:
+        raise FormatError(f"versão {versao} não suportada (esperada {VERSAO})")
+    if (inicio_ops + n > len(dados) or inicio_args + 4 * n > len(dados)
+            or inicio_linhas + tamanho_linhas > len(dados)):
+        raise FormatError("arquivo truncado")
+
+    posicao = 0
+
+    def ler(tamanho):
+        """Avança 'tamanho' bytes e devolve onde eles começam"""
+        nonlocal posicao
+        inicio = posicao
+        if inicio + tamanho > len(dados):
+            raise FormatError("arquivo truncado")
+        posicao += tamanho
+        return inicio
+
+    def texto(tamanho=U16):
+        (quantidade,) = tamanho.unpack_from(dados, ler(tamanho.size))
+        inicio = ler(quantidade)
+        try:
+            return bytes(dados[inicio:posicao]).decode('utf-8')
+        except UnicodeDecodeError:
+            raise FormatError("texto inválido") from None
+
+    constantes = []
+    posicao = inicio_constantes
+    for _ in range(n_constantes):
+        marcador = dados[ler(1)]
+        if marcador == INT64:
+            constantes.append(I64.unpack_from(dados, ler(I64.size))[0])
+        elif marcador == REAL:
+            constantes.append(DOUBLE.unpack_from(dados, ler(DOUBLE.size))[0])
+        elif marcador == INTEIRO_GRANDE:
+            (tamanho,) = U32.unpack_from(dados, ler(U32.size))
+            inicio = ler(tamanho)
+            constantes.append(int.from_bytes(dados[inicio:posicao], 'little', signed=True))
+        elif marcador == TEXTO:
+            constantes.append(texto(U32))
+        else:
+            raise FormatError(f"constante com marcador desconhecido: {marcador}")
+
+    funcoes = []
+    posicao = inicio_funcoes
+    for _ in range(n_funcoes):
+        nome = texto()
+        entrada, parametros, quantidade = FUNCAO.unpack_from(dados, ler(FUNCAO.size))
+        variaveis, tipos = [], []
+        for _ in range(quantidade):
+            variaveis.append(texto())
+            tipo = dados[ler(1)]
+            if tipo >= len(TIPOS):
+                raise FormatError(f"tipo desconhecido na função {nome}: {tipo}")
+            tipos.append(TIPOS[tipo])
+        if entrada >= n or parametros > quantidade:
+            raise FormatError(f"função {nome} inválida")
+        funcoes.append(FuncaoCompilada(nome, entrada, parametros, variaveis, tipos))
+    if principal >= n_funcoes:
+        raise FormatError("função principal inexistente")
+
+    ops = dados[inicio_ops:inicio_ops + n]
+    args = dados[inicio_args:inicio_args + 4 * n].cast('i')
+    if sys.byteorder == 'big':
+        args = array('i', args)
+        args.byteswap()
+    _validar_instrucoes(ops, args, constantes, funcoes, principal)
+    linhas = TabelaLinhas(dados[inicio_linhas:inicio_linhas + tamanho_linhas], n)
+    return ProgramaCompilado(ops, args, constantes, funcoes, linhas, principal)
+
+
+def _validar_instrucoes(ops, args, constantes, funcoes, principal):
+    """
+    Confere cada instrução: opcode conhecido, argumento dentro da tabela a que
+    se refere (variáveis da função que contém a instrução) e código de cada
+    função terminando em RET ou HALT, para a máquina nunca sair do programa.
+    Depois confere a pilha de cada função (ver _validar_pilha).
+    """
+    n = len(ops)
+    desconhecidos = set(ops) - VALIDOS
+    if desconhecidos:
+        raise FormatError(f"opcode desconhecido: {min(desconhecidos)}")
+    entradas = sorted({funcao.entrada for funcao in funcoes} | {0, n})
+    variaveis = {funcao.entrada: len(funcao.variaveis) for funcao in funcoes}
+    for inicio, fim in zip(entradas, entradas[1:]):
+        if ops[fim - 1] not in (OpCode.RET, OpCode.HALT):
+            raise FormatError(f"código da função em {inicio} não termina em RET ou HALT")
+        quantidade = variaveis.get(inicio, 0)
+        for pc in range(inicio, fim):
+            op, arg = ops[pc], args[pc]
+            if op == OpCode.CONST:
+                valido = 0 <= arg < len(constantes) and (
+                    type(constantes[arg]) is not str or ops[pc + 1] == OpCode.WRITE)
+            elif op in VARIAVEIS:
+                valido = 0 <= arg < quantidade
+            elif op in SALTOS:
+                valido = 0 <= arg < n
+            elif op == OpCode.CALL:
+                valido = 0 <= arg < len(funcoes)
+            else:
+                continue
+            if not valido:
+                raise FormatError(f"argumento inválido na instrução {pc}: "
+                                  f"{NOMES[op]} {arg}")
+    for indice, funcao in enumerate(funcoes):
+        fim = entradas[entradas.index(funcao.entrada) + 1]
+        _validar_pilha(ops, args, funcoes, funcao.entrada, fim, indice == principal)
+
+
+def _validar_pilha(ops, args, funcoes, inicio, fim, principal):
+    """
+    Percorre o código alcançável da função em [inicio, fim) com a altura da
+    pilha em cada instrução: nenhuma desempilha mais do que há, a altura é a
+    mesma por todos os caminhos, os saltos ficam na função (e só LOOP volta)
+    e a principal não tem RET (não há chamador para onde voltar).
+    """
+    alturas = {inicio: 0}
+    pendentes = [inicio]
+    while pendentes:
+        pc = pendentes.pop()
+        op, arg = ops[pc], args[pc]
+        retira, poe = (funcoes[arg].parametros, 0) if op == OpCode.CALL else EFEITOS[op]
+        altura = alturas[pc]
+        if altura < retira:
+            raise FormatError(f"pilha insuficiente na instrução {pc}: {NOMES[op]}")
+        altura += poe - retira
+        if op == OpCode.HALT or op == OpCode.RET:
+            if op == OpCode.RET and principal:
+                raise FormatError(f"RET na função principal na instrução {pc}")
+            continue
+        if (op == OpCode.JUMP or op == OpCode.JUMP_FALSE) and arg <= pc:
+            # Só LOOP volta: é nele que a máquina verifica o limite da fatia
+            raise FormatError(f"salto para trás na instrução {pc}: {NOMES[op]} {arg}")
+        if op == OpCode.JUMP or op == OpCode.LOOP:
+            seguintes = (arg,)
+        elif op == OpCode.JUMP_FALSE:
+            seguintes = (pc + 1, arg)
+        else:
+            seguintes = (pc + 1,)
+        for seguinte in seguintes:
+            if not inicio <= seguinte < fim:
+                raise FormatError(f"salto para fora da função na instrução {pc}")
+            if seguinte not in alturas:
+                alturas[seguinte] = altura
+                pendentes.append(seguinte)
+            elif alturas[seguinte] != altura:
+                raise FormatError(f"altura da pilha diverge na instrução {seguinte}")
+
+
+def salvar(programa, caminho):
+    with open(caminho, 'wb') as f:
+        f.write(serializar(programa))
+
+
+def carregar(caminho):
+    """Mapeia o arquivo .mcb na memória (somente leitura) e monta o programa"""
+    with open(caminho, 'rb') as f:
+        try:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise FormatError("arquivo vazio")
+    return de_buffer(mapa)
@@ -0,0 +1,275 @@
+"""
+Checkpoint - Instantâneos binários do estado de uma MaquinaVirtual
+Guarda quadros de variáveis, pilha, pc e posições de entrada e saída para que
+uma execução longa possa ser retomada do ponto em que parou
+"""
+
+import os
+import struct
+
+from .instrucoes import OpCode
+from .maquina import MaquinaVirtual, Estado
+
+
+MAGICO = b"MCKP"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sH32s")     # mágico, versão, impressão digital do programa
+
+ESTADOS = [Estado.PRONTO, Estado.AGUARDANDO_ENTRADA, Estado.FINALIZADO, Estado.ERRO]
+
+# Marcadores de tipo dos valores
+INTEIRO, REAL, TEXTO = 0, 1, 2
+DOUBLE = struct.Struct("<d")
+
+
+class CheckpointError(Exception):
+    """Instantâneo inválido ou de outro programa"""
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return f"Erro de Checkpoint: {self.message}"
+
+
+def _escrever_natural(saida, valor):
+    """Inteiro não negativo em varint (7 bits por byte)"""
+    while valor >= 0x80:
+        saida.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    saida.append(valor)
+
+
+def _escrever_valor(saida, valor):
+    if type(valor) is int:
+        saida.append(INTEIRO)
+        _escrever_natural(saida, valor * 2 if valor >= 0 else -valor * 2 - 1)
+    elif type(valor) is float:
+        saida.append(REAL)
+        saida += DOUBLE.pack(valor)
+    else:
+        dados = str(valor).encode('utf-8')
+        saida.append(TEXTO)
+        _escrever_natural(saida, len(dados))
+        saida += dados
+
+
+def _escrever_valores(saida, valores):
+    _escrever_natural(saida, len(valores))
+    for valor in valores:
+        _escrever_valor(saida, valor)
+
+
+class _Leitor:
+    def __init__(self, dados, posicao):
+        self.dados = dados
+        self.posicao = posicao
+
+    def _reservar(self, tamanho):
+        """Avança 'tamanho' bytes e devolve onde eles começam"""
+        inicio = self.posicao
+        if inicio + tamanho > len(self.dados):
+            raise CheckpointError("instantâneo truncado")
+        self.posicao += tamanho
+        return inicio
+
+    def natural(self):
+        valor = deslocamento = 0
+        while True:
+            byte = self.dados[self._reservar(1)]
+            valor |= (byte & 0x7F) << deslocamento
+            if byte < 0x80:
+                return valor
+            deslocamento += 7
+
+    def valor(self):
+        marcador = self.dados[self._reservar(1)]
+        if marcador == INTEIRO:
+            z = self.natural()
+            return z // 2 if z % 2 == 0 else -(z + 1) // 2
+        if marcador == REAL:
+            (valor,) = DOUBLE.unpack_from(self.dados, self._reservar(DOUBLE.size))
+            return valor
+        if marcador == TEXTO:
+            tamanho = self.natural()
+            inicio = self._reservar(tamanho)
+            try:
+                return bytes(self.dados[inicio:self.posicao]).decode('utf-8')
+            except UnicodeDecodeError:
+                raise CheckpointError("texto inválido no instantâneo") from None
+        raise CheckpointError(f"tipo de valor desconhecido: {marcador}")
+
+    def valores(self, limite):
+        quantidade = self.natural()
+        if quantidade > limite:
+            raise CheckpointError("instantâneo corrompido")
+        return [self.valor() for _ in range(quantidade)]
+
+
+def serializar(maquina):
+    """Instantâneo compacto do estado da máquina (bytes)"""
+    saida = bytearray(CABECALHO.pack(MAGICO, VERSAO, maquina.programa.impressao_digital()))
+    entrada = maquina.entrada
+    for numero in (ESTADOS.index(maquina.estado), maquina.pc, maquina.funcao,
+                   maquina.instrucoes, getattr(entrada, 'posicao', 0),
+                   getattr(entrada, 'consumidos', 0), _posicao_saida(maquina.saida),
+                   len(maquina.quadros)):
+        _escrever_natural(saida, numero)
+    for retorno, funcao, variaveis in maquina.quadros:
+        _escrever_natural(saida, retorno)
+        _escrever_natural(saida, funcao)
+        _escrever_valores(saida, variaveis)
+    _escrever_valores(saida, maquina.variaveis)
+    _escrever_valores(saida, maquina.pilha)
+    return bytes(saida)
+
+
+def desserializar(programa, dados, entrada=None, saida=None):
+    """
+    Recria a máquina de um instantâneo de 'programa'.
+
+    A entrada e a saída informadas são reposicionadas (posicionar) para o
+    ponto do instantâneo: a leitura continua do valor seguinte e o que foi
+    escrito depois do instantâneo é descartado.
+    """
+    if len(dados) < CABECALHO.size:
+        raise CheckpointError("instantâneo truncado")
+    magico, versao, digital = CABECALHO.unpack_from(dados)
+    if magico != MAGICO:
+        raise CheckpointError("arquivo não é um instantâneo")
+    if versao != VERSAO:
+        raise CheckpointError(f"versão {versao} não suportada")
+    if digital != programa.impressao_digital():
+        raise CheckpointError("instantâneo é de outro programa")
+
+    leitor = _Leitor(dados, CABECALHO.size)
+    estado, pc, funcao, instrucoes, posicao_entrada, consumidos, posicao_saida, profundidade = (
+        leitor.natural() for _ in range(8))
+    if (estado >= len(ESTADOS) or funcao >= len(programa.funcoes) or pc >= len(programa)
+            or profundidade > MaquinaVirtual.LIMITE_CHAMADAS):
+        raise CheckpointError("instantâneo corrompido")
+    quadros = []
+    for _ in range(profundidade):
+        retorno = leitor.natural()
+        funcao_quadro = leitor.natural()
+        if funcao_quadro >= len(programa.funcoes):
+            raise CheckpointError("instantâneo corrompido")
+        quadros.append((retorno, funcao_quadro,
+                        leitor.valores(len(programa.funcoes[funcao_quadro].variaveis))))
+    variaveis = leitor.valores(len(programa.funcoes[funcao].variaveis))
+    # A pilha só guarda a expressão em andamento: não passa do tamanho do código
+    pilha = leitor.valores(len(programa))
+    if leitor.posicao != len(dados):
+        raise CheckpointError("instantâneo corrompido")
+
+    maquina = MaquinaVirtual(programa, entrada, saida)
+    _validar_quadros(programa, maquina.reais_funcoes, quadros, funcao, variaveis, pilha)
+    maquina.estado = ESTADOS[estado]
+    maquina.pc = pc
+    maquina.funcao = funcao
+    maquina.reais = maquina.reais_funcoes[funcao]
+    maquina.instrucoes = instrucoes
+    maquina.quadros = quadros
+    maquina.variaveis = variaveis
+    maquina.pilha = pilha
+
+    if hasattr(maquina.entrada, 'posicionar'):
+        maquina.entrada.posicionar(posicao_entrada)
+    maquina.entrada.consumidos = consumidos
+    if hasattr(maquina.saida, 'posicionar'):
+        maquina.saida.posicionar(posicao_saida)
+    return maquina
+
+
+def _validar_quadros(programa, reais_funcoes, quadros, funcao, variaveis, pilha):
+    """
+    Confere os quadros contra o programa: cada retorno vem logo depois de um
+    CALL, cada função tem todas as suas variáveis com o tipo declarado e a
+    pilha só tem valores que a máquina empilha.
+    """
+    for retorno, _, _ in quadros:
+        if not 0 < retorno < len(programa) or programa.ops[retorno - 1] != OpCode.CALL:
+            raise CheckpointError("instantâneo corrompido: retorno inválido")
+    for funcao_quadro, valores in [(f, v) for _, f, v in quadros] + [(funcao, variaveis)]:
+        reais = reais_funcoes[funcao_quadro]
+        if len(valores) != len(reais) or any(
+                type(valor) is not (float if real else int) for valor, real in zip(valores, reais)):
+            raise CheckpointError(f"instantâneo corrompido: variáveis de "
+                                  f"{programa.funcoes[funcao_quadro].nome}")
+    if any(type(valor) not in (int, float, str) for valor in pilha):
+        raise CheckpointError("instantâneo corrompido: pilha")
+
+
+def _posicao_saida(saida):
+    posicao = getattr(saida, 'posicao', None)
+    return len(saida) if posicao is None else posicao
+
+
+def salvar(maquina, caminho):
+    """Grava o instantâneo de forma atômica, depois de descarregar a saída"""
+    saida = maquina.saida
+    if hasattr(saida, 'flush'):
+        saida.flush()
+        arquivo = getattr(saida, 'arquivo', None)
+        try:
+            os.fsync(arquivo.fileno())
+        except (AttributeError, OSError, ValueError):
+            pass    # ex.: terminal ou objeto em memória
+    temporario = caminho + ".tmp"
+    with open(temporario, 'wb') as f:
+        f.write(serializar(maquina))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+
+def carregar(programa, caminho, entrada=None, saida=None):
+    with open(caminho, 'rb') as f:
+        return desserializar(programa, f.read(), entrada, saida)
+
+
+class Checkpoints:
+    """
+    Executa uma máquina gravando instantâneos em 'caminho'.
+
+    Grava automaticamente a cada 'a_cada' instruções (None = nunca) e quando
+    pedir() é chamado, por exemplo de um tratador de sinal. Os instantâneos
+    são tirados nas arestas de retorno dos laços, entre fatias de execução.
+    """
+
+    # Instruções por fatia quando não há gravação periódica (latência de pedir())
+    FATIA = 100000
+
+    def __init__(self, maquina, caminho, a_cada=None):
+        self.maquina = maquina
+        self.caminho = caminho
+        self.a_cada = a_cada
+        self.gravados = 0
+        self._pedido = False
+        self._parar = False
+
+    def pedir(self, parar=False):
+        """Grava um instantâneo na próxima oportunidade (e para, se 'parar')"""
+        self._pedido = True
+        self._parar = self._parar or parar
+
+    def salvar(self):
+        salvar(self.maquina, self.caminho)
+        self.gravados += 1
+
+    def executar(self):
+        """Executa até terminar, suspender em read() ou ser parada por pedir(parar=True)"""
+        maquina = self.maquina
+        fatia = min(self.a_cada or self.FATIA, self.FATIA)
+        proximo = maquina.instrucoes + self.a_cada if self.a_cada else None
+        while True:
+            estado = maquina.executar(fatia)
+            if estado != Estado.PRONTO:
+                return estado
+            if proximo is not None and maquina.instrucoes >= proximo:
+                self._pedido = True
+                proximo = maquina.instrucoes + self.a_cada
+            if self._pedido:
+                self._pedido = False
+                self.salvar()
+                if self._parar:
+                    return estado
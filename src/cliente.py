@@ -0,0 +1,49 @@
+"""
+Cliente - Cliente leve para o daemon de compilação
+Não importa o lexer nem o parser: apenas envia pedidos pelo socket Unix
+"""
+
+import json
+import os
+import socket
+
+
+class ClienteCompilacao:
+    """Conexão persistente com o ServidorCompilacao"""
+
+    def __init__(self, caminho_socket, timeout=10.0):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(caminho_socket)
+        self.arquivo = self.socket.makefile('rb')
+
+    def pedir(self, pedido):
+        """Envia um pedido e aguarda a resposta"""
+        self.socket.sendall(json.dumps(pedido, ensure_ascii=False).encode('utf-8') + b"\n")
+        linha = self.arquivo.readline()
+        if not linha:
+            raise ConnectionError("Servidor encerrou a conexão")
+        return json.loads(linha)
+
+    def compilar_arquivo(self, caminho):
+        # Caminho absoluto: o servidor pode estar em outro diretório de trabalho
+        return self.pedir({"op": "compilar", "caminho": os.path.abspath(caminho)})
+
+    def compilar_fonte(self, codigo_fonte):
+        return self.pedir({"op": "compilar", "fonte": codigo_fonte})
+
+    def estatisticas(self):
+        return self.pedir({"op": "stats"})["stats"]
+
+    def encerrar_servidor(self):
+        return self.pedir({"op": "encerrar"})
+
+    def close(self):
+        self.arquivo.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
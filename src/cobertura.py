@@ -0,0 +1,125 @@
+"""
+Cobertura - Cobertura de comandos e ramos de programas instrumentados
+O gerador (instrumentar=True) põe um MARK no início de cada bloco básico; a
+máquina marca o bloco num bytearray pré-alocado. Os mapas de várias execuções
+(e processos) são acumulados com OU num arquivo e relatados por linha
+"""
+
+import fcntl
+import os
+import struct
+
+
+MAGICO = b"MCOV"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sH32sI")     # mágico, versão, impressão digital, blocos
+
+
+class CoverageError(Exception):
+    """Arquivo de cobertura inválido ou de outro programa"""
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return f"Erro de Cobertura: {self.message}"
+
+
+def _ler(dados, programa=None):
+    if len(dados) < CABECALHO.size:
+        raise CoverageError("arquivo truncado")
+    magico, versao, digital, blocos = CABECALHO.unpack_from(dados)
+    if magico != MAGICO or versao != VERSAO:
+        raise CoverageError("não é um arquivo de cobertura desta versão")
+    if programa is not None and digital != programa.impressao_digital():
+        raise CoverageError("cobertura é de outra versão do programa")
+    mapa = bytearray(dados[CABECALHO.size:CABECALHO.size + blocos])
+    if len(mapa) != blocos:
+        raise CoverageError("arquivo truncado")
+    return mapa
+
+
+def mesclar(caminho, programa, mapa):
+    """
+    Acumula 'mapa' no arquivo de cobertura (OU bit a bit) e devolve o total.
+
+    O arquivo fica travado (flock) durante a leitura e a escrita, então
+    processos concorrentes podem mesclar no mesmo arquivo.
+    """
+    descritor = os.open(caminho, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(descritor, 'r+b') as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_EX)
+        dados = arquivo.read()
+        total = _ler(dados, programa) if dados else bytearray(len(mapa))
+        for bloco, marcado in enumerate(mapa):
+            if marcado:
+                total[bloco] = 1
+        arquivo.seek(0)
+        arquivo.truncate()
+        arquivo.write(CABECALHO.pack(MAGICO, VERSAO, programa.impressao_digital(), len(total)))
+        arquivo.write(total)
+    return total
+
+
+def carregar(caminho, programa):
+    with open(caminho, 'rb') as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_SH)
+        return _ler(arquivo.read(), programa)
+
+
+def relatorio(programa, mapa):
+    """
+    Cobertura por unidade: linhas (linha -> executada), ramos de if/else e
+    de while (entrou no corpo) e totais.
+    """
+    unidades = {}
+    abertos = []                # blocos 'entao' esperando o 'senao' correspondente
+    for bloco, (unidade, tipo, linha, linhas) in enumerate(programa.blocos):
+        dados = unidades.setdefault(unidade, {"linhas": {}, "ramos": []})
+        coberto = bool(mapa[bloco])
+        for linha_comando in linhas:
+            dados["linhas"][linha_comando] = dados["linhas"].get(linha_comando, False) or coberto
+        if tipo == "entao":
+            ramo = {"linha": linha, "tipo": "if", "entao": coberto, "senao": False}
+            dados["ramos"].append(ramo)
+            abertos.append(ramo)
+        elif tipo == "senao":
+            abertos.pop()["senao"] = coberto
+        elif tipo == "corpo":
+            dados["ramos"].append({"linha": linha, "tipo": "while", "corpo": coberto})
+
+    for dados in unidades.values():
+        linhas = dados["linhas"]
+        lados = [lado for ramo in dados["ramos"]
+                 for lado in ((ramo["entao"], ramo["senao"]) if ramo["tipo"] == "if"
+                              else (ramo["corpo"],))]
+        dados["linhas"] = dict(sorted(linhas.items()))
+        dados["totais"] = {"linhas": len(linhas), "linhas_cobertas": sum(linhas.values()),
+                           "ramos": len(lados), "ramos_cobertos": sum(lados)}
+    return {"blocos": len(mapa), "blocos_cobertos": sum(1 for m in mapa if m),
+            "unidades": unidades}
+
+
+def _porcentagem(parte, todo):
+    return f"{100.0 * parte / todo:.1f}%" if todo else "-"
+
+
+def formatar(dados):
+    """Relatório legível: totais por unidade e o que não foi executado"""
+    saida = []
+    for unidade, cobertura in dados["unidades"].items():
+        totais = cobertura["totais"]
+        saida.append(f"{unidade}: linhas {totais['linhas_cobertas']}/{totais['linhas']} "
+                     f"({_porcentagem(totais['linhas_cobertas'], totais['linhas'])}), "
+                     f"ramos {totais['ramos_cobertos']}/{totais['ramos']} "
+                     f"({_porcentagem(totais['ramos_cobertos'], totais['ramos'])})")
+        for linha, coberta in cobertura["linhas"].items():
+            if not coberta:
+                saida.append(f"  linha {linha}: não executada")
+        for ramo in cobertura["ramos"]:
+            if ramo["tipo"] == "if":
+                for lado, nome in (("entao", "if"), ("senao", "else")):
+                    if not ramo[lado]:
+                        saida.append(f"  linha {ramo['linha']}: ramo {nome} nunca executado")
+            elif not ramo["corpo"]:
+                saida.append(f"  linha {ramo['linha']}: corpo do while nunca executado")
+    return "\n".join(saida)
@@ -0,0 +1,251 @@
+"""
+Escalonador - Execução concorrente de muitos programas em um único processo
+Fatiamento cooperativo por número de instruções, orçamentos por programa e
+read() assíncrono que suspende só o programa que está esperando
+"""
+
+import asyncio
+import time
+from collections import deque
+
+from .maquina import MaquinaVirtual, FilaEntrada, Estado, ExecutionError, MemoryLimitError
+
+
+class Orcamento:
+    """Limites por programa (None = sem limite)"""
+
+    def __init__(self, instrucoes=None, saida=None, memoria=None):
+        self.instrucoes = instrucoes    # instruções executadas
+        self.saida = saida              # bytes escritos por console.log
+        self.memoria = memoria          # bytes estimados de variáveis, pilha e entrada pendente
+
+
+class Execucao:
+    """Uma instância de programa sob o escalonador"""
+
+    ORCAMENTO_EXCEDIDO = "ORCAMENTO_EXCEDIDO"
+
+    def __init__(self, identificador, maquina, orcamento, escalonador):
+        self.id = identificador
+        self.maquina = maquina
+        self.orcamento = orcamento
+        self.estado = Estado.PRONTO
+        self.erro = None
+        self.bytes_saida = 0
+        self._saida_contada = 0
+        self._escalonador = escalonador
+        self._terminou = asyncio.Event()
+        # Métricas
+        self.fatias = 0
+        self.tempo_cpu = 0.0
+        self.tempo_espera = 0.0
+        self.espera_maxima = 0.0
+        self.criada_em = time.perf_counter()
+        self.terminada_em = None
+        self._pronta_desde = self.criada_em
+
+    @property
+    def saida(self):
+        return self.maquina.saida
+
+    @property
+    def concluida(self):
+        return self.terminada_em is not None
+
+    def fornecer(self, *valores):
+        """Entrega valores para read() e acorda o programa se ele estiver esperando"""
+        self.maquina.entrada.fornecer(*valores)
+        self._escalonador._despertar(self)
+
+    def fechar_entrada(self):
+        """Sinaliza fim da entrada: um read() posterior vira erro de execução"""
+        self.maquina.entrada.fechar()
+        self._escalonador._despertar(self)
+
+    async def aguardar(self):
+        await self._terminou.wait()
+        return self
+
+    def resumo(self):
+        return {
+            "id": self.id,
+            "estado": self.estado,
+            "erro": self.erro,
+            "instrucoes": self.maquina.instrucoes,
+            "bytes_saida": self.bytes_saida,
+            "fatias": self.fatias,
+            "cpu_ms": round(self.tempo_cpu * 1000, 3),
+            "espera_ms": round(self.tempo_espera * 1000, 3),
+        }
+
+
+class Escalonador:
+    """Round-robin cooperativo de programas sobre um loop asyncio"""
+
+    # Quantas fatias executar antes de devolver o controle ao loop de eventos
+    CEDER_A_CADA = 32
+
+    def __init__(self, fatia=1000, orcamento=None):
+        self.fatia = fatia
+        self.orcamento_padrao = orcamento or Orcamento()
+        self.execucoes = []
+        self._prontas = deque()
+        self._aguardando = set()
+        self._alimentadores = []
+        self._acordar = None
+        self._inicio = None
+        self._fim = None
+        self.fatias = 0
+
+    def submeter(self, programa, entrada=None, orcamento=None):
+        """
+        Agenda um ProgramaCompilado.
+
+        'entrada' pode ser uma sequência de valores (entrada fechada), um iterável
+        assíncrono (consumido por uma tarefa alimentadora) ou None (entrada
+        aberta, alimentada depois com Execucao.fornecer).
+        """
+        if entrada is None:
+            fila = FilaEntrada()
+        elif hasattr(entrada, '__aiter__'):
+            fila = FilaEntrada()
+        else:
+            fila = FilaEntrada(entrada, fechada=True)
+        orcamento = orcamento or self.orcamento_padrao
+        # Com orçamento de memória, nenhum inteiro pode passar dele dentro de uma
+        # fatia: a verificação ao fim dela chegaria tarde para 'x = x * x'
+        limite_bits = None if orcamento.memoria is None else orcamento.memoria * 8
+        maquina = MaquinaVirtual(programa, fila, limite_bits=limite_bits)
+        execucao = Execucao(len(self.execucoes), maquina, orcamento, self)
+        self.execucoes.append(execucao)
+        self._prontas.append(execucao)
+        if hasattr(entrada, '__aiter__'):
+            self._alimentadores.append((execucao, entrada))
+        if self._acordar is not None:
+            self._acordar.set()
+        return execucao
+
+    async def _alimentar(self, execucao, fonte):
+        async for valor in fonte:
+            if execucao.concluida:
+                return
+            execucao.fornecer(valor)
+        execucao.fechar_entrada()
+
+    def _despertar(self, execucao):
+        if execucao in self._aguardando:
+            self._aguardando.discard(execucao)
+            execucao.estado = Estado.PRONTO
+            execucao._pronta_desde = time.perf_counter()
+            self._prontas.append(execucao)
+            if self._acordar is not None:
+                self._acordar.set()
+
+    def _finalizar(self, execucao, estado, erro=None):
+        execucao.estado = estado
+        execucao.erro = erro
+        execucao.terminada_em = time.perf_counter()
+        execucao._terminou.set()
+
+    def _rodar_fatia(self, execucao):
+        maquina = execucao.maquina
+        orcamento = execucao.orcamento
+        inicio = time.perf_counter()
+        espera = inicio - execucao._pronta_desde
+        execucao.tempo_espera += espera
+        execucao.espera_maxima = max(execucao.espera_maxima, espera)
+
+        limite = self.fatia
+        if orcamento.instrucoes is not None:
+            limite = max(1, min(limite, orcamento.instrucoes - maquina.instrucoes))
+        try:
+            estado = maquina.executar(limite)
+        except MemoryLimitError:
+            estado, erro = Execucao.ORCAMENTO_EXCEDIDO, "Orçamento de memória excedido"
+        except ExecutionError as e:
+            estado, erro = Estado.ERRO, str(e)
+        except Exception as e:
+            # MemoryError, RecursionError...: falha só deste programa, não do escalonador
+            maquina.estado = Estado.ERRO
+            estado, erro = Estado.ERRO, f"Erro interno: {type(e).__name__}: {e}"
+        else:
+            erro = None
+
+        fim = time.perf_counter()
+        execucao.tempo_cpu += fim - inicio
+        execucao.fatias += 1
+        self.fatias += 1
+
+        # Orçamentos são verificados ao fim de cada fatia
+        saida = maquina.saida
+        for texto in saida[execucao._saida_contada:]:
+            execucao.bytes_saida += len(texto.encode('utf-8')) + 1
+        execucao._saida_contada = len(saida)
+        if estado not in (Estado.FINALIZADO, Estado.ERRO):
+            if orcamento.instrucoes is not None and maquina.instrucoes >= orcamento.instrucoes:
+                estado, erro = Execucao.ORCAMENTO_EXCEDIDO, "Orçamento de instruções excedido"
+            elif orcamento.saida is not None and execucao.bytes_saida > orcamento.saida:
+                estado, erro = Execucao.ORCAMENTO_EXCEDIDO, "Orçamento de saída excedido"
+            elif orcamento.memoria is not None and maquina.memoria() > orcamento.memoria:
+                estado, erro = Execucao.ORCAMENTO_EXCEDIDO, "Orçamento de memória excedido"
+
+        if estado == Estado.PRONTO:
+            execucao._pronta_desde = fim
+            self._prontas.append(execucao)
+        elif estado == Estado.AGUARDANDO_ENTRADA:
+            execucao.estado = estado
+            self._aguardando.add(execucao)
+        else:
+            self._finalizar(execucao, estado, erro)
+
+    async def executar(self):
+        """Executa até todos os programas submetidos terminarem"""
+        self._acordar = asyncio.Event()
+        self._inicio = time.perf_counter()
+        tarefas = []
+        try:
+            while self._prontas or self._aguardando or self._alimentadores:
+                while self._alimentadores:
+                    tarefas.append(asyncio.ensure_future(self._alimentar(*self._alimentadores.pop())))
+                if not self._prontas:
+                    # Todos esperando entrada: dorme até alguém fornecer dados
+                    self._acordar.clear()
+                    await self._acordar.wait()
+                    continue
+                self._rodar_fatia(self._prontas.popleft())
+                if self.fatias % self.CEDER_A_CADA == 0:
+                    await asyncio.sleep(0)
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+            self._fim = time.perf_counter()
+        return self.execucoes
+
+    def metricas(self):
+        """Vazão e justiça do escalonamento"""
+        fim = self._fim or time.perf_counter()
+        duracao = fim - self._inicio if self._inicio else 0.0
+        instrucoes = sum(e.maquina.instrucoes for e in self.execucoes)
+        estados = {}
+        for execucao in self.execucoes:
+            estados[execucao.estado] = estados.get(execucao.estado, 0) + 1
+
+        # Índice de Jain (1.0 = perfeitamente justo) sobre a espera média por fatia:
+        # no round-robin todos os programas ativos esperam o mesmo entre fatias
+        esperas = [e.tempo_espera / e.fatias for e in self.execucoes if e.fatias]
+        justica = None
+        if esperas and any(esperas):
+            justica = sum(esperas) ** 2 / (len(esperas) * sum(t * t for t in esperas))
+
+        return {
+            "programas": len(self.execucoes),
+            "estados": estados,
+            "instrucoes": instrucoes,
+            "fatias": self.fatias,
+            "segundos": round(duracao, 6),
+            "instrucoes_por_segundo": round(instrucoes / duracao) if duracao else None,
+            "programas_por_segundo": round(len(self.execucoes) / duracao, 1) if duracao else None,
+            "justica_jain": round(justica, 4) if justica is not None else None,
+            "espera_media_ms": round(sum(esperas) / len(esperas) * 1000, 3) if esperas else None,
+            "espera_maxima_ms": round(max((e.espera_maxima for e in self.execucoes), default=0) * 1000, 3),
+        }
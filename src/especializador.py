@@ -0,0 +1,496 @@
+"""
+Especializador - Avaliação parcial de programas para entradas conhecidas
+Dado o começo da entrada de read(), produz um programa residual em que as
+leituras conhecidas somem, os valores conhecidos são propagados e dobrados,
+os if decidíveis são resolvidos e os while de número de voltas conhecido são
+desenrolados (dentro de um orçamento de tamanho)
+"""
+
+import math
+from decimal import Decimal
+
+from .arvore import (Programa, Funcao, Atribuicao, Chamada, Leitura, Escrita, Condicional,
+                     Repeticao, Bloco, Binaria, Numero, Variavel, Texto)
+from .gerador import SemanticError
+from .maquina import converter_entrada, dividir_inteiros, resto_inteiros, formatar
+
+
+ARITMETICOS = {"PLUS": "+", "MINUS": "-", "MULT": "*", "DIV": "/", "MOD": "%"}
+RELACIONAIS = {"LT": "<", "GT": ">", "LTE": "<=", "GTE": ">=", "EQ": "==", "NEQ": "!="}
+LOGICOS = {"AND": "&&", "OR": "||"}
+SIMBOLOS = {**ARITMETICOS, **RELACIONAIS, **LOGICOS}
+
+# Maior inteiro escrito como literal (str() recusa inteiros muito grandes)
+BITS_LITERAL = 12000
+
+
+def aplicar(operador, a, b):
+    """Operação binária com a semântica da máquina (erros viram exceções)"""
+    if operador == "PLUS":
+        return a + b
+    if operador == "MINUS":
+        return a - b
+    if operador == "MULT":
+        return a * b
+    if operador in ("DIV", "MOD"):
+        if b == 0:
+            raise ZeroDivisionError
+        if type(a) is int and type(b) is int:
+            return dividir_inteiros(a, b) if operador == "DIV" else resto_inteiros(a, b)
+        return a / b if operador == "DIV" else math.fmod(a, b)
+    if operador == "AND":
+        return 1 if (a and b) else 0
+    if operador == "OR":
+        return 1 if (a or b) else 0
+    return 1 if {"LT": a < b, "GT": a > b, "LTE": a <= b, "GTE": a >= b,
+                 "EQ": a == b, "NEQ": a != b}[operador] else 0
+
+
+def representavel(valor):
+    """O valor pode ser escrito como literal no programa residual?"""
+    if type(valor) is float:
+        return math.isfinite(valor)
+    return valor.bit_length() <= BITS_LITERAL
+
+
+def _mesmo(a, b):
+    """Mesmo valor e mesmo tipo (distingue 1 de 1.0 e 0.0 de -0.0)"""
+    return (type(a) is type(b) and a == b
+            and (type(a) is not float or math.copysign(1, a) == math.copysign(1, b)))
+
+
+def atribuidos(no, nomes=None):
+    """Variáveis atribuídas ou lidas por read() em um comando"""
+    nomes = set() if nomes is None else nomes
+    if isinstance(no, (Atribuicao, Leitura)):
+        nomes.add(no.nome)
+    elif isinstance(no, Condicional):
+        atribuidos(no.entao, nomes)
+        if no.senao is not None:
+            atribuidos(no.senao, nomes)
+    elif isinstance(no, Repeticao):
+        atribuidos(no.corpo, nomes)
+    elif isinstance(no, Bloco):
+        for comando in no.comandos:
+            atribuidos(comando, nomes)
+    return nomes
+
+
+def tamanho(comandos):
+    """Quantidade de comandos, contando os aninhados"""
+    total = 0
+    for no in comandos:
+        total += 1
+        if isinstance(no, Condicional):
+            total += tamanho([no.entao] + ([no.senao] if no.senao is not None else []))
+        elif isinstance(no, Repeticao):
+            total += tamanho([no.corpo])
+        elif isinstance(no, Bloco):
+            total += tamanho(no.comandos) - 1
+    return total
+
+
+class Especializador:
+    """
+    Avaliador parcial da função main de um programa (árvore sintática).
+
+    Cada variável é conhecida (valor em 'valores') ou dinâmica. Atribuições
+    de valores conhecidos não geram código: o valor só é escrito no programa
+    residual ('emitidos' guarda o que a variável tem em tempo de execução)
+    antes de um if ou while dinâmico que a atribua e no fim de seus ramos.
+    Leituras consomem 'entradas' enquanto a ordem delas é estática; depois da
+    primeira leitura residual, as demais também ficam para a execução.
+    Expressões que falhariam (divisão por zero) não são dobradas, para que o
+    erro aconteça na execução, na mesma linha.
+    """
+
+    # Comandos residuais que o desenrolamento de um único while pode gerar
+    ORCAMENTO = 1000
+
+    # Voltas avaliadas ao todo em desenrolamentos (evita laços sem fim)
+    VOLTAS = 200000
+
+    def __init__(self, programa, entradas=(), orcamento=None):
+        self.programa = programa
+        self.entradas = list(entradas)
+        self.orcamento = self.ORCAMENTO if orcamento is None else orcamento
+        self.consumidos = 0
+        self.leitura_dinamica = False
+        self.voltas = 0
+        self.reais = {}
+        self.valores = {}
+        self.emitidos = {}
+        self.leem = self._funcoes_que_leem()
+
+    def _funcoes_que_leem(self):
+        """Funções que executam read(), direta ou indiretamente"""
+        locais = {funcao.nome: funcao for funcao in self.programa.funcoes}
+        chamadas, leem = {}, set()
+
+        def visitar(no, nome):
+            if isinstance(no, Leitura):
+                leem.add(nome)
+            elif isinstance(no, Chamada):
+                chamadas[nome].add(no.nome)
+            elif isinstance(no, Condicional):
+                visitar(no.entao, nome)
+                if no.senao is not None:
+                    visitar(no.senao, nome)
+            elif isinstance(no, Repeticao):
+                visitar(no.corpo, nome)
+            elif isinstance(no, Bloco):
+                for comando in no.comandos:
+                    visitar(comando, nome)
+
+        for nome, funcao in locais.items():
+            chamadas[nome] = set()
+            for comando in funcao.comandos:
+                visitar(comando, nome)
+        # Funções de outras unidades podem ler: supõe-se que leem
+        leem |= {alvo for alvos in chamadas.values() for alvo in alvos if alvo not in locais}
+        mudou = True
+        while mudou:
+            mudou = False
+            for nome, alvos in chamadas.items():
+                if nome not in leem and alvos & leem:
+                    leem.add(nome)
+                    mudou = True
+        return leem
+
+    def especializar(self):
+        """Programa residual (a main especializada; as demais funções intactas)"""
+        funcoes = []
+        principal = None
+        for funcao in self.programa.funcoes:
+            if funcao.nome == "main":
+                principal = funcao
+                funcao = self.funcao(funcao)
+            funcoes.append(funcao)
+        if principal is None:
+            raise SemanticError("Função main não definida", self.programa.linha)
+        return Programa(funcoes, self.programa.linha)
+
+    def funcao(self, no):
+        for declaracao in no.declaracoes:
+            real = declaracao.tipo == "FLOAT"
+            self.reais[declaracao.nome] = real
+            self.valores[declaracao.nome] = self.emitidos[declaracao.nome] = 0.0 if real else 0
+        return Funcao(no.nome, no.parametros, no.declaracoes, self.comandos(no.comandos), no.linha)
+
+    # Estado
+
+    def _estado(self):
+        return (dict(self.valores), dict(self.emitidos), self.consumidos, self.leitura_dinamica)
+
+    def _restaurar(self, estado):
+        valores, emitidos, self.consumidos, self.leitura_dinamica = estado
+        self.valores, self.emitidos = dict(valores), dict(emitidos)
+
+    def _esquecer(self, nomes):
+        for nome in nomes:
+            self.valores.pop(nome, None)
+            self.emitidos.pop(nome, None)
+
+    def materializar(self, nomes, linha):
+        """Atribuições que levam o valor conhecido de 'nomes' para a execução"""
+        residual = []
+        for nome in sorted(nomes):
+            if nome in self.valores and not (
+                    nome in self.emitidos and _mesmo(self.emitidos[nome], self.valores[nome])):
+                residual.append(Atribuicao(nome, Numero(self.valores[nome], linha), linha))
+                self.emitidos[nome] = self.valores[nome]
+        return residual
+
+    def _converter(self, nome, valor):
+        """Conversão feita pelo STORE (None se falharia ou não tem literal)"""
+        try:
+            valor = float(valor) if self.reais.get(nome) else int(valor)
+        except (OverflowError, ValueError):
+            return None
+        return valor if representavel(valor) else None
+
+    # Comandos
+
+    def comandos(self, comandos):
+        residual = []
+        for no in comandos:
+            residual.extend(self.comando(no))
+        return residual
+
+    def comando(self, no):
+        """Comandos residuais de um comando"""
+        if isinstance(no, Atribuicao):
+            return self.atribuicao(no)
+        if isinstance(no, Leitura):
+            return self.leitura(no)
+        if isinstance(no, Escrita):
+            return self.escrita(no)
+        if isinstance(no, Chamada):
+            if no.nome in self.leem:
+                self.leitura_dinamica = True
+            return [Chamada(no.nome, [self.expressao(a) for a in no.argumentos], no.linha)]
+        if isinstance(no, Condicional):
+            return self.condicional(no)
+        if isinstance(no, Repeticao):
+            return self.repeticao(no)
+        if isinstance(no, Bloco):
+            return self.comandos(no.comandos)
+        raise SemanticError(f"Comando não suportado: {type(no).__name__}", no.linha)
+
+    def atribuicao(self, no):
+        expressao = self.expressao(no.expressao)
+        if isinstance(expressao, Numero):
+            valor = self._converter(no.nome, expressao.valor)
+            if valor is not None:
+                self.valores[no.nome] = valor
+                return []
+        self._esquecer([no.nome])
+        return [Atribuicao(no.nome, expressao, no.linha)]
+
+    def leitura(self, no):
+        if not self.leitura_dinamica and self.consumidos < len(self.entradas):
+            try:
+                valor = converter_entrada(self.entradas[self.consumidos],
+                                          self.reais.get(no.nome, False))
+            except ValueError:
+                valor = None        # o erro fica para a execução
+            if valor is not None and representavel(valor):
+                self.consumidos += 1
+                self.valores[no.nome] = valor
+                return []
+        self.leitura_dinamica = True
+        self._esquecer([no.nome])
+        return [Leitura(no.nome, no.linha)]
+
+    def escrita(self, no):
+        expressao = self.expressao(no.expressao)
+        if isinstance(expressao, Numero):
+            try:
+                expressao = Texto(formatar(expressao.valor), expressao.linha)
+            except ValueError:
+                pass
+        return [Escrita(expressao, no.linha)]
+
+    def condicional(self, no):
+        condicao = self.expressao(no.condicao)
+        if isinstance(condicao, Numero):
+            if condicao.valor:
+                return self.comando(no.entao)
+            return self.comando(no.senao) if no.senao is not None else []
+
+        nomes = atribuidos(no)
+        residual = self.materializar(nomes, no.linha)
+        if any(self._le(ramo) for ramo in (no.entao, no.senao) if ramo is not None):
+            self.leitura_dinamica = True
+        antes = self._estado()
+        ramos, estados = [], []
+        for ramo in (no.entao, no.senao):
+            self._restaurar(antes)
+            comandos = self.comando(ramo) if ramo is not None else []
+            comandos += self.materializar(nomes, no.linha)
+            ramos.append(Bloco(comandos, ramo.linha if ramo is not None else no.linha))
+            estados.append(self._estado())
+
+        # Junção: só continua conhecido o que é igual nos dois ramos
+        (valores, emitidos, consumidos, _), (outros, outros_emitidos, _, _) = estados
+        self.valores = {nome: valor for nome, valor in valores.items()
+                        if nome in outros and _mesmo(valor, outros[nome])}
+        self.emitidos = {nome: valor for nome, valor in emitidos.items()
+                         if nome in outros_emitidos and _mesmo(valor, outros_emitidos[nome])}
+        self.consumidos = consumidos
+        senao = ramos[1] if no.senao is not None or ramos[1].comandos else None
+        residual.append(Condicional(condicao, ramos[0], senao, no.linha))
+        return residual
+
+    def repeticao(self, no):
+        desenrolado = self.desenrolar(no)
+        if desenrolado is not None:
+            return desenrolado
+
+        # Laço residual: o que ele atribui é dinâmico na cabeça
+        nomes = atribuidos(no)
+        residual = self.materializar(nomes, no.linha)
+        if self._le(no.corpo):
+            self.leitura_dinamica = True
+        self._esquecer(nomes)
+        condicao = self.expressao(no.condicao)
+        corpo = self.comando(no.corpo) + self.materializar(nomes, no.linha)
+        self._esquecer(nomes)
+        residual.append(Repeticao(condicao, Bloco(corpo, no.corpo.linha), no.linha))
+        return residual
+
+    def desenrolar(self, no):
+        """Corpo repetido enquanto a condição é conhecida (None se não couber)"""
+        antes = self._estado()
+        residual = []
+        while True:
+            condicao = self.expressao(no.condicao)
+            if (not isinstance(condicao, Numero) or self.voltas >= self.VOLTAS
+                    or tamanho(residual) > self.orcamento):
+                self._restaurar(antes)
+                return None
+            if not condicao.valor:
+                return residual
+            self.voltas += 1
+            residual.extend(self.comando(no.corpo))
+
+    def _le(self, no):
+        """O comando pode executar read()?"""
+        if isinstance(no, Leitura):
+            return True
+        if isinstance(no, Chamada):
+            return no.nome in self.leem
+        if isinstance(no, Condicional):
+            return self._le(no.entao) or (no.senao is not None and self._le(no.senao))
+        if isinstance(no, Repeticao):
+            return self._le(no.corpo)
+        if isinstance(no, Bloco):
+            return any(self._le(comando) for comando in no.comandos)
+        return False
+
+    # Expressões
+
+    def expressao(self, no):
+        """Expressão residual; um Numero quando o valor é conhecido"""
+        if isinstance(no, Variavel):
+            if no.nome in self.valores:
+                return Numero(self.valores[no.nome], no.linha)
+            return no
+        if not isinstance(no, Binaria):
+            return no
+        esquerda = self.expressao(no.esquerda)
+        direita = self.expressao(no.direita)
+        if isinstance(esquerda, Numero) and isinstance(direita, Numero):
+            try:
+                valor = aplicar(no.operador, esquerda.valor, direita.valor)
+            except (ArithmeticError, ValueError):
+                valor = None
+            if valor is not None and representavel(valor):
+                return Numero(valor, no.linha)
+        # && e || avaliam os dois lados: só dá para descartar um lado que não falha
+        for conhecido, outro in ((esquerda, direita), (direita, esquerda)):
+            if not isinstance(conhecido, Numero) or no.operador not in LOGICOS:
+                continue
+            if (isinstance(outro, Binaria) and outro.operador not in ARITMETICOS
+                    and bool(conhecido.valor) == (no.operador == "AND")):
+                return outro        # 1 && (a < b) é (a < b), que já vale 0 ou 1
+            if self._infalivel(outro):
+                if no.operador == "AND" and not conhecido.valor:
+                    return Numero(0, no.linha)
+                if no.operador == "OR" and conhecido.valor:
+                    return Numero(1, no.linha)
+        return Binaria(no.operador, esquerda, direita, no.linha)
+
+    def _tipo(self, no):
+        if isinstance(no, Numero):
+            return type(no.valor)
+        if isinstance(no, Variavel):
+            return float if self.reais.get(no.nome) else int
+        if no.operador not in ARITMETICOS:
+            return int
+        return float if float in (self._tipo(no.esquerda), self._tipo(no.direita)) else int
+
+    def _infalivel(self, no):
+        """Sem divisões nem mistura de int com float (que pode estourar)"""
+        if not isinstance(no, Binaria):
+            return True
+        if no.operador in ("DIV", "MOD"):
+            return False
+        if no.operador in ARITMETICOS and self._tipo(no.esquerda) is not self._tipo(no.direita):
+            return False
+        return self._infalivel(no.esquerda) and self._infalivel(no.direita)
+
+
+def especializar(programa, entradas, orcamento=None):
+    """
+    Avalia parcialmente 'programa' (árvore sintática) com os primeiros
+    valores de entrada conhecidos. Devolve (programa residual, quantidade de
+    valores consumidos); o residual deve receber o restante da entrada.
+    """
+    especializador = Especializador(programa, entradas, orcamento)
+    residual = especializador.especializar()
+    return residual, especializador.consumidos
+
+
+# Código-fonte
+
+def _literal(valor):
+    """Literal da linguagem (que não tem menos unário nem expoente)"""
+    if type(valor) is int:
+        return str(valor) if valor >= 0 else f"(0 - {-valor})"
+    if math.copysign(1, valor) < 0:
+        return f"(0.0 - {_literal(-valor)})" if valor else "(0.0 * (0.0 - 1.0))"
+    texto = repr(valor)
+    if 'e' in texto:
+        texto = format(Decimal(valor), 'f')
+    return texto if '.' in texto else texto + ".0"
+
+
+def _texto(valor):
+    escapes = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+    return '"' + "".join(escapes.get(c, c) for c in valor) + '"'
+
+
+def _expressao(no, topo=False):
+    if isinstance(no, Numero):
+        return _literal(no.valor)
+    if isinstance(no, Variavel):
+        return no.nome
+    if isinstance(no, Texto):
+        return _texto(no.valor)
+    texto = f"{_expressao(no.esquerda)} {SIMBOLOS[no.operador]} {_expressao(no.direita)}"
+    return texto if topo else f"({texto})"
+
+
+def _comando(no, nivel, linhas):
+    recuo = "    " * nivel
+    if isinstance(no, Atribuicao):
+        # Atribuições aceitam só expressões aritméticas sem parênteses externos
+        topo = isinstance(no.expressao, Binaria) and no.expressao.operador in ARITMETICOS
+        linhas.append(f"{recuo}{no.nome} = {_expressao(no.expressao, topo)};")
+    elif isinstance(no, Chamada):
+        argumentos = ", ".join(_expressao(a) for a in no.argumentos)
+        linhas.append(f"{recuo}{no.nome}({argumentos});")
+    elif isinstance(no, Leitura):
+        linhas.append(f"{recuo}read({no.nome});")
+    elif isinstance(no, Escrita):
+        # console.log(ID ...) só aceita o ID sozinho: expressões vão entre parênteses
+        linhas.append(f"{recuo}console.log({_expressao(no.expressao)});")
+    elif isinstance(no, Condicional):
+        linhas.append(f"{recuo}if ({_expressao(no.condicao, True)}) {{")
+        _bloco(no.entao, nivel, linhas)
+        if no.senao is not None:
+            linhas.append(f"{recuo}}} else {{")
+            _bloco(no.senao, nivel, linhas)
+        linhas.append(f"{recuo}}}")
+    elif isinstance(no, Repeticao):
+        linhas.append(f"{recuo}while ({_expressao(no.condicao, True)}) {{")
+        _bloco(no.corpo, nivel, linhas)
+        linhas.append(f"{recuo}}}")
+    elif isinstance(no, Bloco):
+        linhas.append(f"{recuo}{{")
+        _bloco(no, nivel, linhas)
+        linhas.append(f"{recuo}}}")
+
+
+def _bloco(no, nivel, linhas):
+    for comando in (no.comandos if isinstance(no, Bloco) else [no]):
+        _comando(comando, nivel + 1, linhas)
+
+
+def gerar_fonte(programa):
+    """Código-fonte MiniLanguage de uma árvore sintática"""
+    tipos = {"NUMBER": "number", "FLOAT": "float"}
+    linhas = []
+    for funcao in programa.funcoes:
+        if linhas:
+            linhas.append("")
+        parametros = ", ".join(f"{p.nome}: {tipos[p.tipo]}" for p in funcao.parametros)
+        linhas.append(f"function {funcao.nome}({parametros}) {{")
+        for declaracao in funcao.declaracoes:
+            palavra = "const" if declaracao.constante else "let"
+            linhas.append(f"    {palavra} {declaracao.nome}: {tipos[declaracao.tipo]};")
+        for comando in funcao.comandos:
+            _comando(comando, 1, linhas)
+        linhas.append("}")
+    return "\n".join(linhas) + "\n"
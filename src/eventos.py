@@ -0,0 +1,159 @@
+"""
+Eventos - Análise sintática dirigida a eventos (estilo SAX)
+Usa as mesmas produções do Parser, mas lê os tokens em fluxo e não guarda a
+árvore: quem precisa só contar construções, extrair nomes ou verificar uma
+propriedade recebe eventos de entrada e saída de cada não terminal e de cada
+terminal consumido, numa única passada junto com a validação
+"""
+
+from collections import deque
+
+from .token_types import Token, TokenType
+from .parser import Parser
+
+
+class ParserEventos(Parser):
+    """
+    Parser que emite eventos em vez de devolver a árvore.
+
+    Inscrições (antes de parse()):
+        ao_entrar(f, *producoes)   f(producao, inicio)
+        ao_sair(f, *producoes)     f(producao, inicio, fim)
+        ao_consumir(f, *tipos)     f(token)
+    Sem producoes/tipos, a inscrição vale para todos. 'inicio' é o primeiro
+    token da produção e 'fim' o último consumido por ela (numa produção vazia,
+    o token anterior a 'inicio').
+
+    Só as produções com inscritos são interceptadas; as demais são os métodos
+    do Parser, sem custo extra. Os tokens podem vir de um gerador
+    (Lexer.gerar_tokens) e, como as listas de funções, declarações e comandos
+    não são guardadas, a memória não cresce com o tamanho do programa.
+    """
+
+    PRODUCOES = ('programa', 'funcao', 'parametros', 'parametro', 'corpo', 'declaracoes',
+                 'declaracao', 'tipo', 'comandos', 'comando', 'atribuicao', 'chamada',
+                 'argumentos', 'leitura', 'escrita', 'condicional', 'repeticao', 'blocoInterno',
+                 'expressaoAritmetica', 'termo', 'fator', 'expressaoRelacional',
+                 'termoRelacional', 'operadorRelacional')
+
+    def __init__(self, tokens):
+        self._fluxo = iter(tokens)
+        self._adiante = deque()
+        self._fim = None
+        self._ultimo = None
+        self._entradas = {}
+        self._saidas = {}
+        self._terminais = {}
+        self.anterior = None
+        self.current_token = self._proximo()
+
+    def _proximo(self):
+        if self._adiante:
+            return self._adiante.popleft()
+        return self._ler_fluxo()
+
+    def _ler_fluxo(self):
+        """Próximo token do fluxo, ignorando o buffer de peek_token"""
+        if self._fim is None:
+            token = next(self._fluxo, None)
+            if token is not None and token.tipo != TokenType.EOF:
+                self._ultimo = token
+                return token
+            # Fluxo sem EOF: cria um depois do último token, como o Parser
+            if token is None:
+                ultimo = self._ultimo
+                token = Token(TokenType.EOF, "EOF", ultimo.linha if ultimo else 1,
+                              ultimo.coluna + 1 if ultimo else 1)
+            self._fim = token
+        return self._fim
+
+    def advance(self):
+        """Consome o token atual e lê o próximo do fluxo"""
+        if self.current_token.tipo != TokenType.EOF:
+            self.anterior = self.current_token
+            self.current_token = self._proximo()
+
+    def _avancar_com_eventos(self):
+        token = self.current_token
+        if token.tipo != TokenType.EOF:
+            for evento in self._terminais.get(token.tipo, ()):
+                evento(token)
+            for evento in self._terminais.get(None, ()):
+                evento(token)
+        ParserEventos.advance(self)
+
+    def peek_token(self, offset=1):
+        """Visualiza token à frente sem consumir"""
+        while len(self._adiante) < offset and self._fim is None:
+            token = self._ler_fluxo()
+            if token.tipo == TokenType.EOF:
+                break
+            self._adiante.append(token)
+        if offset <= len(self._adiante):
+            return self._adiante[offset - 1]
+        return self._fim
+
+    # Inscrições
+
+    def ao_entrar(self, evento, *producoes):
+        for producao in self._producoes(producoes):
+            self._entradas.setdefault(producao, []).append(evento)
+            self._interceptar(producao)
+        return self
+
+    def ao_sair(self, evento, *producoes):
+        for producao in self._producoes(producoes):
+            self._saidas.setdefault(producao, []).append(evento)
+            self._interceptar(producao)
+        return self
+
+    def ao_consumir(self, evento, *tipos):
+        for tipo in tipos or (None,):
+            self._terminais.setdefault(tipo, []).append(evento)
+        self.advance = self._avancar_com_eventos
+        return self
+
+    def _producoes(self, producoes):
+        for producao in producoes:
+            if producao not in self.PRODUCOES:
+                raise ValueError(f"Produção desconhecida: {producao}")
+        return producoes or self.PRODUCOES
+
+    def _interceptar(self, producao):
+        """Troca a produção, só nesta instância, por uma que emite os eventos"""
+        if producao in vars(self):
+            return
+        original = getattr(type(self), producao).__get__(self)
+        entradas = self._entradas.setdefault(producao, [])
+        saidas = self._saidas.setdefault(producao, [])
+
+        def interceptada(*argumentos):
+            inicio = self.current_token
+            for evento in entradas:
+                evento(producao, inicio)
+            resultado = original(*argumentos)
+            for evento in saidas:
+                evento(producao, inicio, self.anterior)
+            return resultado
+
+        setattr(self, producao, interceptada)
+
+    # Produções que acumulariam a árvore inteira
+
+    def programa(self):
+        """programa : funcao { funcao } — as funções não são guardadas"""
+        self.funcao()
+        while self.match(TokenType.FUNCTION):
+            self.funcao()
+
+    def declaracoes(self):
+        """declaracoes : declaracao declaracoes | ε"""
+        while self.match(TokenType.LET, TokenType.CONST):
+            self.declaracao()
+        return []
+
+    def comandos(self):
+        """comandos : comando comandos | ε"""
+        while self.match(*self.INICIO_COMANDO):
+            self.comando()
+        return []
@@ -0,0 +1,260 @@
+"""
+Gerador - Geração de código para a máquina de pilha
+Percorre a árvore sintática e produz um ProgramaCompilado
+"""
+
+from .arvore import (Atribuicao, Chamada, Leitura, Escrita, Condicional, Repeticao, Bloco,
+                     Binaria, Numero, Variavel, Texto)
+from .instrucoes import OpCode, OPERADORES_BINARIOS, FuncaoCompilada, ObjetoCompilado
+from .analise import AnaliseIntervalos, DIVISOR_NAO_NULO, MESMO_SINAL
+
+# Divisões sem verificação, pelo que a análise provou
+DIVISOES = {("DIV", DIVISOR_NAO_NULO): OpCode.DIV_NC, ("MOD", DIVISOR_NAO_NULO): OpCode.MOD_NC,
+            ("DIV", MESMO_SINAL): OpCode.IDIV, ("MOD", MESMO_SINAL): OpCode.IMOD}
+
+
+class SemanticError(Exception):
+    """Exceção de erro semântico"""
+    def __init__(self, message, linha):
+        self.message = message
+        self.linha = linha
+
+    def __str__(self):
+        return f"Erro Semântico na linha {self.linha}: {self.message}"
+
+
+class GeradorCodigo:
+    """
+    Gera instruções de pilha a partir da árvore sintática de uma unidade.
+
+    'interfaces' traz as funções das outras unidades (nome -> tipos dos
+    parâmetros), usadas para verificar as chamadas durante a compilação.
+    Com 'instrumentar', cada bloco básico começa com MARK para a cobertura.
+    Com 'otimizar' (e sem cobertura), a análise de intervalos de cada função
+    troca as verificações provadas desnecessárias por instruções sem
+    verificação e remove os desvios de condição constante; o que foi
+    eliminado fica em analise.resumo().
+    """
+
+    def __init__(self, interfaces=None, instrumentar=False, otimizar=False):
+        self.interfaces = dict(interfaces or {})
+        self.instrumentar = instrumentar
+        self.analise = AnaliseIntervalos() if otimizar and not instrumentar else None
+        self.blocos = []                # [tipo, linha, linhas dos comandos] por MARK
+        self.bloco_atual = None
+        self.juncao = None              # bloco após if/while, aberto no próximo comando
+        self.ops = []
+        self.args = []
+        self.linhas = []
+        self.constantes = []
+        self._indice_constantes = {}
+        self.funcoes = []
+        self.externos = []
+        self._indice_externos = {}
+        self.slots = {}
+        self.variaveis = []
+        self.tipos = []
+
+    def gerar(self, programa, unidade="<programa>"):
+        """Gera o código de todas as funções da unidade"""
+        locais = {}
+        for funcao in programa.funcoes:
+            if funcao.nome in locais:
+                raise SemanticError(f"Função '{funcao.nome}' já definida", funcao.linha)
+            locais[funcao.nome] = [p.tipo for p in funcao.parametros]
+        self.interfaces.update(locais)
+
+        for funcao in programa.funcoes:
+            self.funcao(funcao)
+        return ObjetoCompilado(unidade, self.ops, self.args, self.linhas, self.constantes,
+                               self.funcoes, self.externos, self.blocos)
+
+    def funcao(self, no):
+        if no.nome == "main" and no.parametros:
+            raise SemanticError("A função main não recebe parâmetros", no.linha)
+        self.slots = {}
+        self.variaveis = []
+        self.tipos = []
+        entrada = len(self.ops)
+        for declaracao in no.parametros + no.declaracoes:
+            self.declarar(declaracao)
+        if self.analise is not None:
+            self.analise.funcao(no)
+        self.marcar("funcao", no.linha)
+        for comando in no.comandos:
+            self.comando(comando)
+        self.juncao = self.bloco_atual = None
+        ultima = self.linhas[-1] if len(self.ops) > entrada else no.linha
+        self.emitir(OpCode.HALT if no.nome == "main" else OpCode.RET, 0, ultima)
+        self.funcoes.append(FuncaoCompilada(no.nome, entrada, len(no.parametros),
+                                            self.variaveis, self.tipos))
+
+    # Utilitários
+
+    def emitir(self, op, arg, linha):
+        """Acrescenta uma instrução e devolve sua posição"""
+        self.ops.append(op)
+        self.args.append(arg)
+        self.linhas.append(linha)
+        return len(self.ops) - 1
+
+    def corrigir(self, pc, alvo):
+        """Preenche o destino de um salto emitido antes do rótulo existir"""
+        self.args[pc] = alvo
+
+    def marcar(self, tipo, linha):
+        """Início de bloco básico: emite MARK quando a cobertura está ligada"""
+        if self.instrumentar:
+            self.juncao = None
+            self.bloco_atual = len(self.blocos)
+            self.blocos.append([tipo, linha, []])
+            self.emitir(OpCode.MARK, self.bloco_atual, linha)
+
+    def constante(self, valor):
+        """Índice de 'valor' na tabela de constantes (sem duplicatas)"""
+        # O tipo faz parte da chave para não confundir 1 com 1.0
+        chave = (type(valor), valor)
+        if chave not in self._indice_constantes:
+            self._indice_constantes[chave] = len(self.constantes)
+            self.constantes.append(valor)
+        return self._indice_constantes[chave]
+
+    def declarar(self, declaracao):
+        if declaracao.nome in self.slots:
+            raise SemanticError(f"Variável '{declaracao.nome}' já declarada", declaracao.linha)
+        self.slots[declaracao.nome] = len(self.variaveis)
+        self.variaveis.append(declaracao.nome)
+        self.tipos.append(declaracao.tipo)
+
+    def externo(self, nome):
+        """Índice de 'nome' na tabela de funções chamadas pela unidade"""
+        if nome not in self._indice_externos:
+            self._indice_externos[nome] = len(self.externos)
+            self.externos.append((nome, self.interfaces[nome]))
+        return self._indice_externos[nome]
+
+    def fato(self, tabela, no, padrao=None):
+        """O que a análise provou sobre o nó ('padrao' sem análise ou sem prova)"""
+        if self.analise is None:
+            return padrao
+        return getattr(self.analise, tabela).get(no, padrao)
+
+    def slot(self, nome, linha):
+        if nome not in self.slots:
+            raise SemanticError(f"Variável '{nome}' não declarada", linha)
+        return self.slots[nome]
+
+    # Comandos
+
+    def comando(self, no):
+        if self.juncao is not None and not isinstance(no, Bloco):
+            self.marcar("juncao", self.juncao)
+        if self.bloco_atual is not None and not isinstance(no, Bloco):
+            linhas = self.blocos[self.bloco_atual][2]
+            if no.linha not in linhas:
+                linhas.append(no.linha)
+        if isinstance(no, Atribuicao):
+            self.expressao(no.expressao)
+            op = OpCode.STORE_RAW if self.fato("atribuicoes", no, False) else OpCode.STORE
+            self.emitir(op, self.slot(no.nome, no.linha), no.linha)
+        elif isinstance(no, Chamada):
+            self.chamada(no)
+        elif isinstance(no, Leitura):
+            self.emitir(OpCode.READ, self.slot(no.nome, no.linha), no.linha)
+        elif isinstance(no, Escrita):
+            self.expressao(no.expressao)
+            self.emitir(OpCode.WRITE, 0, no.linha)
+        elif isinstance(no, Condicional):
+            self.condicional(no)
+        elif isinstance(no, Repeticao):
+            self.repeticao(no)
+        elif isinstance(no, Bloco):
+            for comando in no.comandos:
+                self.comando(comando)
+        else:
+            raise SemanticError(f"Comando não suportado: {type(no).__name__}", no.linha)
+
+    def chamada(self, no):
+        """argumentos...; CALL funcao (os argumentos são convertidos na entrada)"""
+        if no.nome not in self.interfaces:
+            raise SemanticError(f"Função '{no.nome}' não definida", no.linha)
+        esperados = len(self.interfaces[no.nome])
+        if len(no.argumentos) != esperados:
+            raise SemanticError(f"Função '{no.nome}' espera {esperados} argumento(s), "
+                                f"recebeu {len(no.argumentos)}", no.linha)
+        for argumento in no.argumentos:
+            self.expressao(argumento)
+        self.emitir(OpCode.CALL, self.externo(no.nome), no.linha)
+
+    def condicional(self, no):
+        """cond; JUMP_FALSE senao; entao; [JUMP fim; senao: ...] fim:"""
+        decisao = self.fato("condicoes", no)
+        if decisao is not None:
+            # Condição constante (que não pode falhar): só o ramo tomado
+            ramo = no.entao if decisao else no.senao
+            if ramo is not None:
+                self.comando(ramo)
+            return
+        self.expressao(no.condicao)
+        salto_senao = self.emitir(OpCode.JUMP_FALSE, 0, no.linha)
+        self.marcar("entao", no.linha)
+        self.comando(no.entao)
+        if no.senao is None and not self.instrumentar:
+            self.corrigir(salto_senao, len(self.ops))
+        else:
+            # Instrumentado, um if sem else ganha um senao vazio só com MARK
+            salto_fim = self.emitir(OpCode.JUMP, 0, no.linha)
+            self.corrigir(salto_senao, len(self.ops))
+            self.marcar("senao", no.linha)
+            if no.senao is not None:
+                self.comando(no.senao)
+            self.corrigir(salto_fim, len(self.ops))
+        if self.instrumentar:
+            self.juncao = no.linha
+
+    def repeticao(self, no):
+        """cabeca: cond; JUMP_FALSE fim; corpo; LOOP cabeca; fim:"""
+        if self.fato("condicoes", no) is False:
+            return      # nunca executa
+        cabeca = len(self.ops)
+        self.expressao(no.condicao)
+        salto_fim = self.emitir(OpCode.JUMP_FALSE, 0, no.linha)
+        self.marcar("corpo", no.linha)
+        self.comando(no.corpo)
+        self.emitir(OpCode.LOOP, cabeca, no.linha)
+        self.corrigir(salto_fim, len(self.ops))
+        if self.instrumentar:
+            self.juncao = no.linha
+
+    # Expressões
+
+    def expressao(self, no):
+        if isinstance(no, Binaria):
+            self.expressao(no.esquerda)
+            self.expressao(no.direita)
+            op = DIVISOES.get((no.operador, self.fato("divisoes", no)),
+                              OPERADORES_BINARIOS[no.operador])
+            self.emitir(op, 0, no.linha)
+        elif isinstance(no, Variavel):
+            self.emitir(OpCode.LOAD, self.slot(no.nome, no.linha), no.linha)
+        elif isinstance(no, (Numero, Texto)):
+            self.emitir(OpCode.CONST, self.constante(no.valor), no.linha)
+        else:
+            raise SemanticError(f"Expressão não suportada: {type(no).__name__}", no.linha)
+
+
+def compilar_unidade(codigo_fonte, unidade="<programa>", interfaces=None, instrumentar=False,
+                     otimizar=False):
+    """Lexer + Parser + Gerador: do código-fonte ao ObjetoCompilado"""
+    from .lexer import Lexer
+    from .parser import Parser
+
+    arvore = Parser(Lexer(codigo_fonte).tokenize()).parse()
+    return GeradorCodigo(interfaces, instrumentar, otimizar).gerar(arvore, unidade)
+
+
+def compilar_programa(codigo_fonte, instrumentar=False, otimizar=False):
+    """Compila e liga um programa de um único arquivo"""
+    from .ligador import ligar
+
+    return ligar([compilar_unidade(codigo_fonte, instrumentar=instrumentar, otimizar=otimizar)])
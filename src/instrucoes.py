@@ -0,0 +1,195 @@
+"""
+Instruções - Conjunto de instruções da máquina de pilha e programa compilado
+Não depende do lexer nem do parser: é tudo o que a máquina virtual precisa
+"""
+
+import hashlib
+
+
+class OpCode:
+    # Pilha e variáveis
+    CONST = 0           # empilha constantes[arg]
+    LOAD = 1            # empilha a variável arg
+    STORE = 2           # desempilha para a variável arg (converte para o tipo declarado)
+
+    # Operadores aritméticos
+    ADD = 3
+    SUB = 4
+    MUL = 5
+    DIV = 6             # verifica divisão por zero
+    MOD = 7             # verifica divisão por zero
+
+    # Operadores relacionais (empilham 1 ou 0)
+    LT = 8
+    GT = 9
+    LTE = 10
+    GTE = 11
+    EQ = 12
+    NEQ = 13
+
+    # Operadores lógicos (avaliam os dois lados)
+    AND = 14
+    OR = 15
+
+    # Controle de fluxo
+    JUMP = 16           # salto incondicional para frente
+    JUMP_FALSE = 17     # desempilha e salta se falso
+    LOOP = 18           # salto para trás (aresta de retorno de um while)
+    CALL = 22           # chama a função arg (desempilha os argumentos)
+    RET = 23            # retorna ao chamador
+
+    # Entrada e saída
+    READ = 19           # lê um valor da entrada para a variável arg
+    WRITE = 20          # desempilha e escreve na saída
+
+    HALT = 21
+
+    # Cobertura
+    MARK = 24           # marca o bloco básico arg como executado
+
+    # Variantes sem verificação, usadas onde a análise de intervalos
+    # (src/analise.py) provou que a verificação nunca falha
+    STORE_RAW = 25      # o valor já tem o tipo da variável arg: sem conversão
+    DIV_NC = 26         # divisor nunca é zero
+    MOD_NC = 27         # divisor nunca é zero
+    IDIV = 28           # inteiros de mesmo sinal, divisor não nulo: a // b
+    IMOD = 29           # inteiros de mesmo sinal, divisor não nulo: a % b
+
+
+# Nome de cada opcode, indexado pelo valor numérico
+NOMES = {valor: nome for nome, valor in vars(OpCode).items() if not nome.startswith('_')}
+
+# Opcodes binários de expressão, por TokenType do operador
+OPERADORES_BINARIOS = {
+    "PLUS": OpCode.ADD, "MINUS": OpCode.SUB, "MULT": OpCode.MUL,
+    "DIV": OpCode.DIV, "MOD": OpCode.MOD,
+    "LT": OpCode.LT, "GT": OpCode.GT, "LTE": OpCode.LTE,
+    "GTE": OpCode.GTE, "EQ": OpCode.EQ, "NEQ": OpCode.NEQ,
+    "AND": OpCode.AND, "OR": OpCode.OR,
+}
+
+
+class FuncaoCompilada:
+    """Entrada da tabela de funções: onde começa e como é o quadro de variáveis"""
+
+    def __init__(self, nome, entrada, parametros, variaveis, tipos):
+        self.nome = nome
+        self.entrada = entrada          # pc da primeira instrução
+        self.parametros = parametros    # os primeiros slots recebem os argumentos
+        self.variaveis = variaveis      # nomes das variáveis, indexados pelo slot
+        self.tipos = tipos              # TokenType.NUMBER ou TokenType.FLOAT por slot
+
+    def como_dict(self):
+        return {"nome": self.nome, "entrada": self.entrada, "parametros": self.parametros,
+                "variaveis": self.variaveis, "tipos": self.tipos}
+
+    @classmethod
+    def de_dict(cls, dados):
+        return cls(dados["nome"], dados["entrada"], dados["parametros"],
+                   dados["variaveis"], dados["tipos"])
+
+
+class ObjetoCompilado:
+    """
+    Resultado da compilação separada de uma unidade (arquivo).
+
+    Saltos e entradas de função são relativos à unidade; o argumento de CALL
+    indexa 'externos', a lista de (nome, tipos dos parâmetros) esperados, que
+    o ligador resolve contra as funções de todas as unidades. 'blocos' só
+    existe em código instrumentado: [tipo, linha, linhas dos comandos] por MARK.
+    """
+
+    def __init__(self, unidade, ops, args, linhas, constantes, funcoes, externos, blocos=()):
+        self.unidade = unidade
+        self.ops = ops
+        self.args = args
+        self.linhas = linhas
+        self.constantes = constantes
+        self.funcoes = funcoes
+        self.externos = externos
+        self.blocos = list(blocos)
+
+    def definidas(self):
+        """Interface exportada: nome -> tipos dos parâmetros"""
+        return {f.nome: f.tipos[:f.parametros] for f in self.funcoes}
+
+    def usadas(self):
+        """Nomes de funções chamadas e definidas em outras unidades"""
+        locais = {f.nome for f in self.funcoes}
+        return sorted({nome for nome, _ in self.externos} - locais)
+
+    def como_dict(self):
+        return {"unidade": self.unidade, "ops": self.ops, "args": self.args,
+                "linhas": self.linhas, "constantes": self.constantes,
+                "funcoes": [f.como_dict() for f in self.funcoes],
+                "externos": [[nome, tipos] for nome, tipos in self.externos],
+                "blocos": self.blocos}
+
+    @classmethod
+    def de_dict(cls, dados):
+        return cls(dados["unidade"], dados["ops"], dados["args"], dados["linhas"],
+                   dados["constantes"], [FuncaoCompilada.de_dict(f) for f in dados["funcoes"]],
+                   [(nome, tipos) for nome, tipos in dados["externos"]],
+                   dados.get("blocos", ()))
+
+
+class ProgramaCompilado:
+    """
+    Programa ligado, pronto para a máquina virtual.
+
+    As instruções ficam em duas sequências paralelas (ops[pc], args[pc]) para
+    que possam ser tanto listas quanto buffers (memoryview) sem cópia.
+    """
+
+    def __init__(self, ops, args, constantes, funcoes, linhas, principal=0, blocos=()):
+        self.ops = ops
+        self.args = args
+        self.constantes = constantes
+        self.funcoes = funcoes          # tabela de FuncaoCompilada (argumento de CALL)
+        self.linhas = linhas            # linha do código-fonte de cada instrução
+        self.principal = principal      # índice da função main
+        self.blocos = list(blocos)      # (unidade, tipo, linha, linhas) por MARK (cobertura)
+        self.compilados = {}            # laços compilados pelo JIT, por pc da cabeça
+
+    def __len__(self):
+        return len(self.ops)
+
+    def impressao_digital(self):
+        """Hash do código e das tabelas: identifica o programa em checkpoints"""
+        conteudo = repr((list(self.ops), list(self.args), list(self.constantes),
+                         [f.como_dict() for f in self.funcoes], self.principal,
+                         [list(bloco) for bloco in self.blocos]))
+        return hashlib.sha256(conteudo.encode('utf-8')).digest()
+
+    def funcao_em(self, pc):
+        """Função cujo código contém a instrução pc"""
+        melhor = None
+        for funcao in self.funcoes:
+            if funcao.entrada <= pc and (melhor is None or funcao.entrada > melhor.entrada):
+                melhor = funcao
+        return melhor
+
+    def linha(self, pc):
+        """Linha do código-fonte da instrução pc"""
+        if 0 <= pc < len(self.linhas):
+            return self.linhas[pc]
+        return None
+
+    def desmontar(self):
+        """Listagem legível das instruções (para depuração)"""
+        saida = []
+        for pc in range(len(self.ops)):
+            op, arg = self.ops[pc], self.args[pc]
+            texto = f"{pc:5d}  {NOMES[op]:<10}"
+            if any(f.entrada == pc for f in self.funcoes):
+                saida.append(f"{self.funcao_em(pc).nome}:")
+            if op == OpCode.CONST:
+                texto += f" {self.constantes[arg]!r}"
+            elif op in (OpCode.LOAD, OpCode.STORE, OpCode.STORE_RAW, OpCode.READ):
+                texto += f" {self.funcao_em(pc).variaveis[arg]}"
+            elif op in (OpCode.JUMP, OpCode.JUMP_FALSE, OpCode.LOOP, OpCode.MARK):
+                texto += f" {arg}"
+            elif op == OpCode.CALL:
+                texto += f" {self.funcoes[arg].nome}"
+            saida.append(f"{texto:<32} ; linha {self.linhas[pc]}")
+        return "\n".join(saida)
@@ -0,0 +1,328 @@
+"""
+JIT - Segundo nível de execução: laços quentes viram funções Python
+A máquina virtual conta as arestas de retorno (LOOP) e, quando um while passa
+do limiar, o trecho de instruções do laço é traduzido para código Python
+estruturado (while/if nativos, variáveis em locais) e executado no lugar do
+interpretador, com o mesmo estado e a mesma contagem de instruções
+"""
+
+import math
+
+from .instrucoes import OpCode
+from .maquina import dividir_inteiros, resto_inteiros
+
+
+class NaoCompilavel(Exception):
+    """Trecho que o JIT não traduz (chamadas, retornos, fluxo não estruturado)"""
+
+
+ARITMETICOS = {OpCode.ADD: "+", OpCode.SUB: "-", OpCode.MUL: "*"}
+RELACIONAIS = {OpCode.LT: "<", OpCode.GT: ">", OpCode.LTE: "<=",
+               OpCode.GTE: ">=", OpCode.EQ: "==", OpCode.NEQ: "!="}
+LOGICOS = {OpCode.AND: "&", OpCode.OR: "|"}
+# Divisões: (é resto, verifica o divisor, inteiros de mesmo sinal)
+DIVISOES = {OpCode.DIV: (False, True, False), OpCode.MOD: (True, True, False),
+            OpCode.DIV_NC: (False, False, False), OpCode.MOD_NC: (True, False, False),
+            OpCode.IDIV: (False, False, True), OpCode.IMOD: (True, False, True)}
+
+# Erros que fazem o código compilado devolver o controle ao interpretador
+# no início do comando, que o reexecuta e relata o erro com a linha certa
+DESOTIMIZAR = (ZeroDivisionError, OverflowError, ValueError)
+
+AMBIENTE = {"_div": dividir_inteiros, "_resto": resto_inteiros, "_fmod": math.fmod,
+            "_DESOTIMIZAR": DESOTIMIZAR}
+
+
+class Expressao:
+    """Valor simbólico da pilha: código Python, tipo ('int', 'float', 'bool', 'str')
+    e se a avaliação pode levantar erro"""
+    __slots__ = ('codigo', 'tipo', 'falivel')
+
+    def __init__(self, codigo, tipo, falivel=False):
+        self.codigo = codigo
+        self.tipo = tipo
+        self.falivel = falivel
+
+    def numero(self):
+        """Código do valor como número (relacionais valem 1 ou 0)"""
+        if self.tipo == 'bool':
+            return f"(1 if {self.codigo} else 0)"
+        return self.codigo
+
+    def condicao(self):
+        if self.tipo == 'bool':
+            return self.codigo
+        return f"({self.codigo} != 0)"
+
+
+class TradutorLaco:
+    """Traduz o laço cuja aresta de retorno (LOOP) está em 'pc_loop'"""
+
+    def __init__(self, programa, pc_loop, cobertura=None, limite_bits=None):
+        self.programa = programa
+        self.cobertura = cobertura
+        self.limite_bits = limite_bits
+        self.ops = programa.ops
+        self.args = programa.args
+        self.cabeca = programa.args[pc_loop]
+        self.saida = pc_loop + 1
+        funcao = programa.funcao_em(self.cabeca)
+        self.variaveis = funcao.variaveis
+        self.tipos = ['float' if tipo == "FLOAT" else 'int' for tipo in funcao.tipos]
+        self.linhas = []
+        self.pendente = 0
+        self.ajustes = {self.cabeca: 0}  # instruções ainda não somadas a n, por _pc
+        self.slots = set()
+        self.constantes = {}
+
+    # Emissão
+
+    def linha(self, nivel, texto):
+        self.linhas.append("    " * nivel + texto)
+
+    def contagem(self):
+        """Valor de n neste ponto do código gerado"""
+        return f"n + {self.pendente}" if self.pendente else "n"
+
+    def marcar_inicio(self, comeco, nivel):
+        """Antes de um comando que pode falhar: se falhar, o interpretador
+        recomeça em _pc com n mais as instruções ainda pendentes ali"""
+        self.linha(nivel, f"_pc = {comeco}")
+        self.ajustes[comeco] = self.pendente
+
+    def descarregar(self, nivel):
+        """Soma ao contador as instruções já executadas e ainda não contadas"""
+        if self.pendente:
+            self.linha(nivel, f"n += {self.pendente}")
+            self.pendente = 0
+
+    def constante(self, valor):
+        if type(valor) is int or (type(valor) is float and math.isfinite(valor)):
+            return repr(valor)
+        nome = f"_k{len(self.constantes)}"
+        self.constantes[nome] = valor
+        return nome
+
+    # Tradução
+
+    def traduzir(self):
+        """Código-fonte da função que executa o laço a partir da cabeça"""
+        corpo = []
+        self.linhas = corpo
+        self.bloco(self.cabeca, self.saida, 2)
+        self.descarregar(2)
+
+        slots = sorted(self.slots)
+        self.linhas = []
+        self.linha(0, "def laco(v, n, fim, ler, escrever, converter, cobertura):")
+        for slot in slots:
+            self.linha(1, f"s{slot} = v[{slot}]")
+        self.linha(1, f"_pc = {self.cabeca}")
+        self.linha(1, "try:")
+        self.linhas.extend(corpo)
+        self.linha(1, "except _DESOTIMIZAR:")
+        self.linha(2, "return _pc, n + _AJUSTES[_pc], False")
+        self.linha(1, "finally:")
+        for slot in slots:
+            self.linha(2, f"v[{slot}] = s{slot}")
+        if not slots:
+            self.linha(2, "pass")
+        self.linha(1, f"return {self.saida}, n, False")
+        return "\n".join(self.linhas)
+
+    def bloco(self, inicio, fim, nivel, extra=0):
+        """Traduz as instruções [inicio, fim), que formam uma sequência de comandos;
+        'extra' conta instruções de salto executadas ao fim do bloco"""
+        ops, args = self.ops, self.args
+        pilha = []
+        comeco = inicio                 # pc onde começa o comando atual
+        pc = inicio
+        emitiu = len(self.linhas)
+        while pc < fim:
+            op, arg = ops[pc], args[pc]
+            if op == OpCode.LOAD:
+                self.slots.add(arg)
+                pilha.append(Expressao(f"s{arg}", self.tipos[arg]))
+            elif op == OpCode.CONST:
+                valor = self.programa.constantes[arg]
+                tipo = {int: 'int', float: 'float'}.get(type(valor), 'str')
+                pilha.append(Expressao(self.constante(valor), tipo))
+            elif op in ARITMETICOS or op in DIVISOES:
+                b, a = pilha.pop(), pilha.pop()
+                pilha.append(self.aritmetica(op, a, b))
+            elif op in RELACIONAIS:
+                b, a = pilha.pop(), pilha.pop()
+                pilha.append(Expressao(f"({a.numero()} {RELACIONAIS[op]} {b.numero()})", 'bool',
+                                       a.falivel or b.falivel))
+            elif op in LOGICOS:
+                # & e | avaliam os dois lados, como a máquina
+                b, a = pilha.pop(), pilha.pop()
+                pilha.append(Expressao(f"({a.condicao()} {LOGICOS[op]} {b.condicao()})", 'bool',
+                                       a.falivel or b.falivel))
+            elif op == OpCode.STORE or op == OpCode.STORE_RAW:
+                self.slots.add(arg)
+                valor = self.converter(pilha.pop(), self.tipos[arg])
+                self.comando(f"s{arg} = {valor.codigo}", valor.falivel, comeco, pc, nivel)
+            elif op == OpCode.WRITE:
+                valor = pilha.pop()
+                if valor.tipo == 'str':
+                    texto = valor.codigo
+                elif valor.tipo == 'bool':
+                    texto = f"('1' if {valor.codigo} else '0')"
+                else:
+                    texto = f"str({valor.codigo})"
+                # str() de inteiros enormes pode levantar ValueError
+                self.comando(f"escrever({texto})", valor.falivel or valor.tipo == 'int',
+                             comeco, pc, nivel)
+            elif op == OpCode.READ:
+                self.slots.add(arg)
+                # Sem dados (ou fim da entrada): o interpretador refaz o read()
+                self.linha(nivel, "_t = ler()")
+                self.linha(nivel, "if _t is None:")
+                self.linha(nivel + 1, f"return {pc}, {self.contagem()}, False")
+                real = self.tipos[arg] == 'float'
+                self.linha(nivel, f"s{arg} = converter(_t, {real}, {pc})")
+                self.pendente += 1
+            elif op == OpCode.MARK:
+                # Blocos já cobertos antes da compilação não precisam mais de marca
+                if self.cobertura is None or not self.cobertura[arg]:
+                    self.linha(nivel, f"cobertura[{arg}] = 1")
+                self.pendente += 1
+            elif op == OpCode.JUMP_FALSE:
+                pc = self.controle(pilha.pop(), comeco, pc, arg, nivel)
+                comeco = pc
+                continue
+            else:
+                raise NaoCompilavel(f"instrução {op} em {pc}")
+            pc += 1
+            if not pilha:
+                comeco = pc
+        if pilha:
+            raise NaoCompilavel("pilha não vazia no fim do bloco")
+        self.pendente += extra
+        self.descarregar(nivel)
+        if len(self.linhas) == emitiu:
+            self.linha(nivel, "pass")
+
+    def comando(self, codigo, falivel, comeco, pc, nivel):
+        quantidade = pc + 1 - comeco
+        if falivel:
+            self.marcar_inicio(comeco, nivel)
+        self.linha(nivel, codigo)
+        self.pendente += quantidade
+
+    def teste(self, condicao, comeco, pc, nivel):
+        """Avalia a condição de um desvio, contando as instruções até o JUMP_FALSE"""
+        quantidade = pc + 1 - comeco
+        if condicao.falivel:
+            self.marcar_inicio(comeco, nivel)
+            self.linha(nivel, f"_c = {condicao.condicao()}")
+            self.pendente += quantidade
+            self.descarregar(nivel)
+            return "_c"
+        self.pendente += quantidade
+        self.descarregar(nivel)
+        return condicao.condicao()
+
+    def controle(self, condicao, comeco, pc, alvo, nivel):
+        """Traduz o if/while iniciado em 'comeco'; devolve o pc seguinte"""
+        ops, args = self.ops, self.args
+        anterior = alvo - 1
+        if ops[anterior] == OpCode.LOOP and args[anterior] == comeco:
+            # while: cabeca: cond; JUMP_FALSE fim; corpo; LOOP cabeca; fim
+            self.descarregar(nivel)
+            self.linha(nivel, "while True:")
+            teste = self.teste(condicao, comeco, pc, nivel + 1)
+            self.linha(nivel + 1, f"if not {teste}:")
+            self.linha(nivel + 2, "break")
+            self.bloco(pc + 1, anterior, nivel + 1, extra=1)
+            self.linha(nivel + 1, "if n >= fim:")
+            self.linha(nivel + 2, f"return {comeco}, n, True")
+            return alvo
+        if ops[anterior] == OpCode.JUMP and args[anterior] >= alvo and not self.aninhado(pc, alvo):
+            # if/else: cond; JUMP_FALSE senao; entao; JUMP fim; senao: ...; fim
+            fim = args[anterior]
+            teste = self.teste(condicao, comeco, pc, nivel)
+            self.linha(nivel, f"if {teste}:")
+            self.bloco(pc + 1, anterior, nivel + 1, extra=1)
+            self.linha(nivel, "else:")
+            self.bloco(alvo, fim, nivel + 1)
+            return fim
+        if alvo <= pc:
+            raise NaoCompilavel(f"desvio para trás em {pc}")
+        teste = self.teste(condicao, comeco, pc, nivel)
+        self.linha(nivel, f"if {teste}:")
+        self.bloco(pc + 1, alvo, nivel + 1)
+        return alvo
+
+    def aninhado(self, pc, alvo):
+        """
+        O JUMP logo antes de 'alvo' é de um if/else com else vazio aninhado no
+        fim deste if? Então algum JUMP_FALSE interno também desvia para 'alvo'.
+        """
+        if self.args[alvo - 1] != alvo:
+            return False
+        ops, args = self.ops, self.args
+        return any(ops[i] == OpCode.JUMP_FALSE and args[i] == alvo for i in range(pc + 1, alvo - 1))
+
+    def aritmetica(self, op, a, b):
+        falivel = a.falivel or b.falivel
+        reais = 'float' in (a.tipo, b.tipo)
+        x, y = a.numero(), b.numero()
+        if op == OpCode.MUL and not reais and self.limite_bits is not None:
+            # Produto que passaria do limite: o interpretador refaz e relata
+            return Expressao(f"_mul({x}, {y})", 'int', True)
+        if op in ARITMETICOS:
+            # int com float pode estourar na conversão de inteiros enormes
+            misto = reais and a.tipo != b.tipo
+            return Expressao(f"({x} {ARITMETICOS[op]} {y})", 'float' if reais else 'int',
+                             falivel or misto)
+        resto, verifica, mesmo_sinal = DIVISOES[op]
+        if mesmo_sinal:
+            return Expressao(f"({x} {'%' if resto else '//'} {y})", 'int', falivel)
+        if reais:
+            # Sem o teste do divisor, ainda falham a conversão de inteiros enormes e fmod(inf)
+            codigo = f"_fmod({x}, {y})" if resto else f"({x} / {y})"
+            return Expressao(codigo, 'float', verifica or resto or a.tipo != b.tipo or falivel)
+        funcao = "_resto" if resto else "_div"
+        return Expressao(f"{funcao}({x}, {y})", 'int', verifica or falivel)
+
+    def converter(self, valor, tipo):
+        """Conversão do STORE para o tipo declarado da variável"""
+        if valor.tipo == 'bool':
+            um, zero = ("1.0", "0.0") if tipo == 'float' else ("1", "0")
+            return Expressao(f"({um} if {valor.codigo} else {zero})", tipo, valor.falivel)
+        if valor.tipo == tipo:
+            return valor
+        return Expressao(f"{tipo}({valor.codigo})", tipo, True)
+
+
+def compilar_laco(programa, pc_loop, cobertura=None, limite_bits=None):
+    """
+    Função Python equivalente ao laço, ou None se ele não puder ser compilado.
+    Com 'cobertura', só os blocos ainda não marcados nela continuam marcando;
+    com 'limite_bits', produtos de inteiros maiores que isso desotimizam.
+
+    A função recebe (v, n, fim, ler, escrever, converter, cobertura) — o quadro de
+    variáveis, a contagem de instruções e o limite da fatia — e devolve
+    (pc, n, pausa): o pc onde o interpretador deve continuar, a nova contagem
+    e se a fatia se esgotou numa aresta de retorno.
+    """
+    tradutor = TradutorLaco(programa, pc_loop, cobertura, limite_bits)
+    try:
+        codigo = tradutor.traduzir()
+    except (NaoCompilavel, IndexError):
+        return None
+    ambiente = dict(AMBIENTE)
+    ambiente.update(tradutor.constantes)
+    ambiente["_AJUSTES"] = tradutor.ajustes
+    if limite_bits is not None:
+        def _mul(a, b):
+            if a.bit_length() + b.bit_length() > limite_bits:
+                raise OverflowError
+            return a * b
+        ambiente["_mul"] = _mul
+    exec(compile(codigo, f"<laço {tradutor.cabeca}>", "exec"), ambiente)
+    laco = ambiente["laco"]
+    laco.codigo = codigo
+    return laco
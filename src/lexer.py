@@ -4,11 +4,14 @@ Responsável pela tokenização do código-fonte
 """
 
 import re
+from types import MappingProxyType
+
 from .token_types import Token, TokenType
 
 
 class Lexer:
-    PALAVRAS_RESERVADAS = {
+    # Somente leitura: o mesmo Lexer é usado por várias threads ao mesmo tempo
+    PALAVRAS_RESERVADAS = MappingProxyType({
         'function': TokenType.FUNCTION,
         'main': TokenType.MAIN,
         'let': TokenType.LET,
@@ -20,7 +23,7 @@ class Lexer:
         'console.log': TokenType.CONSOLE_LOG,
         'number': TokenType.NUMBER,
         'float': TokenType.FLOAT,
-    }
+    })
 
     def __init__(self, codigo_fonte):
         self.codigo = codigo_fonte
@@ -142,6 +145,11 @@ class Lexer:
 
     def tokenize(self):
         """Realiza a tokenização completa"""
+        self.tokens.extend(self.gerar_tokens())
+        return self.tokens
+
+    def gerar_tokens(self):
+        """Gera os tokens um a um, terminando com EOF (sem guardar a lista)"""
         while self.pos < len(self.codigo):
             self.skip_whitespace()
 
@@ -154,100 +162,104 @@ class Lexer:
 
             # Números
             if char.isdigit():
-                self.tokens.append(self.read_number())
+                yield self.read_number()
 
             # Strings
             elif char in ('"', "'"):
-                self.tokens.append(self.read_string(char))
+                yield self.read_string(char)
 
             # Identificadores e palavras reservadas
             elif char.isalpha() or char == '_':
-                self.tokens.append(self.read_identifier())
+                yield self.read_identifier()
 
             # Operadores e delimitadores
             elif char == '+':
-                self.tokens.append(Token(TokenType.PLUS, '+', linha, coluna))
+                yield Token(TokenType.PLUS, '+', linha, coluna)
                 self.advance()
 
             elif char == '-':
-                self.tokens.append(Token(TokenType.MINUS, '-', linha, coluna))
+                yield Token(TokenType.MINUS, '-', linha, coluna)
                 self.advance()
 
             elif char == '*':
-                self.tokens.append(Token(TokenType.MULT, '*', linha, coluna))
+                yield Token(TokenType.MULT, '*', linha, coluna)
                 self.advance()
 
             elif char == '/':
-                self.tokens.append(Token(TokenType.DIV, '/', linha, coluna))
+                yield Token(TokenType.DIV, '/', linha, coluna)
                 self.advance()
                 
             elif char == '%':
-                self.tokens.append(Token(TokenType.MOD, '%', linha, coluna))
+                yield Token(TokenType.MOD, '%', linha, coluna)
                 self.advance()
                 
             elif char == '(':
-                self.tokens.append(Token(TokenType.LPAREN, '(', linha, coluna))
+                yield Token(TokenType.LPAREN, '(', linha, coluna)
                 self.advance()
 
             elif char == ')':
-                self.tokens.append(Token(TokenType.RPAREN, ')', linha, coluna))
+                yield Token(TokenType.RPAREN, ')', linha, coluna)
                 self.advance()
 
             elif char == '{':
-                self.tokens.append(Token(TokenType.LBRACE, '{', linha, coluna))
+                yield Token(TokenType.LBRACE, '{', linha, coluna)
                 self.advance()
 
             elif char == '}':
-                self.tokens.append(Token(TokenType.RBRACE, '}', linha, coluna))
+                yield Token(TokenType.RBRACE, '}', linha, coluna)
                 self.advance()
 
             elif char == ';':
-                self.tokens.append(Token(TokenType.SEMICOLON, ';', linha, coluna))
+                yield Token(TokenType.SEMICOLON, ';', linha, coluna)
                 self.advance()
 
             elif char == ':':
-                self.tokens.append(Token(TokenType.COLON, ':', linha, coluna))
+                yield Token(TokenType.COLON, ':', linha, coluna)
+                self.advance()
+
+            elif char == ',':
+                yield Token(TokenType.COMMA, ',', linha, coluna)
                 self.advance()
 
             elif char == '=':
                 if self.peek(1) == '=':
-                    self.tokens.append(Token(TokenType.EQ, '==', linha, coluna))
+                    yield Token(TokenType.EQ, '==', linha, coluna)
                     self.advance()
                     self.advance()
                 else:
-                    self.tokens.append(Token(TokenType.ASSIGN, '=', linha, coluna))
+                    yield Token(TokenType.ASSIGN, '=', linha, coluna)
                     self.advance()
 
             elif char == '<':
                 if self.peek(1) == '=':
-                    self.tokens.append(Token(TokenType.LTE, '<=', linha, coluna))
+                    yield Token(TokenType.LTE, '<=', linha, coluna)
                     self.advance()
                     self.advance()
                 else:
-                    self.tokens.append(Token(TokenType.LT, '<', linha, coluna))
+                    yield Token(TokenType.LT, '<', linha, coluna)
                     self.advance()
 
             elif char == '>':
                 if self.peek(1) == '=':
-                    self.tokens.append(Token(TokenType.GTE, '>=', linha, coluna))
+                    yield Token(TokenType.GTE, '>=', linha, coluna)
                     self.advance()
                     self.advance()
                 else:
-                    self.tokens.append(Token(TokenType.GT, '>', linha, coluna))
+                    yield Token(TokenType.GT, '>', linha, coluna)
                     self.advance()
 
             elif char == '!':
                 if self.peek(1) == '=':
-                    self.tokens.append(Token(TokenType.NEQ, '!=', linha, coluna))
+                    yield Token(TokenType.NEQ, '!=', linha, coluna)
                     self.advance()
                     self.advance()
                 else:
-                    self.tokens.append(Token(TokenType.NOT, '!', linha, coluna))
+                    yield Token(TokenType.NOT, '!', linha, coluna)
                     self.advance()
 
             elif char == '&':
                 if self.peek(1) == '&':
-                    self.tokens.append(Token(TokenType.AND, '&&', linha, coluna))
+                    yield Token(TokenType.AND, '&&', linha, coluna)
                     self.advance()
                     self.advance()
                 else:
@@ -255,7 +267,7 @@ class Lexer:
 
             elif char == '|':
                 if self.peek(1) == '|':
-                    self.tokens.append(Token(TokenType.OR, '||', linha, coluna))
+                    yield Token(TokenType.OR, '||', linha, coluna)
                     self.advance()
                     self.advance()
                 else:
@@ -265,5 +277,4 @@ class Lexer:
                 self.error(f"Caractere não reconhecido: {char}")
 
         # Adiciona token EOF
-        self.tokens.append(Token(TokenType.EOF, '', self.linha, self.coluna))
-        return self.tokens
+        yield Token(TokenType.EOF, '', self.linha, self.coluna)
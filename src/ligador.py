@@ -0,0 +1,254 @@
+"""
+Ligador - Ligação de unidades compiladas separadamente e construção incremental
+Cada arquivo vira um objeto (.mco); o ligador resolve as chamadas entre eles
+"""
+
+import builtins
+import hashlib
+import json
+import os
+
+from .instrucoes import OpCode, ObjetoCompilado, ProgramaCompilado, FuncaoCompilada
+
+
+class LinkError(Exception):
+    """Exceção de erro de ligação"""
+    def __init__(self, message, unidade=None):
+        self.message = message
+        self.unidade = unidade
+
+    def __str__(self):
+        if self.unidade:
+            return f"Erro de Ligação em {self.unidade}: {self.message}"
+        return f"Erro de Ligação: {self.message}"
+
+
+class BuildError(Exception):
+    """Erro ao compilar uma unidade durante a construção"""
+    def __init__(self, unidade, causa):
+        self.unidade = unidade
+        self.causa = causa
+
+    def __str__(self):
+        return f"{self.unidade}: {self.causa}"
+
+
+def ligar(objetos):
+    """Junta os objetos num único ProgramaCompilado, resolvendo as chamadas"""
+    # 1. Tabela global de funções
+    funcoes = []
+    indice_funcoes = {}
+    origem = {}
+    for objeto in objetos:
+        for funcao in objeto.funcoes:
+            if funcao.nome in indice_funcoes:
+                raise LinkError(f"Função '{funcao.nome}' definida também em "
+                                f"{origem[funcao.nome]}", objeto.unidade)
+            indice_funcoes[funcao.nome] = len(funcoes)
+            origem[funcao.nome] = objeto.unidade
+            funcoes.append(funcao)
+    if "main" not in indice_funcoes:
+        raise LinkError("Função 'main' não encontrada")
+
+    # 2. Código, constantes e relocação
+    ops, args, linhas, constantes, blocos = [], [], [], [], []
+    indice_constantes = {}
+    tabela = []
+    for objeto in objetos:
+        deslocamento = len(ops)
+        primeiro_bloco = len(blocos)
+        blocos.extend((objeto.unidade, tipo, linha, linhas_bloco)
+                      for tipo, linha, linhas_bloco in objeto.blocos)
+        mapa_constantes = []
+        for valor in objeto.constantes:
+            chave = (type(valor), valor)
+            if chave not in indice_constantes:
+                indice_constantes[chave] = len(constantes)
+                constantes.append(valor)
+            mapa_constantes.append(indice_constantes[chave])
+
+        mapa_externos = []
+        for nome, tipos in objeto.externos:
+            if nome not in indice_funcoes:
+                raise LinkError(f"Função '{nome}' não definida", objeto.unidade)
+            definida = funcoes[indice_funcoes[nome]]
+            if list(definida.tipos[:definida.parametros]) != list(tipos):
+                raise LinkError(f"Assinatura de '{nome}' mudou em {origem[nome]}; "
+                                f"recompile a unidade", objeto.unidade)
+            mapa_externos.append(indice_funcoes[nome])
+
+        for op, arg in zip(objeto.ops, objeto.args):
+            if op == OpCode.CONST:
+                arg = mapa_constantes[arg]
+            elif op in (OpCode.JUMP, OpCode.JUMP_FALSE, OpCode.LOOP):
+                arg += deslocamento
+            elif op == OpCode.CALL:
+                arg = mapa_externos[arg]
+            elif op == OpCode.MARK:
+                arg += primeiro_bloco
+            ops.append(op)
+            args.append(arg)
+        linhas.extend(objeto.linhas)
+        for funcao in objeto.funcoes:
+            tabela.append(FuncaoCompilada(funcao.nome, funcao.entrada + deslocamento,
+                                          funcao.parametros, funcao.variaveis, funcao.tipos))
+
+    return ProgramaCompilado(ops, args, constantes, tabela, linhas, indice_funcoes["main"], blocos)
+
+
+def compilar_e_ligar(fontes, instrumentar=False, otimizar=False):
+    """Compila em memória uma lista de (unidade, código-fonte) e liga o resultado"""
+    from .lexer import Lexer
+    from .parser import Parser
+    from .gerador import GeradorCodigo
+
+    arvores = [(unidade, Parser(Lexer(codigo).tokenize()).parse()) for unidade, codigo in fontes]
+    interfaces = {}
+    for _, arvore in arvores:
+        for funcao in arvore.funcoes:
+            interfaces.setdefault(funcao.nome, [p.tipo for p in funcao.parametros])
+    return ligar([GeradorCodigo(interfaces, instrumentar, otimizar).gerar(arvore, unidade)
+                  for unidade, arvore in arvores])
+
+
+def salvar_objeto(objeto, caminho):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(objeto.como_dict(), f, ensure_ascii=False)
+
+
+def carregar_objeto(caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return ObjetoCompilado.de_dict(json.load(f))
+
+
+class Construtor:
+    """
+    Construção incremental de programas com vários arquivos.
+
+    O manifesto do diretório de cache guarda, por unidade, o hash do fonte,
+    as funções definidas (com tipos dos parâmetros) e as funções usadas.
+    Uma unidade é recompilada quando seu fonte muda ou quando muda a
+    assinatura de alguma função da qual ela depende (grafo de dependências).
+    """
+
+    MANIFESTO = "manifesto.json"
+
+    def __init__(self, diretorio_cache, instrumentar=False, otimizar=False):
+        self.diretorio_cache = diretorio_cache
+        self.instrumentar = instrumentar
+        self.otimizar = otimizar and not instrumentar
+        os.makedirs(diretorio_cache, exist_ok=True)
+        self.manifesto = self._carregar_manifesto()
+        self.relatorio = {}
+
+    def _carregar_manifesto(self):
+        caminho = os.path.join(self.diretorio_cache, self.MANIFESTO)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _salvar_manifesto(self):
+        caminho = os.path.join(self.diretorio_cache, self.MANIFESTO)
+        temporario = caminho + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.manifesto, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, caminho)
+
+    def _caminho_objeto(self, unidade):
+        nome = hashlib.sha256(unidade.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.diretorio_cache, f"{os.path.basename(unidade)}.{nome}.mco")
+
+    def grafo_dependencias(self):
+        """unidade -> unidades que definem funções chamadas por ela"""
+        definidor = {}
+        for unidade, entrada in self.manifesto.items():
+            for nome in entrada["define"]:
+                definidor[nome] = unidade
+        return {unidade: sorted({definidor[nome] for nome in entrada["usa"] if nome in definidor})
+                for unidade, entrada in self.manifesto.items()}
+
+    def construir(self, arquivos):
+        """Recompila o necessário, liga e devolve o ProgramaCompilado"""
+        from .lexer import Lexer
+        from .parser import Parser, SyntaxError
+        from .gerador import GeradorCodigo, SemanticError
+
+        unidades = [os.path.abspath(arquivo) for arquivo in arquivos]
+        fontes, hashes = {}, {}
+        for unidade in unidades:
+            with open(unidade, 'rb') as f:
+                dados = f.read()
+            fontes[unidade] = dados
+            # Código instrumentado (cobertura) ou otimizado é outro objeto para o mesmo fonte
+            sufixo = b"\0MARK" if self.instrumentar else b"\0OPT" if self.otimizar else b""
+            hashes[unidade] = hashlib.sha256(dados + sufixo).hexdigest()
+
+        anterior = self.manifesto
+        mudadas = [u for u in unidades
+                   if u not in anterior or anterior[u]["hash"] != hashes[u]
+                   or not os.path.exists(self._caminho_objeto(u))]
+
+        def analisar(unidade):
+            try:
+                return Parser(Lexer(fontes[unidade].decode('utf-8')).tokenize()).parse()
+            except (SyntaxError, builtins.SyntaxError) as e:
+                raise BuildError(unidade, e)
+
+        # Fase 1: interfaces (só as unidades mudadas precisam ser analisadas)
+        arvores = {u: analisar(u) for u in mudadas}
+        interfaces = {}
+        for unidade in unidades:
+            if unidade in arvores:
+                interfaces[unidade] = {f.nome: [p.tipo for p in f.parametros]
+                                       for f in arvores[unidade].funcoes}
+            else:
+                interfaces[unidade] = anterior[unidade]["define"]
+
+        assinaturas_antigas, assinaturas = {}, {}
+        for unidade, entrada in anterior.items():
+            for nome, tipos in entrada["define"].items():
+                assinaturas_antigas[nome] = tipos
+        for unidade in unidades:
+            for nome, tipos in interfaces[unidade].items():
+                if nome in assinaturas:
+                    dono = next(u for u in unidades if nome in interfaces[u])
+                    raise LinkError(f"Função '{nome}' definida também em {dono}", unidade)
+                assinaturas[nome] = tipos
+        alteradas = {nome for nome in set(assinaturas) | set(assinaturas_antigas)
+                     if assinaturas.get(nome) != assinaturas_antigas.get(nome)}
+
+        # Fase 2: dependentes de assinaturas alteradas também são recompilados
+        dependentes = [u for u in unidades if u not in arvores
+                       and alteradas.intersection(anterior[u]["usa"])]
+        for unidade in dependentes:
+            arvores[unidade] = analisar(unidade)
+
+        objetos = []
+        for unidade in unidades:
+            caminho_objeto = self._caminho_objeto(unidade)
+            if unidade in arvores:
+                try:
+                    objeto = GeradorCodigo(assinaturas, self.instrumentar, self.otimizar).gerar(
+                        arvores[unidade], unidade)
+                except SemanticError as e:
+                    raise BuildError(unidade, e)
+                salvar_objeto(objeto, caminho_objeto)
+                self.manifesto[unidade] = {"hash": hashes[unidade], "define": objeto.definidas(),
+                                           "usa": objeto.usadas()}
+            else:
+                objeto = carregar_objeto(caminho_objeto)
+            objetos.append(objeto)
+
+        for unidade in list(self.manifesto):
+            if unidade not in hashes:
+                del self.manifesto[unidade]
+        self._salvar_manifesto()
+
+        self.relatorio = {
+            "recompiladas": [u for u in unidades if u in arvores],
+            "por_dependencia": dependentes,
+            "reaproveitadas": [u for u in unidades if u not in arvores],
+        }
+        return ligar(objetos)
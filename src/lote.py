@@ -0,0 +1,202 @@
+"""
+Lote - Compilação em lote de diretórios e globs
+Distribui os arquivos entre processos (ou threads, no CPython sem GIL) e
+emite uma linha JSON por arquivo
+"""
+
+import builtins
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .lexer import Lexer
+from .parser import Parser, SyntaxError
+
+
+# Quantidade de arquivos enviados a cada processo por vez
+TAMANHO_PACOTE = 16
+
+EXECUTORES = ("auto", "threads", "processes")
+
+
+def compilar_fonte(codigo_fonte):
+    """Compila código-fonte sem imprimir nada e devolve o diagnóstico"""
+    resultado = {"ok": True, "tokens": 0, "erro": None, "linha": None, "coluna": None}
+    try:
+        tokens = Lexer(codigo_fonte).tokenize()
+        resultado["tokens"] = len(tokens)
+        Parser(tokens).parse()
+    except SyntaxError as e:
+        resultado.update(ok=False, erro=str(e), linha=e.linha, coluna=e.coluna)
+    except builtins.SyntaxError as e:
+        # O lexer usa o SyntaxError embutido do Python
+        resultado.update(ok=False, erro=str(e))
+    except Exception as e:
+        # Ex.: RecursionError em expressões muito aninhadas; falha só deste arquivo
+        resultado.update(ok=False, erro=f"Erro inesperado: {type(e).__name__}: {e}")
+    return resultado
+
+
+def compilar_arquivo(caminho):
+    """Lê e compila um arquivo, devolvendo uma linha de resultado"""
+    inicio = time.perf_counter()
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            codigo_fonte = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        resultado = {"ok": False, "tokens": 0, "erro": f"Erro de leitura: {e}",
+                     "linha": None, "coluna": None}
+        codigo_fonte = ''
+    else:
+        resultado = compilar_fonte(codigo_fonte)
+    resultado["arquivo"] = caminho
+    resultado["bytes"] = len(codigo_fonte.encode('utf-8'))
+    resultado["ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+    return resultado
+
+
+def compilar_pacote(caminhos):
+    """Compila um pacote de arquivos (executado nos processos filhos)"""
+    return [compilar_arquivo(caminho) for caminho in caminhos]
+
+
+def expandir_entradas(alvo):
+    """Expande um diretório (busca recursiva por *.mc) ou um glob em caminhos"""
+    if os.path.isdir(alvo):
+        for raiz, diretorios, arquivos in os.walk(alvo):
+            diretorios.sort()
+            for nome in sorted(arquivos):
+                if nome.endswith('.mc'):
+                    yield os.path.join(raiz, nome)
+    else:
+        yield from sorted(glob.iglob(alvo, recursive=True))
+
+
+def _pacotes(caminhos, tamanho):
+    """Agrupa os caminhos em listas de até 'tamanho' elementos"""
+    pacote = []
+    for caminho in caminhos:
+        pacote.append(caminho)
+        if len(pacote) == tamanho:
+            yield pacote
+            pacote = []
+    if pacote:
+        yield pacote
+
+
+def gil_desativado():
+    """O interpretador roda sem GIL (CPython free-threaded com o GIL desligado)?"""
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def escolher_executor(executor="auto"):
+    """'threads' ou 'processes': em 'auto', threads só quando não há GIL"""
+    if executor not in EXECUTORES:
+        raise ValueError(f"Executor desconhecido: {executor}")
+    if executor == "auto":
+        return "threads" if gil_desativado() else "processes"
+    return executor
+
+
+def _em_voo(executor, pacotes, limite, tarefa, argumentos):
+    """Submete os pacotes mantendo até 'limite' em voo e gera os resultados"""
+    pendentes = set()
+    try:
+        for pacote in pacotes:
+            pendentes.add(executor.submit(tarefa, pacote, *argumentos))
+            if len(pendentes) >= limite:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    yield futuro.result()
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                yield futuro.result()
+    finally:
+        # Interrupção antecipada (fail-fast): descarta o que ainda não começou
+        for futuro in pendentes:
+            futuro.cancel()
+
+
+def _resultados_paralelos(caminhos, processos, tarefa=compilar_pacote, *argumentos,
+                          inicializador=None, iniciais=()):
+    """
+    Gera listas de resultados mantendo um número limitado de pacotes em voo.
+
+    'tarefa' recebe um pacote de caminhos (e 'argumentos') no processo filho.
+    Os filhos são criados com fork, com os objetos do pai fora do GC, para que
+    o que já está carregado (lexer, parser, programas) continue compartilhado.
+    'inicializador(*iniciais)' roda uma vez em cada filho ao ser criado.
+    """
+    from .prefork import congelado, contexto_fork
+
+    pacotes = _pacotes(caminhos, TAMANHO_PACOTE)
+    with congelado(), ProcessPoolExecutor(max_workers=processos, mp_context=contexto_fork(),
+                                          initializer=inicializador,
+                                          initargs=iniciais) as executor:
+        yield from _em_voo(executor, pacotes, processos * 2, tarefa, argumentos)
+
+
+def _resultados_em_threads(caminhos, threads, tarefa=compilar_pacote, *argumentos):
+    """
+    Como _resultados_paralelos, com threads no mesmo processo: nada é
+    serializado e o compilador já carregado é compartilhado. Lexer e Parser
+    não têm estado mutável de classe, então cada thread usa suas instâncias.
+    Só escala com os núcleos quando o GIL está desligado.
+    """
+    pacotes = _pacotes(caminhos, TAMANHO_PACOTE)
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="lote") as executor:
+        yield from _em_voo(executor, pacotes, threads * 2, tarefa, argumentos)
+
+
+def compilar_lote(alvo, processos=None, parar_no_erro=False, saida=None, executor="auto"):
+    """
+    Compila todos os arquivos de 'alvo' e escreve uma linha JSON por arquivo
+    em 'saida', terminando com uma linha de resumo. Retorna o resumo.
+
+    'executor' escolhe entre processos e threads ('auto': threads só no
+    CPython sem GIL, em que elas rodam em paralelo); 'processos' é o número
+    de trabalhadores de qualquer um dos dois.
+    """
+    processos = processos or os.cpu_count() or 1
+    executor = escolher_executor(executor)
+    inicio = time.perf_counter()
+    resumo = {"arquivos": 0, "ok": 0, "falhas": 0, "bytes": 0, "interrompido": False,
+              "executor": executor if processos > 1 else "serial"}
+
+    caminhos = expandir_entradas(alvo)
+    if processos == 1:
+        lotes = (compilar_pacote(pacote) for pacote in _pacotes(caminhos, TAMANHO_PACOTE))
+    elif executor == "threads":
+        lotes = _resultados_em_threads(caminhos, processos)
+    else:
+        lotes = _resultados_paralelos(caminhos, processos)
+
+    try:
+        for resultados in lotes:
+            for resultado in resultados:
+                resumo["arquivos"] += 1
+                resumo["bytes"] += resultado["bytes"]
+                resumo["ok" if resultado["ok"] else "falhas"] += 1
+                if saida is not None:
+                    saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+                if parar_no_erro and not resultado["ok"]:
+                    resumo["interrompido"] = True
+                    break
+            if resumo["interrompido"]:
+                break
+    finally:
+        if hasattr(lotes, 'close'):
+            lotes.close()
+
+    segundos = time.perf_counter() - inicio
+    resumo["segundos"] = round(segundos, 3)
+    resumo["arquivos_por_segundo"] = round(resumo["arquivos"] / segundos, 1) if segundos else None
+    resumo["bytes_por_segundo"] = round(resumo["bytes"] / segundos) if segundos else None
+    if saida is not None:
+        saida.write(json.dumps({"resumo": resumo}, ensure_ascii=False) + "\n")
+        saida.flush()
+    return resumo
@@ -0,0 +1,483 @@
+"""
+Máquina - Máquina virtual de pilha que executa um ProgramaCompilado
+Executa em fatias (limite de instruções) e suspende em read() sem dados
+"""
+
+import math
+import re
+import sys
+from collections import deque
+
+from .instrucoes import OpCode
+
+
+class ExecutionError(Exception):
+    """Exceção de erro em tempo de execução"""
+    def __init__(self, message, linha):
+        self.message = message
+        self.linha = linha
+
+    def __str__(self):
+        return f"Erro de Execução na linha {self.linha}: {self.message}"
+
+
+class MemoryLimitError(ExecutionError):
+    """Um inteiro passaria do limite de bits da máquina (orçamento de memória)"""
+
+
+class Estado:
+    PRONTO = "PRONTO"                           # pode continuar executando
+    AGUARDANDO_ENTRADA = "AGUARDANDO_ENTRADA"   # parado num read() sem dados
+    FINALIZADO = "FINALIZADO"
+    ERRO = "ERRO"
+
+
+class FilaEntrada:
+    """Entrada alimentada aos poucos; ler() devolve None enquanto não há dados"""
+
+    def __init__(self, valores=(), fechada=False):
+        self.valores = deque(valores)
+        self.fechada = fechada
+        self.consumidos = 0
+
+    def fornecer(self, *valores):
+        self.valores.extend(valores)
+
+    def fechar(self):
+        self.fechada = True
+
+    def ler(self):
+        """Próximo valor; None se ainda não chegou; EOFError se a entrada acabou"""
+        if self.valores:
+            self.consumidos += 1
+            return self.valores.popleft()
+        if self.fechada:
+            raise EOFError
+        return None
+
+    def pendentes(self):
+        return len(self.valores)
+
+    @property
+    def posicao(self):
+        """Posição na entrada (valores consumidos), usada em checkpoints"""
+        return self.consumidos
+
+    def posicionar(self, posicao):
+        """Descarta os valores já consumidos antes de um checkpoint"""
+        while self.consumidos < posicao and self.valores:
+            self.valores.popleft()
+            self.consumidos += 1
+
+
+class EntradaArquivo:
+    """
+    Entrada lida sob demanda de um arquivo binário (valores separados por espaços).
+
+    Só mantém um bloco do arquivo em memória e sabe a posição em bytes logo após
+    o último valor consumido, o que permite retomar a leitura de um checkpoint.
+    """
+
+    BLOCO = 1 << 16
+    VALOR = re.compile(rb'\S+')
+
+    def __init__(self, arquivo, posicao=0):
+        self.arquivo = arquivo
+        self.buffer = b""
+        self.indice = 0             # próximo byte não consumido do buffer
+        self.inicio = 0             # posição no arquivo de buffer[0]
+        self.esgotado = False
+        self.consumidos = 0
+        if posicao:
+            self.posicionar(posicao)
+
+    @property
+    def posicao(self):
+        return self.inicio + self.indice
+
+    def posicionar(self, posicao):
+        """Continua a leitura a partir do byte 'posicao' do arquivo"""
+        try:
+            self.arquivo.seek(posicao)
+        except (AttributeError, OSError):
+            # Não posicionável (ex.: pipe): descarta bytes até chegar lá
+            restante = posicao - self.posicao
+            while restante > 0:
+                lidos = len(self.arquivo.read(min(restante, self.BLOCO)))
+                if not lidos:
+                    break
+                restante -= lidos
+        self.buffer, self.indice, self.inicio = b"", 0, posicao
+        self.esgotado = False
+
+    def ler(self):
+        """Próximo valor como texto; EOFError no fim do arquivo"""
+        while True:
+            achado = self.VALOR.search(self.buffer, self.indice)
+            # Um valor que encosta no fim do buffer pode continuar no próximo bloco
+            if achado and (achado.end() < len(self.buffer) or self.esgotado):
+                self.indice = achado.end()
+                self.consumidos += 1
+                return achado.group().decode('utf-8')
+            if self.esgotado:
+                self.indice = len(self.buffer)
+                raise EOFError
+            inicio_resto = achado.start() if achado else len(self.buffer)
+            bloco = self.arquivo.read(self.BLOCO)
+            self.inicio += inicio_resto
+            self.buffer = self.buffer[inicio_resto:] + bloco
+            self.indice = 0
+            self.esgotado = not bloco
+
+    def pendentes(self):
+        return 0
+
+
+class SaidaArquivo:
+    """Saída que escreve cada console.log como uma linha em um arquivo de texto"""
+
+    def __init__(self, arquivo, posicao=0):
+        self.arquivo = arquivo
+        self.posicao = posicao      # bytes (UTF-8) escritos, usada em checkpoints
+
+    def append(self, texto):
+        linha = texto + "\n"
+        self.arquivo.write(linha)
+        self.posicao += len(linha.encode('utf-8'))
+
+    def flush(self):
+        self.arquivo.flush()
+
+    def posicionar(self, posicao):
+        """Descarta o que foi escrito depois de um checkpoint"""
+        self.arquivo.flush()
+        try:
+            self.arquivo.seek(posicao)
+            self.arquivo.truncate()
+        except (AttributeError, OSError):
+            pass    # ex.: terminal ou pipe, onde não há como voltar atrás
+        self.posicao = posicao
+
+
+def converter_entrada(valor, real):
+    """Converte um valor lido para o tipo da variável (float ou number)"""
+    try:
+        if real:
+            return float(valor)
+        if isinstance(valor, str):
+            try:
+                return int(valor)
+            except ValueError:
+                return int(float(valor))
+        return int(valor)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Valor de entrada inválido: {valor!r}")
+
+
+def dividir_inteiros(a, b):
+    """Divisão inteira truncada em direção a zero (como em C)"""
+    q = a // b
+    if q < 0 and q * b != a:
+        q += 1
+    return q
+
+
+def resto_inteiros(a, b):
+    """Resto com o sinal do dividendo (como em C)"""
+    return a - b * dividir_inteiros(a, b)
+
+
+def formatar(valor):
+    """Texto escrito por console.log"""
+    return valor if isinstance(valor, str) else str(valor)
+
+
+class MaquinaVirtual:
+    """Interpretador da máquina de pilha"""
+
+    # Profundidade máxima de chamadas aninhadas
+    LIMITE_CHAMADAS = 10000
+
+    # Arestas de retorno de um while antes de compilá-lo (src/jit.py)
+    LIMIAR_COMPILACAO = 200
+
+    def __init__(self, programa, entrada=None, saida=None, compilar=True, cobertura=None,
+                 limite_bits=None):
+        self.programa = programa
+        self.compilar = compilar
+        # Tamanho máximo (em bits) de um produto de inteiros; None = sem limite
+        self.limite_bits = limite_bits
+        # Blocos básicos executados (só em código instrumentado); pode ser
+        # compartilhado entre execuções para acumular a cobertura
+        if cobertura is None and programa.blocos:
+            cobertura = bytearray(len(programa.blocos))
+        self.cobertura = cobertura
+        # Laços compilados: compartilhados pelo programa, exceto com cobertura,
+        # em que dependem dos blocos já marcados neste mapa, ou com limite de bits
+        compartilhar = cobertura is None and limite_bits is None
+        self.compilados = programa.compilados if compartilhar else {}
+        self.contadores = {}            # arestas de retorno executadas, por cabeça de laço
+        # Por função: quais slots são float e o quadro inicial de variáveis
+        self.reais_funcoes = [[tipo == "FLOAT" for tipo in f.tipos] for f in programa.funcoes]
+        self.modelos = [[0.0 if real else 0 for real in reais] for reais in self.reais_funcoes]
+        self.funcao = programa.principal
+        self.reais = self.reais_funcoes[self.funcao]
+        self.variaveis = self.modelos[self.funcao][:]
+        self.quadros = []               # (pc de retorno, função, variáveis) dos chamadores
+        self.pilha = []
+        self.pc = programa.funcoes[self.funcao].entrada
+        self.instrucoes = 0
+        self.estado = Estado.PRONTO
+        if entrada is None or not hasattr(entrada, 'ler'):
+            entrada = FilaEntrada(entrada or (), fechada=True)
+        self.entrada = entrada
+        self.saida = [] if saida is None else saida
+
+    def erro(self, message, pc, excecao=ExecutionError):
+        self.estado = Estado.ERRO
+        raise excecao(message, self.programa.linha(pc))
+
+    def memoria(self):
+        """Estimativa (em bytes) da memória ocupada pelo estado do programa"""
+        quadros = [self.variaveis] + [variaveis for _, _, variaveis in self.quadros]
+        total = sys.getsizeof(self.pilha) + sum(sys.getsizeof(valor) for valor in self.pilha)
+        for variaveis in quadros:
+            total += sys.getsizeof(variaveis) + sum(sys.getsizeof(valor) for valor in variaveis)
+        if hasattr(self.entrada, 'pendentes'):
+            total += self.entrada.pendentes() * 8
+        return total
+
+    def compilar_laco(self, pc_loop):
+        """Compila o laço cuja aresta de retorno está em pc_loop (None se não der)"""
+        from .jit import compilar_laco
+
+        laco = compilar_laco(self.programa, pc_loop, self.cobertura, self.limite_bits)
+        self.compilados[self.programa.args[pc_loop]] = laco or False
+        return laco
+
+    def _auxiliares_jit(self):
+        """Funções de entrada e saída usadas pelos laços compilados"""
+        entrada, erro = self.entrada, self.erro
+
+        def ler():
+            try:
+                return entrada.ler()
+            except EOFError:
+                return None     # o interpretador refaz o read() e relata o erro
+
+        def converter(valor, real, pc):
+            try:
+                return converter_entrada(valor, real)
+            except ValueError as e:
+                erro(str(e), pc)
+
+        return ler, self.saida.append, converter, self.cobertura
+
+    def executar(self, limite=None):
+        """
+        Executa até terminar, suspender em read() ou esgotar 'limite' instruções.
+
+        O limite é verificado nas arestas de retorno (LOOP) e nas chamadas e
+        retornos de função (CALL, RET): entre duas verificações só há código sem
+        laços nem chamadas, então o excesso é limitado ao tamanho de uma função.
+        Um while que passa de LIMIAR_COMPILACAO voltas é compilado e passa a
+        rodar como função Python, que devolve o controle nas mesmas condições.
+        """
+        if self.estado in (Estado.FINALIZADO, Estado.ERRO):
+            return self.estado
+
+        programa = self.programa
+        ops, args, constantes = programa.ops, programa.args, programa.constantes
+        funcoes = programa.funcoes
+        reais_funcoes = self.reais_funcoes
+        modelos = self.modelos
+        quadros = self.quadros
+        funcao = self.funcao
+        reais = self.reais
+        v = self.variaveis
+        pilha = self.pilha
+        empilhar = pilha.append
+        desempilhar = pilha.pop
+        entrada = self.entrada
+        saida = self.saida
+        pc = self.pc
+        n = self.instrucoes
+        fim = math.inf if limite is None else n + limite
+        estado = Estado.PRONTO
+        compilados = self.compilados if self.compilar else None
+        contadores = self.contadores
+        limiar = self.LIMIAR_COMPILACAO
+        limite_bits = self.limite_bits
+        auxiliares = None
+
+        LOAD, CONST, STORE = OpCode.LOAD, OpCode.CONST, OpCode.STORE
+        ADD, SUB, MUL, DIV, MOD = OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.MOD
+        LT, GT, LTE, GTE, EQ, NEQ = (OpCode.LT, OpCode.GT, OpCode.LTE,
+                                     OpCode.GTE, OpCode.EQ, OpCode.NEQ)
+        AND, OR = OpCode.AND, OpCode.OR
+        JUMP, JUMP_FALSE, LOOP = OpCode.JUMP, OpCode.JUMP_FALSE, OpCode.LOOP
+        CALL, RET = OpCode.CALL, OpCode.RET
+        READ, WRITE, HALT = OpCode.READ, OpCode.WRITE, OpCode.HALT
+        MARK = OpCode.MARK
+        STORE_RAW, DIV_NC, MOD_NC, IDIV, IMOD = (OpCode.STORE_RAW, OpCode.DIV_NC, OpCode.MOD_NC,
+                                                 OpCode.IDIV, OpCode.IMOD)
+        cobertura = self.cobertura
+
+        try:
+            while True:
+                op = ops[pc]
+                arg = args[pc]
+                pc += 1
+                n += 1
+
+                if op == LOAD:
+                    empilhar(v[arg])
+                elif op == CONST:
+                    empilhar(constantes[arg])
+                elif op == STORE:
+                    valor = desempilhar()
+                    if reais[arg]:
+                        v[arg] = valor if type(valor) is float else float(valor)
+                    else:
+                        v[arg] = valor if type(valor) is int else int(valor)
+                elif op == STORE_RAW:
+                    v[arg] = desempilhar()
+                elif op == JUMP_FALSE:
+                    if not desempilhar():
+                        pc = arg
+                elif op == LOOP:
+                    if compilados is not None and n < fim:
+                        laco = compilados.get(arg)
+                        if laco is None:
+                            contadores[arg] = contadores.get(arg, 0) + 1
+                            if contadores[arg] >= limiar:
+                                laco = self.compilar_laco(pc - 1)
+                        if laco:
+                            if auxiliares is None:
+                                auxiliares = self._auxiliares_jit()
+                            pc, n, pausa = laco(v, n, fim, *auxiliares)
+                            if pausa:
+                                break
+                            continue
+                    pc = arg
+                    if n >= fim:
+                        break
+                elif op == MARK:
+                    cobertura[arg] = 1
+                elif op == ADD:
+                    b = desempilhar()
+                    pilha[-1] = pilha[-1] + b
+                elif op == SUB:
+                    b = desempilhar()
+                    pilha[-1] = pilha[-1] - b
+                elif op == MUL:
+                    b = desempilhar()
+                    if (limite_bits is not None and type(b) is int and type(pilha[-1]) is int
+                            and pilha[-1].bit_length() + b.bit_length() > limite_bits):
+                        self.erro("Orçamento de memória excedido", pc - 1, MemoryLimitError)
+                    pilha[-1] = pilha[-1] * b
+                elif op == LT:
+                    b = desempilhar()
+                    pilha[-1] = 1 if pilha[-1] < b else 0
+                elif op == GT:
+                    b = desempilhar()
+                    pilha[-1] = 1 if pilha[-1] > b else 0
+                elif op == LTE:
+                    b = desempilhar()
+                    pilha[-1] = 1 if pilha[-1] <= b else 0
+                elif op == GTE:
+                    b = desempilhar()
+                    pilha[-1] = 1 if pilha[-1] >= b else 0
+                elif op == EQ:
+                    b = desempilhar()
+                    pilha[-1] = 1 if pilha[-1] == b else 0
+                elif op == NEQ:
+                    b = desempilhar()
+                    pilha[-1] = 1 if pilha[-1] != b else 0
+                elif op == DIV or op == MOD:
+                    b = desempilhar()
+                    a = pilha[-1]
+                    if b == 0:
+                        self.erro("Divisão por zero", pc - 1)
+                    if type(a) is int and type(b) is int:
+                        pilha[-1] = dividir_inteiros(a, b) if op == DIV else resto_inteiros(a, b)
+                    else:
+                        pilha[-1] = a / b if op == DIV else math.fmod(a, b)
+                elif op == IDIV:
+                    b = desempilhar()
+                    pilha[-1] = pilha[-1] // b
+                elif op == IMOD:
+                    b = desempilhar()
+                    pilha[-1] = pilha[-1] % b
+                elif op == DIV_NC or op == MOD_NC:
+                    b = desempilhar()
+                    a = pilha[-1]
+                    if type(a) is int and type(b) is int:
+                        pilha[-1] = dividir_inteiros(a, b) if op == DIV_NC else resto_inteiros(a, b)
+                    else:
+                        pilha[-1] = a / b if op == DIV_NC else math.fmod(a, b)
+                elif op == AND:
+                    b = desempilhar()
+                    pilha[-1] = 1 if (pilha[-1] and b) else 0
+                elif op == OR:
+                    b = desempilhar()
+                    pilha[-1] = 1 if (pilha[-1] or b) else 0
+                elif op == JUMP:
+                    pc = arg
+                elif op == CALL:
+                    if len(quadros) >= self.LIMITE_CHAMADAS:
+                        self.erro("Estouro da pilha de chamadas", pc - 1)
+                    chamada = funcoes[arg]
+                    novo = modelos[arg][:]
+                    reais_novo = reais_funcoes[arg]
+                    for i in range(chamada.parametros - 1, -1, -1):
+                        valor = desempilhar()
+                        if reais_novo[i]:
+                            novo[i] = valor if type(valor) is float else float(valor)
+                        else:
+                            novo[i] = valor if type(valor) is int else int(valor)
+                    quadros.append((pc, funcao, v))
+                    pc, funcao, v, reais = chamada.entrada, arg, novo, reais_novo
+                    if n >= fim:
+                        break
+                elif op == RET:
+                    pc, funcao, v = quadros.pop()
+                    reais = reais_funcoes[funcao]
+                    if n >= fim:
+                        break
+                elif op == READ:
+                    try:
+                        valor = entrada.ler()
+                    except EOFError:
+                        self.erro(f"Entrada esgotada em read({funcoes[funcao].variaveis[arg]})", pc - 1)
+                    if valor is None:
+                        # Sem dados ainda: volta para o read() e suspende
+                        pc -= 1
+                        n -= 1
+                        estado = Estado.AGUARDANDO_ENTRADA
+                        break
+                    try:
+                        v[arg] = converter_entrada(valor, reais[arg])
+                    except ValueError as e:
+                        self.erro(str(e), pc - 1)
+                elif op == WRITE:
+                    saida.append(formatar(desempilhar()))
+                elif op == HALT:
+                    pc -= 1
+                    estado = Estado.FINALIZADO
+                    break
+                else:
+                    self.erro(f"Instrução inválida: {op}", pc - 1)
+        except (OverflowError, ValueError, ZeroDivisionError) as e:
+            # Ex.: conversão de float infinito ou NaN para number; divisão por
+            # zero só numa variante sem verificação vinda de um .mcb adulterado
+            self.erro(f"Erro aritmético: {e}", pc - 1)
+        finally:
+            self.pc = pc
+            self.instrucoes = n
+            self.funcao = funcao
+            self.reais = reais
+            self.variaveis = v
+
+        self.estado = estado
+        return estado
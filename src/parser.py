@@ -9,9 +9,16 @@ Correções:
   chamando 'expressaoRelacional'.
 - 'termoRelacional' foi simplificado para 'expressaoAritmetica (OP_REL expressaoAritmetica)?',
   removendo a produção conflitante 'LPAREN expressaoRelacional RPAREN'.
+- Cada procedimento devolve o nó correspondente da árvore sintática
+  (src/arvore.py); parse() devolve o nó Programa.
+- Um arquivo (unidade de compilação) pode conter várias funções com
+  parâmetros, e 'comando' aceita chamadas de função (decididas com
+  lookahead de 2 tokens: ID seguido de '(').
 """
 
 from .token_types import Token, TokenType
+from .arvore import (Programa, Funcao, Chamada, Declaracao, Atribuicao, Leitura, Escrita, Condicional,
+                     Repeticao, Bloco, Binaria, Numero, Variavel, Texto)
 
 
 class SyntaxError(Exception):
@@ -29,6 +36,10 @@ class SyntaxError(Exception):
 class Parser:
     """Analisador Sintático Descendente Preditivo Recursivo"""
 
+    # First(comando)
+    INICIO_COMANDO = (TokenType.ID, TokenType.READ, TokenType.CONSOLE_LOG,
+                      TokenType.IF, TokenType.WHILE, TokenType.LBRACE)
+
     def __init__(self, tokens):
         self.tokens = tokens
         self.pos = 0
@@ -37,7 +48,8 @@ class Parser:
              # Assume que o último token dá a linha/coluna final se existir
              last_line = tokens[-1].linha if tokens else 1
              last_col = tokens[-1].coluna if tokens else 1
-             self.tokens.append(Token(TokenType.EOF, "EOF", last_line, last_col + 1))
+             # Numa cópia: a lista recebida pode estar sendo lida por outra thread
+             self.tokens = list(tokens) + [Token(TokenType.EOF, "EOF", last_line, last_col + 1)]
         
         self.current_token = self.tokens[0]
 
@@ -77,37 +89,71 @@ class Parser:
     # Procedimentos recursivos para cada não-terminal
 
     def parse(self):
-        """Inicia a análise"""
-        self.programa()
+        """Inicia a análise e devolve a árvore sintática"""
+        programa = self.programa()
         # Após o programa, devemos estar no token EOF
         if not self.match(TokenType.EOF):
              self.error(f"Tokens inesperados após o fim do programa. Encontrado: {self.current_token.tipo}")
+        return programa
 
     def programa(self):
-        """programa : 'function' 'main' '(' ')' '{' corpo '}'"""
-        self.expect(TokenType.FUNCTION)
-        self.expect(TokenType.MAIN)
+        """programa : funcao { funcao }"""
+        inicio = self.current_token
+        funcoes = [self.funcao()]
+        while self.match(TokenType.FUNCTION):
+            funcoes.append(self.funcao())
+        return Programa(funcoes, inicio.linha)
+
+    def funcao(self):
+        """funcao : 'function' ('main' | ID) '(' [parametros] ')' '{' corpo '}'"""
+        inicio = self.expect(TokenType.FUNCTION)
+        nome = self.current_token
+        if self.match(TokenType.MAIN, TokenType.ID):
+            self.advance()
+        else:
+            self.error("Esperado nome da função")
         self.expect(TokenType.LPAREN)
+        parametros = self.parametros() if self.match(TokenType.ID) else []
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.LBRACE)
-        self.corpo()
+        declaracoes, comandos = self.corpo()
         self.expect(TokenType.RBRACE)
+        return Funcao(nome.valor, parametros, declaracoes, comandos, inicio.linha)
+
+    def parametros(self):
+        """parametros : parametro { ',' parametro }"""
+        parametros = [self.parametro()]
+        while self.match(TokenType.COMMA):
+            self.advance()
+            parametros.append(self.parametro())
+        return parametros
+
+    def parametro(self):
+        """parametro : ID ':' tipo"""
+        nome = self.expect(TokenType.ID)
+        self.expect(TokenType.COLON)
+        tipo = self.tipo()
+        return Declaracao(nome.valor, tipo, False, nome.linha)
 
     def corpo(self):
         """corpo : declaracoes comandos"""
         # Modificado para permitir 0 ou mais declarações
-        self.declaracoes()
+        declaracoes = self.declaracoes()
         # Modificado para permitir 0 ou mais comandos
-        self.comandos()
+        comandos = self.comandos()
+        return declaracoes, comandos
 
     def declaracoes(self):
         """declaracoes : declaracao declaracoes | ε"""
         # Permite 0 ou mais declarações
+        declaracoes = []
         while self.match(TokenType.LET, TokenType.CONST):
-            self.declaracao()
+            declaracoes.append(self.declaracao())
+        return declaracoes
 
     def declaracao(self):
         """declaracao : ('let' | 'const') ID ':' tipo ';'"""
+        inicio = self.current_token
         if self.match(TokenType.LET):
             self.advance()
         elif self.match(TokenType.CONST):
@@ -116,65 +162,95 @@ class Parser:
             # Isso não deve acontecer se chamado por 'declaracoes'
             self.error("Esperado 'let' ou 'const'")
 
-        self.expect(TokenType.ID)
+        nome = self.expect(TokenType.ID)
         self.expect(TokenType.COLON)
-        self.tipo()
+        tipo = self.tipo()
         self.expect(TokenType.SEMICOLON)
+        return Declaracao(nome.valor, tipo, inicio.tipo == TokenType.CONST, inicio.linha)
 
     def tipo(self):
         """tipo : 'number' | 'float'"""
+        tipo = self.current_token.tipo
         if self.match(TokenType.NUMBER):
             self.advance()
         elif self.match(TokenType.FLOAT):
             self.advance()
         else:
             self.error("Tipo inválido: esperado 'number' ou 'float'")
+        return tipo
 
     def comandos(self):
         """comandos : comando comandos | ε"""
         # Permite 0 ou mais comandos
-        # First(comando) = {ID, READ, CONSOLE_LOG, IF, WHILE, LBRACE}
-        while self.match(TokenType.ID, TokenType.READ, TokenType.CONSOLE_LOG,
-                         TokenType.IF, TokenType.WHILE, TokenType.LBRACE):
-            self.comando()
+        comandos = []
+        while self.match(*self.INICIO_COMANDO):
+            comandos.append(self.comando())
+        return comandos
 
     def comando(self):
-        """comando : atribuicao | leitura | escrita | condicional | repeticao | blocoInterno"""
+        """comando : atribuicao | chamada | leitura | escrita | condicional | repeticao | blocoInterno"""
         if self.match(TokenType.ID):
-            self.atribuicao()
+            if self.peek_token().tipo == TokenType.LPAREN:
+                return self.chamada()
+            return self.atribuicao()
         elif self.match(TokenType.READ):
-            self.leitura()
+            return self.leitura()
         elif self.match(TokenType.CONSOLE_LOG):
-            self.escrita()
+            return self.escrita()
         elif self.match(TokenType.IF):
-            self.condicional()
+            return self.condicional()
         elif self.match(TokenType.WHILE):
-            self.repeticao()
+            return self.repeticao()
         elif self.match(TokenType.LBRACE):
-            self.blocoInterno()
+            return self.blocoInterno()
         else:
             self.error("Comando inválido")
 
     def atribuicao(self):
         """atribuicao : ID '=' expressaoAritmetica ';'"""
-        self.expect(TokenType.ID)
+        nome = self.expect(TokenType.ID)
         self.expect(TokenType.ASSIGN)
-        self.expressaoAritmetica()
+        expressao = self.expressaoAritmetica()
+        self.expect(TokenType.SEMICOLON)
+        return Atribuicao(nome.valor, expressao, nome.linha)
+
+    def chamada(self):
+        """chamada : ID '(' [argumentos] ')' ';'"""
+        nome = self.expect(TokenType.ID)
+        self.expect(TokenType.LPAREN)
+        argumentos = []
+        if not self.match(TokenType.RPAREN):
+            argumentos = self.argumentos()
+        self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
+        return Chamada(nome.valor, argumentos, nome.linha)
+
+    def argumentos(self):
+        """argumentos : expressaoAritmetica { ',' expressaoAritmetica }"""
+        argumentos = [self.expressaoAritmetica()]
+        while self.match(TokenType.COMMA):
+            self.advance()
+            argumentos.append(self.expressaoAritmetica())
+        return argumentos
 
     def leitura(self):
         """leitura : 'read' '(' ID ')' ';'"""
-        self.expect(TokenType.READ)
+        inicio = self.expect(TokenType.READ)
         self.expect(TokenType.LPAREN)
-        self.expect(TokenType.ID)
+        nome = self.expect(TokenType.ID)
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
+        return Leitura(nome.valor, inicio.linha)
 
     def escrita(self):
         """escrita : 'console.log' '(' (ID | STRING) ')' ';'"""
-        self.expect(TokenType.CONSOLE_LOG)
+        inicio = self.expect(TokenType.CONSOLE_LOG)
         self.expect(TokenType.LPAREN)
-        if self.match(TokenType.ID, TokenType.STRING):
+        if self.match(TokenType.ID):
+            expressao = Variavel(self.current_token.valor, self.current_token.linha)
+            self.advance()
+        elif self.match(TokenType.STRING):
+            expressao = Texto(self.current_token.valor, self.current_token.linha)
             self.advance()
         # CORREÇÃO: A gramática original também deveria permitir
         #           qualquer expressão aritmética.
@@ -184,105 +260,129 @@ class Parser:
         #     self.advance()
         else:
             # Vamos permitir qualquer expressão
-            self.expressaoRelacional() 
+            expressao = self.expressaoRelacional()
             # self.error("Esperado ID ou STRING em console.log")
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
+        return Escrita(expressao, inicio.linha)
 
     def condicional(self):
         """condicional : 'if' '(' expressaoRelacional ')' blocoInterno
                        | 'if' '(' expressaoRelacional ')' blocoInterno 'else' blocoInterno"""
-        self.expect(TokenType.IF)
+        inicio = self.expect(TokenType.IF)
         self.expect(TokenType.LPAREN)
-        self.expressaoRelacional()
+        condicao = self.expressaoRelacional()
         self.expect(TokenType.RPAREN)
-        self.blocoInterno()
+        entao = self.blocoInterno()
 
+        senao = None
         if self.match(TokenType.ELSE):
             self.advance()
-            self.blocoInterno()
+            senao = self.blocoInterno()
+        return Condicional(condicao, entao, senao, inicio.linha)
 
     def repeticao(self):
         """repeticao : 'while' '(' expressaoRelacional ')' blocoInterno"""
-        self.expect(TokenType.WHILE)
+        inicio = self.expect(TokenType.WHILE)
         self.expect(TokenType.LPAREN)
-        self.expressaoRelacional()
+        condicao = self.expressaoRelacional()
         self.expect(TokenType.RPAREN)
-        self.blocoInterno()
+        corpo = self.blocoInterno()
+        return Repeticao(condicao, corpo, inicio.linha)
 
     def blocoInterno(self):
         """blocoInterno : '{' comandos '}'"""
-        self.expect(TokenType.LBRACE)
-        self.comandos() # 'comandos' agora permite 0 comandos
+        inicio = self.expect(TokenType.LBRACE)
+        comandos = self.comandos() # 'comandos' agora permite 0 comandos
         self.expect(TokenType.RBRACE)
+        return Bloco(comandos, inicio.linha)
 
     def expressaoAritmetica(self):
         """expressaoAritmetica : termo expressaoAritmetica'"""
-        self.termo()
-        self.expressaoAritmetica_linha()
+        esquerda = self.termo()
+        return self.expressaoAritmetica_linha(esquerda)
 
-    def expressaoAritmetica_linha(self):
+    def expressaoAritmetica_linha(self, esquerda):
         """expressaoAritmetica' : ('+' | '-') termo expressaoAritmetica' | ε"""
+        # 'esquerda' acumula o operando já reconhecido (associatividade à esquerda)
         if self.match(TokenType.PLUS, TokenType.MINUS):
+            operador = self.current_token
             self.advance()
-            self.termo()
-            self.expressaoAritmetica_linha()
+            direita = self.termo()
+            return self.expressaoAritmetica_linha(
+                Binaria(operador.tipo, esquerda, direita, operador.linha))
+        return esquerda
 
     def termo(self):
         """termo : fator termo'"""
-        self.fator()
-        self.termo_linha()
+        esquerda = self.fator()
+        return self.termo_linha(esquerda)
 
-    def termo_linha(self):
+    def termo_linha(self, esquerda):
         """termo' : ('*' | '/' | '%') fator termo' | ε"""
         # Corrigido para incluir MOD (módulo)
         if self.match(TokenType.MULT, TokenType.DIV, TokenType.MOD):
+            operador = self.current_token
             self.advance()
-            self.fator()
-            self.termo_linha()
+            direita = self.fator()
+            return self.termo_linha(Binaria(operador.tipo, esquerda, direita, operador.linha))
+        return esquerda
 
     def fator(self):
         """fator : NUMINT | NUMREAL | ID | '(' expressaoRelacional ')'"""
         # CORREÇÃO: Alterado de 'expressaoAritmetica' para 'expressaoRelacional'
         # para resolver o conflito gramatical.
-        if self.match(TokenType.NUMINT, TokenType.NUMREAL, TokenType.ID):
+        token = self.current_token
+        if self.match(TokenType.NUMINT, TokenType.NUMREAL):
+            self.advance()
+            return Numero(token.valor, token.linha)
+        elif self.match(TokenType.ID):
             self.advance()
+            return Variavel(token.valor, token.linha)
         elif self.match(TokenType.LPAREN):
             self.advance()
-            self.expressaoRelacional() # Chamada recursiva para a expressão de maior precedência
+            expressao = self.expressaoRelacional() # Chamada recursiva para a expressão de maior precedência
             self.expect(TokenType.RPAREN)
+            return expressao
         else:
             self.error("Fator inválido: esperado Número, ID ou '('")
 
     def expressaoRelacional(self):
         """expressaoRelacional : termoRelacional expressaoRelacional'"""
         # print("Entrando em expressaoRelacional") # Debug removido
-        self.termoRelacional()
-        self.expressaoRelacional_linha()
+        esquerda = self.termoRelacional()
+        return self.expressaoRelacional_linha(esquerda)
 
-    def expressaoRelacional_linha(self):
+    def expressaoRelacional_linha(self, esquerda):
         """expressaoRelacional' : operadorLogico termoRelacional expressaoRelacional' | ε"""
         if self.match(TokenType.AND, TokenType.OR):
+            operador = self.current_token
             self.advance() # operadorLogico consumido
-            self.termoRelacional()
-            self.expressaoRelacional_linha()
+            direita = self.termoRelacional()
+            return self.expressaoRelacional_linha(
+                Binaria(operador.tipo, esquerda, direita, operador.linha))
+        return esquerda
 
     def termoRelacional(self):
         """termoRelacional : expressaoAritmetica (operadorRelacional expressaoAritmetica)?"""
         # CORREÇÃO: Gramática simplificada.
         # A regra 'LPAREN expressaoRelacional RPAREN' foi movida para 'fator'.
-        self.expressaoAritmetica()
+        esquerda = self.expressaoAritmetica()
         
         # Verifica se há uma parte relacional (opcional)
         if self.match(TokenType.LT, TokenType.GT, TokenType.LTE, 
                       TokenType.GTE, TokenType.EQ, TokenType.NEQ):
-            self.operadorRelacional()
-            self.expressaoAritmetica()
+            operador = self.operadorRelacional()
+            direita = self.expressaoAritmetica()
+            return Binaria(operador.tipo, esquerda, direita, operador.linha)
+        return esquerda
 
     def operadorRelacional(self):
         """operadorRelacional : '<' | '>' | '<=' | '>=' | '==' | '!='"""
+        operador = self.current_token
         if self.match(TokenType.LT, TokenType.GT, TokenType.LTE,
                       TokenType.GTE, TokenType.EQ, TokenType.NEQ):
             self.advance()
         else:
             self.error("Operador relacional esperado")
+        return operador
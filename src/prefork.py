@@ -0,0 +1,169 @@
+"""
+Prefork - Processos filhos criados com fork depois de carregar tudo no pai
+O programa fica numa imagem .mcb (buffer imutável, sem um objeto Python por
+instrução) e os objetos do pai saem do coletor de lixo (gc.freeze) antes do
+fork: os filhos só leem as páginas herdadas, que continuam compartilhadas
+(copy-on-write) em vez de serem copiadas por contagens de referência e pelo GC
+"""
+
+import gc
+import multiprocessing
+import os
+import time
+from contextlib import contextmanager
+
+from . import binario
+from .maquina import MaquinaVirtual, EntradaArquivo, SaidaArquivo, ExecutionError, Estado
+
+
+# Campos de /proc/<pid>/smaps_rollup (kB) e os nomes usados nas estatísticas
+CAMPOS_MEMORIA = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "compartilhada_limpa",
+                  "Shared_Dirty": "compartilhada_suja", "Private_Clean": "privada_limpa",
+                  "Private_Dirty": "privada_suja"}
+
+
+def memoria_processo(pid="self"):
+    """
+    Memória do processo em kB: rss, pss (rss dividindo as páginas
+    compartilhadas entre os processos que as usam), compartilhada e privada.
+    None onde não há /proc/<pid>/smaps_rollup (fora do Linux).
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+            linhas = f.readlines()
+    except OSError:
+        return None
+    memoria = {}
+    for linha in linhas:
+        campo, _, resto = linha.partition(':')
+        if campo in CAMPOS_MEMORIA:
+            memoria[CAMPOS_MEMORIA[campo]] = int(resto.split()[0])
+    memoria["compartilhada"] = (memoria.get("compartilhada_limpa", 0)
+                                + memoria.get("compartilhada_suja", 0))
+    memoria["privada"] = memoria.get("privada_limpa", 0) + memoria.get("privada_suja", 0)
+    return memoria
+
+
+def contexto_fork():
+    """
+    Contexto de multiprocessing com fork (None onde fork não existe: os
+    filhos começam do zero e não herdam nada do pai)
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+@contextmanager
+def congelado():
+    """
+    Tira os objetos existentes do rastreamento do GC enquanto os filhos são
+    criados: as coletas nos filhos não escrevem nos cabeçalhos herdados.
+    """
+    gc.collect()
+    gc.freeze()
+    try:
+        yield
+    finally:
+        gc.unfreeze()
+
+
+def imagem(programa):
+    """O programa sobre um buffer imutável (a imagem .mcb em memória)"""
+    if isinstance(programa.ops, memoryview):
+        return programa
+    return binario.de_buffer(binario.serializar(programa))
+
+
+# Imagem herdada pelos filhos (definida no pai antes do fork)
+_programa = None
+
+
+def herda_memoria():
+    """Os filhos herdam a memória do pai (fork)?"""
+    contexto = contexto_fork()
+    return contexto is not None and contexto.get_start_method() == "fork"
+
+
+def _instalar(dados):
+    """Sem fork: cada filho recebe os bytes da imagem ao ser criado"""
+    global _programa
+    _programa = binario.de_buffer(dados)
+
+
+def executar_arquivo(programa, entrada, saida, jit=True):
+    """Executa o programa lendo de 'entrada' e escrevendo em 'saida' (caminhos)"""
+    inicio = time.perf_counter()
+    resultado = {"entrada": entrada, "saida": saida, "estado": None, "erro": None,
+                 "instrucoes": 0}
+    maquina = None
+    try:
+        with open(entrada, 'rb') as arquivo_entrada, \
+                open(saida, 'w', encoding='utf-8', newline='') as arquivo_saida:
+            maquina = MaquinaVirtual(programa, EntradaArquivo(arquivo_entrada),
+                                     SaidaArquivo(arquivo_saida), compilar=jit)
+            resultado["estado"] = maquina.executar()
+    except ExecutionError as e:
+        resultado.update(estado=Estado.ERRO, erro=str(e))
+    except OSError as e:
+        resultado.update(estado=Estado.ERRO, erro=f"Erro de arquivo: {e}")
+    if maquina is not None:
+        resultado["instrucoes"] = maquina.instrucoes
+    resultado["ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+    return resultado
+
+
+def _executar_pacote(entradas, jit):
+    """Executa um pacote de entradas no filho e mede a memória dele em seguida"""
+    resultados = [executar_arquivo(_programa, entrada, entrada + PoolPreFork.EXTENSAO_SAIDA, jit)
+                  for entrada in entradas]
+    return {"pid": os.getpid(), "memoria": memoria_processo(), "resultados": resultados}
+
+
+class PoolPreFork:
+    """
+    Executa o mesmo programa para muitas entradas em processos pré-carregados.
+
+    A imagem do programa, os módulos da máquina e do JIT e as tabelas do
+    lexer já estão no pai quando os filhos são criados com fork, com gc.freeze()
+    (ver lote._resultados_paralelos). Onde não há fork, cada filho recebe a
+    imagem serializada e nada é compartilhado. A saída de cada entrada vai
+    para '<entrada>.out'.
+    'trabalhadores' guarda a última medição de memória de cada filho.
+    """
+
+    EXTENSAO_SAIDA = ".out"
+
+    def __init__(self, programa, processos=None, jit=True):
+        self.programa = imagem(programa)
+        self.processos = processos or os.cpu_count() or 1
+        self.jit = jit
+        self.trabalhadores = {}
+        # Pré-carrega o que os filhos usam, para que seja herdado compartilhado
+        from . import jit as _jit, lexer as _lexer, parser as _parser  # noqa: F401
+
+    def executar(self, entradas):
+        """Gera o resultado de cada entrada (na ordem em que terminam)"""
+        global _programa
+        from .lote import _resultados_paralelos
+
+        _programa = self.programa
+        inicializacao = {}
+        if not herda_memoria():
+            inicializacao = {"inicializador": _instalar,
+                             "iniciais": (binario.serializar(self.programa),)}
+        for pacote in _resultados_paralelos(entradas, self.processos, _executar_pacote, self.jit,
+                                            **inicializacao):
+            if pacote["memoria"] is not None:
+                self.trabalhadores[pacote["pid"]] = pacote["memoria"]
+            yield from pacote["resultados"]
+
+    def resumo_memoria(self):
+        """Totais dos filhos: a soma do PSS é a memória que eles ocupam de fato"""
+        medicoes = list(self.trabalhadores.values())
+        if not medicoes:
+            return None
+        total = {campo: sum(m.get(campo, 0) for m in medicoes)
+                 for campo in ("rss", "pss", "compartilhada", "privada")}
+        total["processos"] = len(medicoes)
+        return total
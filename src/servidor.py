@@ -0,0 +1,255 @@
+"""
+Servidor - Daemon de compilação em socket Unix
+Mantém o compilador carregado (asyncio) e responde a pedidos em JSON lines
+
+Protocolo: cada linha enviada é um objeto JSON com o campo "op":
+- {"op": "compilar", "caminho": "..."} ou {"op": "compilar", "fonte": "..."}
+- {"op": "stats"}
+- {"op": "ping"}
+- {"op": "encerrar"}
+Cada pedido recebe exatamente uma linha JSON de resposta; linhas maiores que
+LIMITE_PEDIDO são descartadas e respondidas com erro.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+
+from .lote import compilar_fonte
+
+# Marca devolvida por _ler_linha para um pedido maior que o limite
+LINHA_LONGA = object()
+
+
+class Histograma:
+    """Histograma de latências em faixas de potências de 2 (microssegundos)"""
+
+    def __init__(self, faixas=24):
+        self.contagens = [0] * faixas
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos):
+        micros = segundos * 1e6
+        indice = min(max(int(micros), 1).bit_length() - 1, len(self.contagens) - 1)
+        self.contagens[indice] += 1
+        self.total += 1
+        self.soma += segundos
+        self.maximo = max(self.maximo, segundos)
+
+    def percentil(self, p):
+        """Limite superior (µs) da faixa que contém o percentil p"""
+        if not self.total:
+            return None
+        alvo = p * self.total
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return 2 ** (indice + 1)
+        return 2 ** len(self.contagens)
+
+    def como_dict(self):
+        return {
+            "total": self.total,
+            "media_us": round(self.soma / self.total * 1e6, 1) if self.total else None,
+            "max_us": round(self.maximo * 1e6, 1),
+            "p50_us": self.percentil(0.50),
+            "p99_us": self.percentil(0.99),
+            # Chave: limite superior da faixa em µs
+            "faixas": {str(2 ** (i + 1)): c for i, c in enumerate(self.contagens) if c},
+        }
+
+
+class ServidorCompilacao:
+    """Daemon asyncio que compila arquivos ou fontes recebidos pelo socket"""
+
+    OPERACOES = ("compilar", "stats", "ping", "encerrar")
+
+    # Tamanho máximo de uma linha de pedido (fontes vão inteiras no JSON)
+    LIMITE_PEDIDO = 16 * 1024 * 1024
+
+    def __init__(self, caminho_socket, tempo_ocioso=600.0):
+        self.caminho_socket = caminho_socket
+        self.tempo_ocioso = tempo_ocioso
+        self.inicio = time.monotonic()
+        self.ultima_atividade = self.inicio
+        self.conexoes_ativas = 0
+        self.conexoes_total = 0
+        self.pedidos = {}
+        self.erros = 0
+        self.latencias = {}
+        self._servidor = None
+        self._encerrar = None
+        self._conexoes = set()      # tarefas que atendem os clientes conectados
+
+    async def servir(self):
+        """Atende pedidos até receber 'encerrar' ou ficar ocioso"""
+        self._encerrar = asyncio.Event()
+        self._remover_socket_orfao()
+        self._servidor = await asyncio.start_unix_server(self._atender, path=self.caminho_socket,
+                                                         limit=self.LIMITE_PEDIDO)
+        vigia = asyncio.ensure_future(self._vigiar_ociosidade())
+        try:
+            await self._encerrar.wait()
+        finally:
+            vigia.cancel()
+            self._servidor.close()
+            # Clientes que continuam conectados (ex.: um editor) não seguram o
+            # daemon: desde o Python 3.12, wait_closed() espera todas as conexões
+            for tarefa in self._conexoes:
+                tarefa.cancel()
+            await asyncio.gather(*self._conexoes, return_exceptions=True)
+            await self._servidor.wait_closed()
+            if os.path.exists(self.caminho_socket):
+                os.unlink(self.caminho_socket)
+
+    def encerrar(self):
+        if self._encerrar is not None:
+            self._encerrar.set()
+
+    def _remover_socket_orfao(self):
+        """Remove o arquivo de socket deixado por um servidor que não está mais rodando"""
+        if not os.path.exists(self.caminho_socket):
+            return
+        sonda = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sonda.connect(self.caminho_socket)
+        except OSError:
+            os.unlink(self.caminho_socket)
+        else:
+            raise OSError(f"Já existe um servidor escutando em {self.caminho_socket}")
+        finally:
+            sonda.close()
+
+    async def _vigiar_ociosidade(self):
+        while True:
+            restante = self.ultima_atividade + self.tempo_ocioso - time.monotonic()
+            if restante <= 0:
+                self.encerrar()
+                return
+            await asyncio.sleep(restante)
+
+    async def _atender(self, reader, writer):
+        tarefa = asyncio.current_task()
+        self._conexoes.add(tarefa)
+        self.conexoes_ativas += 1
+        self.conexoes_total += 1
+        try:
+            while True:
+                linha = await self._ler_linha(reader)
+                if linha is None:
+                    break
+                if linha is LINHA_LONGA:
+                    self.erros += 1
+                    resposta = {"ok": False,
+                                "erro": f"Pedido maior que {self.LIMITE_PEDIDO} bytes"}
+                else:
+                    resposta = self.processar(linha)
+                writer.write(json.dumps(resposta, ensure_ascii=False).encode('utf-8') + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelada quando o servidor encerra com o cliente ainda conectado
+            pass
+        finally:
+            self._conexoes.discard(tarefa)
+            self.conexoes_ativas -= 1
+            writer.close()
+
+    async def _ler_linha(self, reader):
+        """Próxima linha; None no fim da conexão; LINHA_LONGA (já descartada) se passar do limite"""
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial or None
+        except asyncio.LimitOverrunError as e:
+            consumidos = e.consumed
+        # Descarta o resto da linha em blocos, sem acumulá-la
+        while True:
+            await reader.readexactly(consumidos)
+            try:
+                await reader.readuntil(b"\n")
+                return LINHA_LONGA
+            except asyncio.IncompleteReadError:
+                return LINHA_LONGA
+            except asyncio.LimitOverrunError as e:
+                consumidos = e.consumed
+
+    def processar(self, linha):
+        """Processa uma linha de pedido e devolve o objeto de resposta"""
+        inicio = time.perf_counter()
+        self.ultima_atividade = time.monotonic()
+        try:
+            pedido = json.loads(linha)
+            op = pedido.get("op", "compilar")
+        except (ValueError, AttributeError, RecursionError):
+            pedido, op = {}, "invalido"
+
+        # Só operações conhecidas ganham contador e histograma próprios
+        if not isinstance(op, str) or op not in self.OPERACOES:
+            resposta = {"ok": False, "erro": f"Pedido inválido: {op}"}
+            op = "invalido"
+        else:
+            try:
+                resposta = self._executar(op, pedido)
+            except Exception as e:
+                # Ex.: RecursionError ao compilar expressões muito aninhadas
+                resposta = {"ok": False, "erro": f"Erro interno: {type(e).__name__}: {e}"}
+
+        if not resposta["ok"]:
+            self.erros += 1
+        self.pedidos[op] = self.pedidos.get(op, 0) + 1
+        if op not in self.latencias:
+            self.latencias[op] = Histograma()
+        self.latencias[op].registrar(time.perf_counter() - inicio)
+        if "id" in pedido:
+            resposta["id"] = pedido["id"]
+        return resposta
+
+    def _executar(self, op, pedido):
+        if op == "compilar":
+            return self._compilar(pedido)
+        if op == "stats":
+            return {"ok": True, "stats": self.estatisticas()}
+        if op == "encerrar":
+            self.encerrar()
+        return {"ok": True}
+
+    def _compilar(self, pedido):
+        if "fonte" in pedido:
+            if not isinstance(pedido["fonte"], str):
+                return {"ok": False, "erro": "Campo 'fonte' deve ser uma string"}
+            return compilar_fonte(pedido["fonte"])
+        caminho = pedido.get("caminho")
+        if caminho is None or caminho == "":
+            return {"ok": False, "erro": "Pedido 'compilar' sem 'caminho' ou 'fonte'"}
+        # Um inteiro faria open() usar (e fechar) um descritor do próprio daemon
+        if not isinstance(caminho, str):
+            return {"ok": False, "erro": "Campo 'caminho' deve ser uma string"}
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                codigo_fonte = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            return {"ok": False, "erro": f"Erro de leitura: {e}", "arquivo": caminho}
+        resultado = compilar_fonte(codigo_fonte)
+        resultado["arquivo"] = caminho
+        return resultado
+
+    def estatisticas(self):
+        return {
+            "pid": os.getpid(),
+            "ativo_s": round(time.monotonic() - self.inicio, 3),
+            "conexoes_ativas": self.conexoes_ativas,
+            "conexoes_total": self.conexoes_total,
+            "pedidos": dict(self.pedidos),
+            "erros": self.erros,
+            "latencia": {op: h.como_dict() for op, h in self.latencias.items()},
+        }
+
+
+def servir(caminho_socket, tempo_ocioso=600.0):
+    """Executa o servidor em primeiro plano até o encerramento"""
+    asyncio.run(ServidorCompilacao(caminho_socket, tempo_ocioso).servir())
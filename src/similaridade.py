@@ -0,0 +1,289 @@
+"""
+Similaridade - Índice de impressões digitais para detectar programas quase iguais
+Cada arquivo vira a sequência de tipos de token do Lexer (nomes e literais
+normalizados), da qual se extraem k-gramas com hash e se escolhem impressões
+por winnowing. Um índice invertido em SQLite (impressão -> documentos) responde
+às consultas de similaridade sem comparar os arquivos dois a dois
+"""
+
+import builtins
+import os
+import sqlite3
+import time
+from array import array
+
+from .lexer import Lexer
+from .token_types import TokenType
+from .lote import expandir_entradas, _pacotes, _resultados_paralelos, TAMANHO_PACOTE
+
+
+# 2: caminhos gravados como absolutos (os.path.realpath)
+VERSAO = 2
+
+# Tokens por k-grama e k-gramas por janela do winnowing: qualquer trecho comum
+# de pelo menos K + JANELA - 1 tokens gera ao menos uma impressão em comum
+K = 8
+JANELA = 6
+
+# Código de cada tipo de token, gravado nas impressões dos índices existentes:
+# nunca mude um código; tipos novos recebem o próximo número livre
+CODIGOS = {
+    TokenType.AND: 1, TokenType.ASSIGN: 2, TokenType.COLON: 3, TokenType.COMMA: 4,
+    TokenType.CONSOLE_LOG: 5, TokenType.CONST: 6, TokenType.DIV: 7, TokenType.ELSE: 8,
+    TokenType.EOF: 9, TokenType.EQ: 10, TokenType.ERROR: 11, TokenType.FLOAT: 12,
+    TokenType.FUNCTION: 13, TokenType.GT: 14, TokenType.GTE: 15, TokenType.ID: 16,
+    TokenType.IF: 17, TokenType.LBRACE: 18, TokenType.LET: 19, TokenType.LPAREN: 20,
+    TokenType.LT: 21, TokenType.LTE: 22, TokenType.MAIN: 23, TokenType.MINUS: 24,
+    TokenType.MOD: 25, TokenType.MULT: 26, TokenType.NEQ: 27, TokenType.NOT: 28,
+    TokenType.NUMBER: 29, TokenType.NUMINT: 30, TokenType.NUMREAL: 31, TokenType.OR: 32,
+    TokenType.PLUS: 33, TokenType.RBRACE: 34, TokenType.READ: 35, TokenType.RPAREN: 36,
+    TokenType.SEMICOLON: 37, TokenType.STRING: 38, TokenType.WHILE: 39,
+}
+
+BASE = 131
+MODULO = (1 << 61) - 1
+MISTURA = 0x9E3779B97F4A7C15        # espalha os hashes para o mínimo da janela não ter viés
+
+
+class SimilarityError(Exception):
+    """Índice inválido ou criado com outros parâmetros"""
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return f"Erro de Similaridade: {self.message}"
+
+
+def normalizar(codigo_fonte):
+    """Códigos dos tipos de token (sem o EOF): renomear variáveis não muda nada"""
+    return [CODIGOS[token.tipo] for token in Lexer(codigo_fonte).tokenize()
+            if token.tipo != TokenType.EOF]
+
+
+def _hashes(codigos, k):
+    """Hash de cada k-grama (rolante), em inteiros de 63 bits"""
+    if len(codigos) < k:
+        k = len(codigos)
+        if not k:
+            return []
+    potencia = pow(BASE, k - 1, MODULO)
+    h = 0
+    for codigo in codigos[:k]:
+        h = (h * BASE + codigo) % MODULO
+    hashes = [(h * MISTURA) % (1 << 64) >> 1]
+    for i in range(k, len(codigos)):
+        h = ((h - codigos[i - k] * potencia) * BASE + codigos[i]) % MODULO
+        hashes.append((h * MISTURA) % (1 << 64) >> 1)
+    return hashes
+
+
+def impressoes(codigo_fonte, k=K, janela=JANELA):
+    """Conjunto de impressões do programa (winnowing dos hashes dos k-gramas)"""
+    hashes = _hashes(normalizar(codigo_fonte), k)
+    if len(hashes) <= janela:
+        return set(hashes[:1] and [min(hashes)])
+    escolhidas = set()
+    anterior = -1
+    for inicio in range(len(hashes) - janela + 1):
+        # Mínimo mais à direita da janela; só registra quando a escolha muda
+        posicao = inicio
+        for i in range(inicio + 1, inicio + janela):
+            if hashes[i] <= hashes[posicao]:
+                posicao = i
+        if posicao != anterior:
+            escolhidas.add(hashes[posicao])
+            anterior = posicao
+    return escolhidas
+
+
+def impressoes_arquivo(caminho, k=K, janela=JANELA):
+    """Impressões de um arquivo, ou o erro que impediu de obtê-las"""
+    resultado = {"arquivo": caminho, "ok": True, "erro": None, "impressoes": None}
+    try:
+        estado = os.stat(caminho)
+        with open(caminho, 'r', encoding='utf-8') as f:
+            codigo_fonte = f.read()
+        resultado["impressoes"] = sorted(impressoes(codigo_fonte, k, janela))
+    except (OSError, UnicodeDecodeError) as e:
+        resultado.update(ok=False, erro=f"Erro de leitura: {e}")
+    except builtins.SyntaxError as e:
+        resultado.update(ok=False, erro=str(e))
+    else:
+        resultado["mtime"] = estado.st_mtime_ns
+        resultado["bytes"] = estado.st_size
+    return resultado
+
+
+def impressoes_pacote(caminhos, k, janela):
+    """Impressões de um pacote de arquivos (executado nos processos filhos)"""
+    return [impressoes_arquivo(caminho, k, janela) for caminho in caminhos]
+
+
+class IndiceSimilaridade:
+    """
+    Índice invertido de impressões gravado num banco SQLite.
+
+    Os arquivos são acrescentados aos poucos (adicionar); um arquivo já
+    indexado só é reprocessado quando o tamanho ou a data de modificação
+    mudam. Consultas devolvem os documentos mais parecidos pelo índice de
+    Jaccard entre os conjuntos de impressões.
+    """
+
+    def __init__(self, caminho, k=K, janela=JANELA):
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        with self.conexao:
+            self.conexao.executescript("""
+                CREATE TABLE IF NOT EXISTS parametros (nome TEXT PRIMARY KEY, valor INTEGER);
+                CREATE TABLE IF NOT EXISTS documentos (
+                    id INTEGER PRIMARY KEY, arquivo TEXT UNIQUE NOT NULL,
+                    mtime INTEGER, bytes INTEGER, impressoes INTEGER, hashes BLOB);
+                CREATE TABLE IF NOT EXISTS impressoes (
+                    hash INTEGER, documento INTEGER,
+                    PRIMARY KEY (hash, documento)) WITHOUT ROWID;
+            """)
+            parametros = dict(self.conexao.execute("SELECT nome, valor FROM parametros"))
+            if not parametros:
+                self.conexao.executemany("INSERT INTO parametros VALUES (?, ?)",
+                                         [("versao", VERSAO), ("k", k), ("janela", janela)])
+            elif parametros.get("versao") != VERSAO:
+                raise SimilarityError(f"índice da versão {parametros.get('versao')}, "
+                                      f"esperada {VERSAO}")
+            else:
+                k, janela = parametros["k"], parametros["janela"]
+        self.k = k
+        self.janela = janela
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        self.conexao.close()
+
+    def __len__(self):
+        return self.conexao.execute("SELECT COUNT(*) FROM documentos").fetchone()[0]
+
+    def _mudou(self, caminho):
+        """O arquivo é novo ou mudou desde que foi indexado?"""
+        linha = self.conexao.execute("SELECT mtime, bytes FROM documentos WHERE arquivo = ?",
+                                     (caminho,)).fetchone()
+        if linha is None:
+            return True
+        try:
+            estado = os.stat(caminho)
+        except OSError:
+            return True
+        return linha != (estado.st_mtime_ns, estado.st_size)
+
+    def _gravar(self, resultado):
+        """Substitui as impressões de um documento (dentro da transação aberta)"""
+        caminho, hashes = resultado["arquivo"], resultado["impressoes"]
+        dados = array('q', hashes).tobytes()
+        linha = self.conexao.execute("SELECT id, hashes FROM documentos WHERE arquivo = ?",
+                                     (caminho,)).fetchone()
+        if linha is None:
+            documento = self.conexao.execute(
+                "INSERT INTO documentos (arquivo, mtime, bytes, impressoes, hashes) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (caminho, resultado["mtime"], resultado["bytes"], len(hashes), dados)).lastrowid
+        else:
+            # As impressões antigas ficam no documento: remove pela chave primária
+            documento, antigos = linha
+            self.conexao.executemany("DELETE FROM impressoes WHERE hash = ? AND documento = ?",
+                                     ((h, documento) for h in array('q', antigos)))
+            self.conexao.execute(
+                "UPDATE documentos SET mtime = ?, bytes = ?, impressoes = ?, hashes = ? "
+                "WHERE id = ?",
+                (resultado["mtime"], resultado["bytes"], len(hashes), dados, documento))
+        self.conexao.executemany("INSERT INTO impressoes VALUES (?, ?)",
+                                 ((h, documento) for h in hashes))
+        return linha is None
+
+    def adicionar(self, alvo, processos=None):
+        """
+        Indexa os .mc de um diretório ou glob (ou uma lista de caminhos).
+
+        Os arquivos são lidos em fluxo, em pacotes distribuídos entre
+        processos; só os pacotes em andamento ficam na memória. Devolve um
+        resumo com as contagens de novos, atualizados, inalterados e falhas.
+        """
+        processos = processos or os.cpu_count() or 1
+        inicio = time.perf_counter()
+        resumo = {"novos": 0, "atualizados": 0, "inalterados": 0, "falhas": 0, "erros": []}
+
+        # Caminhos absolutos: './a.mc' e 'a.mc' são o mesmo documento
+        caminhos = map(os.path.realpath,
+                       expandir_entradas(alvo) if isinstance(alvo, str) else alvo)
+
+        def pendentes():
+            for caminho in caminhos:
+                if self._mudou(caminho):
+                    yield caminho
+                else:
+                    resumo["inalterados"] += 1
+
+        if processos == 1:
+            lotes = (impressoes_pacote(pacote, self.k, self.janela)
+                     for pacote in _pacotes(pendentes(), TAMANHO_PACOTE))
+        else:
+            lotes = _resultados_paralelos(pendentes(), processos, impressoes_pacote,
+                                          self.k, self.janela)
+        for resultados in lotes:
+            with self.conexao:
+                for resultado in resultados:
+                    if not resultado["ok"]:
+                        resumo["falhas"] += 1
+                        resumo["erros"].append({"arquivo": resultado["arquivo"],
+                                                "erro": resultado["erro"]})
+                    elif self._gravar(resultado):
+                        resumo["novos"] += 1
+                    else:
+                        resumo["atualizados"] += 1
+        resumo["documentos"] = len(self)
+        resumo["segundos"] = round(time.perf_counter() - inicio, 3)
+        return resumo
+
+    def consultar(self, codigo_fonte, top=10, excluir=None):
+        """
+        Os 'top' documentos mais parecidos com o código-fonte, do mais ao
+        menos parecido: arquivo, impressões em comum, similaridade (Jaccard)
+        e contenção (fração das impressões da consulta presentes no documento).
+        'excluir' é um caminho absoluto, como os gravados por adicionar().
+        """
+        return self._consultar(impressoes(codigo_fonte, self.k, self.janela), top, excluir)
+
+    def consultar_arquivo(self, caminho, top=10):
+        """Como consultar(), sem contar o próprio arquivo se ele estiver indexado"""
+        with open(caminho, 'r', encoding='utf-8') as f:
+            codigo_fonte = f.read()
+        return self.consultar(codigo_fonte, top, excluir=os.path.realpath(caminho))
+
+    def _consultar(self, hashes, top, excluir):
+        if not hashes:
+            return []
+        conexao = self.conexao
+        conexao.execute("CREATE TEMP TABLE IF NOT EXISTS consulta (hash INTEGER PRIMARY KEY)")
+        with conexao:
+            conexao.execute("DELETE FROM consulta")
+            conexao.executemany("INSERT OR IGNORE INTO consulta VALUES (?)",
+                                ((h,) for h in hashes))
+            linhas = conexao.execute("""
+                SELECT d.arquivo, d.impressoes, comuns.quantidade
+                FROM (SELECT i.documento, COUNT(*) AS quantidade
+                      FROM consulta c CROSS JOIN impressoes i ON i.hash = c.hash
+                      GROUP BY i.documento) AS comuns
+                JOIN documentos d ON d.id = comuns.documento""").fetchall()
+        resultados = []
+        for arquivo, total, comuns in linhas:
+            if arquivo == excluir:
+                continue
+            resultados.append({
+                "arquivo": arquivo, "comuns": comuns,
+                "similaridade": round(comuns / (len(hashes) + total - comuns), 4),
+                "contencao": round(comuns / len(hashes), 4)})
+        resultados.sort(key=lambda r: (-r["similaridade"], -r["comuns"], r["arquivo"]))
+        return resultados[:top]
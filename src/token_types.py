@@ -45,6 +45,7 @@ class TokenType:
     RBRACE = "RBRACE"           # }
     SEMICOLON = "SEMICOLON"     # ;
     COLON = "COLON"             # :
+    COMMA = "COMMA"             # ,
     ASSIGN = "ASSIGN"           # =
 
     # Literais e identificadores
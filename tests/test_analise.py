@@ -0,0 +1,147 @@
+"""
+Test Suite - Testes da análise de intervalos e das verificações eliminadas com ela
+"""
+
+import sys
+import os
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.gerador import compilar_programa
+from src.instrucoes import OpCode
+from src.maquina import MaquinaVirtual, ExecutionError
+from src.analise import analisar
+
+LACOS = """function main() {
+    let n: number;
+    let i: number;
+    let s: number;
+    let m: float;
+    read(n);
+    i = 1;
+    while (i <= 100) {
+        s = s + 1000 / i + s % (i + 1);
+        if (i > 0) {
+            m = m + 1.0 / i;
+        }
+        if (n > 3) {
+            s = s - 1;
+        }
+        i = i + 1;
+    }
+    while (i < 50) {
+        s = s / 0;
+    }
+    s = s / n;
+    console.log(s);
+    console.log(m);
+}
+"""
+
+# Divisões e condições que a análise não pode provar (NaN, sinais, zero)
+SUSPEITOS = """function main() {
+    let x: float;
+    let y: float;
+    let n: number;
+    let k: number;
+    read(x);
+    read(n);
+    y = 2.0;
+    if (x > 0.0) {
+        y = 1.0 / x;
+    } else {
+        if (x <= 0.0) {
+            y = 0.0 - 1.0;
+        }
+    }
+    console.log(y);
+    k = 0 - 7;
+    while (k < n) {
+        console.log((k / 3));
+        console.log((k % 4));
+        if (k != 0) {
+            console.log((100 / k));
+        }
+        k = k + 3;
+    }
+    console.log((n / (n - 2)));
+    x = n;
+    k = x * 2.5;
+    console.log(k);
+}
+"""
+
+
+def executar(programa, entrada, jit=False):
+    maquina = MaquinaVirtual(programa, entrada, compilar=jit)
+    maquina.LIMIAR_COMPILACAO = 2
+    try:
+        return maquina.executar(), list(maquina.saida), None
+    except ExecutionError as e:
+        return "ERRO", list(maquina.saida), str(e)
+
+
+def test_provas_e_resumo():
+    """Testa widening no while, divisões provadas, condições constantes e o resumo"""
+    resumo = analisar(Parser(Lexer(LACOS).tokenize()).parse()).resumo()
+    por_linha = {}
+    for eliminacao in resumo["eliminacoes"]:
+        por_linha.setdefault(eliminacao["linha"], set()).add(eliminacao["tipo"])
+
+    assert por_linha[9] == {"divisao_direta", "sem_conversao"}      # s nunca fica negativo
+    assert "condicao_constante" in por_linha[10] and "divisor_nao_nulo" in por_linha[11]
+    assert "laco_removido" in por_linha[18]
+    assert por_linha[21] == {"sem_conversao"}       # s / n: n pode ser zero
+    assert {"funcao": "main", "linha": 13} in resumo["invariantes"]
+    assert resumo["inteiras"] == {"main": ["i", "s"]}
+    assert resumo["totais"]["condicao_constante"] == 1
+
+    programa = compilar_programa(LACOS, otimizar=True)
+    for op in (OpCode.IDIV, OpCode.IMOD, OpCode.DIV_NC, OpCode.STORE_RAW):
+        assert op in programa.ops
+    assert programa.ops.count(OpCode.DIV) == 1      # só a divisão por n
+    assert programa.ops.count(OpCode.LOOP) == 1     # o while que nunca executa sumiu
+    assert len(programa) < len(compilar_programa(LACOS))
+
+
+@pytest.mark.parametrize("entrada", [
+    ["2.0", "10"], ["-3.5", "2"], ["0.0", "-9"], ["nan", "0"], ["-0.0", "7"], ["inf", "1"],
+])
+@pytest.mark.parametrize("jit", [False, True])
+def test_mesmo_comportamento_com_e_sem_otimizacao(entrada, jit):
+    """Testa que a saída e os erros são os mesmos com e sem as eliminações"""
+    normal = compilar_programa(SUSPEITOS)
+    otimizado = compilar_programa(SUSPEITOS, otimizar=True)
+    assert executar(otimizado, entrada, jit) == executar(normal, entrada, jit)
+    # O que pode falhar continua verificado
+    assert OpCode.DIV in otimizado.ops and OpCode.STORE in otimizado.ops
+
+
+def test_cobertura_desliga_a_otimizacao():
+    """Testa que código instrumentado mantém todos os desvios e verificações"""
+    instrumentado = compilar_programa(LACOS, instrumentar=True, otimizar=True)
+    assert instrumentado.ops == compilar_programa(LACOS, instrumentar=True).ops
+    assert not {OpCode.STORE_RAW, OpCode.DIV_NC, OpCode.IDIV} & set(instrumentado.ops)
+
+
+def test_lacos_aninhados_em_tempo_linear():
+    """Testa que o custo da análise não multiplica a cada while aninhado"""
+    import time
+    nomes = [f"v{k}" for k in range(8)]
+    corpo = "s = s + 100 / (v0 + 1);"
+    for nome in reversed(nomes):
+        corpo = f"{nome} = 0; while ({nome} < 10) {{ {corpo} {nome} = {nome} + 1; }}"
+    fonte = ("function main() { " + "".join(f"let {nome}: number; " for nome in nomes)
+             + f"let s: number; {corpo} console.log(s); }}")
+    arvore = Parser(Lexer(fonte).tokenize()).parse()
+
+    inicio = time.perf_counter()
+    resumo = analisar(arvore).resumo()
+    assert time.perf_counter() - inicio < 2.0
+    # A precisão se mantém: o divisor v0 + 1 é positivo em todos os níveis
+    assert resumo["totais"] == {"divisao_direta": 1, "sem_conversao": 2 * len(nomes) + 1}
@@ -0,0 +1,157 @@
+"""
+Test Suite - Testes para o formato binário de programas (.mcb)
+"""
+
+import sys
+import os
+import subprocess
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.gerador import compilar_programa
+from src.maquina import MaquinaVirtual, ExecutionError
+from src import binario
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMA = """
+function mostra(x: float) {
+    console.log(x);
+}
+function main() {
+    let grande: number;
+    let y: float;
+    let d: number;
+    grande = 123456789012345678901234567890 * 3;
+    console.log(grande);
+    y = 0.1 + 25000000000.5;
+    mostra(y);
+    console.log("olá, mundo");
+    read(d);
+    d = 10 / d;
+}
+"""
+
+
+def test_ida_e_volta_preserva_o_programa(tmp_path):
+    """Testa que o programa carregado via mmap é idêntico e executa igual"""
+    programa = compilar_programa(PROGRAMA)
+    caminho = str(tmp_path / "prog.mcb")
+    binario.salvar(programa, caminho)
+    carregado = binario.carregar(caminho)
+
+    assert list(carregado.ops) == programa.ops and list(carregado.args) == programa.args
+    assert carregado.constantes == programa.constantes
+    assert list(carregado.linhas) == programa.linhas
+    assert carregado.impressao_digital() == programa.impressao_digital()
+    assert carregado.desmontar() == programa.desmontar()
+
+    esperado = MaquinaVirtual(programa, ["5"])
+    esperado.executar()
+    maquina = MaquinaVirtual(carregado, ["5"])
+    maquina.executar()
+    assert maquina.saida == esperado.saida
+    assert maquina.saida[0] == str(123456789012345678901234567890 * 3)
+
+    # A tabela de linhas compacta continua apontando a linha certa nos erros
+    with pytest.raises(ExecutionError) as erro:
+        MaquinaVirtual(carregado, ["0"]).executar()
+    assert erro.value.linha == 15
+
+
+def test_arquivo_invalido(tmp_path):
+    """Testa a rejeição de arquivos que não são .mcb ou de outra versão"""
+    dados = bytearray(binario.serializar(compilar_programa(PROGRAMA)))
+    with pytest.raises(binario.FormatError):
+        binario.de_buffer(b"isto nao e um programa de verdade, apenas texto")
+    dados[4] = binario.VERSAO + 1
+    with pytest.raises(binario.FormatError):
+        binario.de_buffer(bytes(dados))
+    vazio = tmp_path / "vazio.mcb"
+    vazio.write_bytes(b"")
+    with pytest.raises(binario.FormatError):
+        binario.carregar(str(vazio))
+
+
+def test_executar_mcb_nao_importa_lexer_nem_parser(tmp_path):
+    """Testa --emit e --run prog.mcb sem carregar o front-end do compilador"""
+    fonte = tmp_path / "prog.mc"
+    fonte.write_text(PROGRAMA, encoding='utf-8')
+    main = os.path.join(RAIZ, "main.py")
+    subprocess.run([sys.executable, main, str(fonte), "--emit"], check=True,
+                   capture_output=True)
+    codigo = (f"import sys; sys.argv = ['main.py', '--run', {str(tmp_path / 'prog.mcb')!r}]\n"
+              f"sys.path.insert(0, {RAIZ!r}); import main\n"
+              "try:\n    main.main()\nexcept SystemExit:\n    pass\n"
+              "print(sorted(m for m in sys.modules if m in ('src.lexer', 'src.parser')))")
+    resultado = subprocess.run([sys.executable, "-c", codigo], input="7", text=True,
+                               capture_output=True, check=True)
+    assert resultado.stdout.splitlines()[-1] == "[]"
+    assert "olá, mundo" in resultado.stdout
+
+
+def test_arquivo_corrompido():
+    """Testa que cortes, opcodes e argumentos inválidos viram FormatError"""
+    from src.instrucoes import NOMES, OpCode
+    # Ao mudar o conjunto de instruções, incremente binario.VERSAO e atualize aqui
+    assert (binario.VERSAO, max(NOMES)) == (2, OpCode.IMOD)
+
+    programa = compilar_programa(PROGRAMA)
+    dados = binario.serializar(programa)
+    for tamanho in range(len(dados)):
+        with pytest.raises(binario.FormatError):
+            carregado = binario.de_buffer(dados[:tamanho])
+            list(carregado.linhas)
+
+    cabecalho = binario.CABECALHO.unpack_from(dados)
+    inicio_ops, inicio_args = cabecalho[9], cabecalho[10]
+    chamada = next(pc for pc, op in enumerate(programa.ops) if op == OpCode.CALL)
+    corrompido = bytearray(dados)
+    corrompido[inicio_ops] = 99
+    with pytest.raises(binario.FormatError, match="opcode"):
+        binario.de_buffer(bytes(corrompido))
+    corrompido = bytearray(dados)
+    corrompido[inicio_args + 4 * chamada:inicio_args + 4 * chamada + 4] = (10 ** 6).to_bytes(4, 'little')
+    with pytest.raises(binario.FormatError, match="CALL"):
+        binario.de_buffer(bytes(corrompido))
+
+    # Qualquer byte trocado: ou o arquivo é recusado, ou carrega um programa válido
+    for posicao in range(binario.CABECALHO.size, len(dados)):
+        corrompido = bytearray(dados)
+        corrompido[posicao] ^= 0xFF
+        try:
+            list(binario.de_buffer(bytes(corrompido)).linhas)
+        except binario.FormatError:
+            pass
+    print("✓ test_arquivo_corrompido passou")
+
+
+def test_pilha_adulterada():
+    """Testa que imagens que esvaziariam a pilha ou sairiam da função são recusadas"""
+    from src.instrucoes import OpCode
+    programa = compilar_programa(PROGRAMA)
+    dados = binario.serializar(programa)
+    cabecalho = binario.CABECALHO.unpack_from(dados)
+    inicio_ops, inicio_args = cabecalho[9], cabecalho[10]
+    principal = programa.funcoes[programa.principal].entrada
+    chamada = next(pc for pc, op in enumerate(programa.ops) if op == OpCode.CALL)
+
+    def adulterar(pc, op=None, arg=None):
+        corrompido = bytearray(dados)
+        if op is not None:
+            corrompido[inicio_ops + pc] = op
+        if arg is not None:
+            corrompido[inicio_args + 4 * pc:inicio_args + 4 * pc + 4] = arg.to_bytes(4, 'little')
+        return bytes(corrompido)
+
+    # main começando em ADD; RET em main; CALL sem o argumento (LOAD virou READ)
+    for imagem, mensagem in [(adulterar(principal, OpCode.ADD), "pilha"),
+                             (adulterar(len(programa.ops) - 1, OpCode.RET), "RET"),
+                             (adulterar(chamada - 1, OpCode.READ), "pilha.*CALL"),
+                             (adulterar(chamada, OpCode.JUMP, principal), "para trás")]:
+        with pytest.raises(binario.FormatError, match=mensagem):
+            binario.de_buffer(imagem)
+    print("✓ test_pilha_adulterada passou")
@@ -0,0 +1,147 @@
+"""
+Test Suite - Testes para checkpoint e retomada da execução
+"""
+
+import sys
+import os
+import io
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.gerador import compilar_programa
+from src.maquina import MaquinaVirtual, EntradaArquivo, SaidaArquivo, Estado
+from src.checkpoint import Checkpoints, CheckpointError, serializar, desserializar, salvar, carregar
+
+SOMA = """
+function acumula(x: number) {
+    let y: float;
+    y = x / 2.0;
+    console.log(y);
+}
+function main() {
+    let x: number;
+    let total: float;
+    read(x);
+    while (x > 0) {
+        total = total + x * 1.5;
+        acumula(x);
+        read(x);
+    }
+    console.log(total);
+}
+"""
+
+
+def entrada_de(valores):
+    return EntradaArquivo(io.BytesIO(" ".join(map(str, valores)).encode()))
+
+
+def test_retomada_equivale_a_execucao_continua():
+    """Testa que parar em vários pontos e retomar produz a mesma saída"""
+    programa = compilar_programa(SOMA)
+    valores = list(range(1, 200)) + [0]
+    esperado = MaquinaVirtual(programa, entrada_de(valores))
+    assert esperado.executar() == Estado.FINALIZADO
+
+    texto = io.StringIO()
+    maquina = MaquinaVirtual(programa, entrada_de(valores), SaidaArquivo(texto))
+    retomadas = 0
+    while maquina.executar(limite=37) == Estado.PRONTO:
+        dados = serializar(maquina)
+        # Simula uma queda: o que foi escrito depois do instantâneo some
+        maquina = desserializar(programa, dados, entrada_de(valores), SaidaArquivo(texto))
+        retomadas += 1
+    assert retomadas > 10
+    assert texto.getvalue().splitlines() == esperado.saida
+    assert maquina.instrucoes == esperado.instrucoes
+
+
+def test_checkpoints_automaticos_e_saida_truncada(tmp_path):
+    """Testa a gravação periódica e o descarte da saída posterior ao instantâneo"""
+    programa = compilar_programa(SOMA)
+    caminho = str(tmp_path / "ck")
+    valores = list(range(1, 50)) + [0]
+    texto = io.StringIO()
+    execucao = Checkpoints(MaquinaVirtual(programa, entrada_de(valores), SaidaArquivo(texto)),
+                           caminho, a_cada=100)
+    execucao.pedir()
+    assert execucao.executar() == Estado.FINALIZADO
+    assert execucao.gravados > 5
+
+    # O último instantâneo foi tirado antes do fim: retomá-lo reescreve o final
+    completo = texto.getvalue()
+    maquina = carregar(programa, caminho, entrada_de(valores), SaidaArquivo(texto))
+    assert len(texto.getvalue()) < len(completo)
+    assert maquina.executar() == Estado.FINALIZADO
+    assert texto.getvalue() == completo
+
+
+def test_instantaneo_de_outro_programa_e_entrada_em_blocos(tmp_path):
+    """Testa a validação do instantâneo e valores que cruzam blocos da entrada"""
+    maquina = MaquinaVirtual(compilar_programa(SOMA), entrada_de([5, 0]))
+    caminho = str(tmp_path / "ck")
+    salvar(maquina, caminho)
+    outro = compilar_programa("function main() { let x: number; read(x); }")
+    with pytest.raises(CheckpointError):
+        carregar(outro, caminho)
+
+    entrada = EntradaArquivo(io.BytesIO(b"  12345  678\n9 "))
+    entrada.BLOCO = 3
+    assert [entrada.ler(), entrada.ler()] == ["12345", "678"]
+    posicao = entrada.posicao
+    assert entrada.ler() == "9"
+    entrada.posicionar(posicao)
+    assert entrada.ler() == "9"
+    with pytest.raises(EOFError):
+        entrada.ler()
+
+
+def test_instantaneo_corrompido_ou_truncado():
+    """Testa que cortes e bytes trocados viram CheckpointError, nunca outra exceção"""
+    programa = compilar_programa(SOMA)
+    maquina = MaquinaVirtual(programa, entrada_de([3, 2, 0]))
+    # Para dentro de acumula(): há um quadro de main guardado
+    while maquina.quadros == [] and maquina.executar(limite=1) == Estado.PRONTO:
+        pass
+    assert maquina.quadros
+    dados = serializar(maquina)
+    assert desserializar(programa, dados).funcao == maquina.funcao
+
+    from src.checkpoint import CABECALHO
+    for tamanho in range(len(dados)):
+        with pytest.raises(CheckpointError):
+            desserializar(programa, dados[:tamanho])
+    for posicao in range(CABECALHO.size, len(dados)):
+        for byte in (0x00, 0x02, 0x7F, 0x80, 0xFF):
+            corrompido = bytearray(dados)
+            corrompido[posicao] = byte
+            try:
+                desserializar(programa, bytes(corrompido))
+            except CheckpointError:
+                pass
+    # Bytes sobrando depois da pilha
+    with pytest.raises(CheckpointError):
+        desserializar(programa, dados + b"\0")
+    print("✓ test_instantaneo_corrompido_ou_truncado passou")
+
+
+def test_main_fecha_entrada_e_saida(tmp_path):
+    """Testa que os arquivos de --input e --output são fechados ao terminar"""
+    import subprocess
+    main = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    fonte = tmp_path / "prog.mc"
+    fonte.write_text("function main() { let x: number; read(x); console.log(x); }",
+                     encoding='utf-8')
+    (tmp_path / "entrada.txt").write_text("42\n")
+
+    # -X dev mostra ResourceWarning para arquivos coletados sem close()
+    resultado = subprocess.run(
+        [sys.executable, "-X", "dev", main, "--run", str(fonte), "--no-jit",
+         "--input", str(tmp_path / "entrada.txt"), "--output", str(tmp_path / "saida.txt")],
+        capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
+    assert "ResourceWarning" not in resultado.stderr
+    assert (tmp_path / "saida.txt").read_text() == "42\n"
@@ -0,0 +1,85 @@
+"""
+Test Suite - Testes para a cobertura de comandos e ramos
+"""
+
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.gerador import compilar_programa
+from src.maquina import MaquinaVirtual
+from src.cobertura import CoverageError, mesclar, carregar, relatorio
+
+CLASSIFICA = """function main() {
+    let x: number;
+    let pares: number;
+    read(x);
+    while (x > 0) {
+        if (x % 2 == 0) {
+            pares = pares + 1;
+        } else {
+            console.log("ímpar");
+        }
+        if (x > 100) {
+            console.log("grande");
+        }
+        read(x);
+    }
+    console.log(pares);
+}
+"""
+
+
+def cobrir(entrada, compilar=True):
+    maquina = MaquinaVirtual(compilar_programa(CLASSIFICA, instrumentar=True), entrada,
+                             compilar=compilar)
+    maquina.executar()
+    return maquina
+
+
+def test_linhas_e_ramos():
+    """Testa o relatório por linha e por lado de cada if e while"""
+    maquina = cobrir(["4", "6", "0"])
+    unidade = relatorio(maquina.programa, maquina.cobertura)["unidades"]["<programa>"]
+    assert unidade["linhas"][7] and not unidade["linhas"][9] and not unidade["linhas"][12]
+    assert unidade["linhas"][16]
+    ramos = {ramo["linha"]: ramo for ramo in unidade["ramos"]}
+    assert ramos[5]["corpo"]
+    assert ramos[6]["entao"] and not ramos[6]["senao"]
+    assert not ramos[11]["entao"] and ramos[11]["senao"]     # else implícito
+    assert unidade["totais"]["ramos_cobertos"] == 3 and unidade["totais"]["ramos"] == 5
+
+
+def test_laco_compilado_marca_os_mesmos_blocos():
+    """Testa que o JIT (que omite marcas já cobertas) não altera o mapa"""
+    entrada = [str(x) for x in range(1, 1000)] + ["150", "0"]
+    compilado, interpretado = cobrir(entrada), cobrir(entrada, compilar=False)
+    assert compilado.compilados and any(compilado.compilados.values())
+    assert compilado.cobertura == interpretado.cobertura
+    assert compilado.instrucoes == interpretado.instrucoes
+    assert all(compilado.cobertura)
+
+
+def _executar_e_mesclar(caminho, entrada):
+    maquina = cobrir(entrada)
+    mesclar(caminho, maquina.programa, maquina.cobertura)
+
+
+def test_mesclagem_entre_processos(tmp_path):
+    """Testa a união dos mapas gravados por vários processos no mesmo arquivo"""
+    caminho = str(tmp_path / "cobertura.cov")
+    entradas = [["3", "0"], ["8", "0"], ["0"], ["200", "0"]] * 4
+    with ProcessPoolExecutor(4) as processos:
+        list(processos.map(_executar_e_mesclar, [caminho] * len(entradas), entradas))
+
+    programa = compilar_programa(CLASSIFICA, instrumentar=True)
+    assert all(carregar(caminho, programa))
+
+    outro = compilar_programa(CLASSIFICA.replace("pares + 1", "pares + 2"), instrumentar=True)
+    with pytest.raises(CoverageError):
+        carregar(caminho, outro)
@@ -0,0 +1,119 @@
+"""
+Test Suite - Testes para o escalonador de programas
+"""
+
+import sys
+import os
+import asyncio
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.gerador import compilar_programa
+from src.escalonador import Escalonador, Orcamento, Execucao
+from src.maquina import Estado
+
+INFINITO = "function main() { let x: number; while (1 == 1) { x = x + 1; } }"
+CONTADOR = "function main() { let i: number; while (i < 50) { i = i + 1; } console.log(i); }"
+ECO = "function main() { let x: number; read(x); while (x > 0) { console.log(x); read(x); } }"
+
+
+def test_escalonador_laco_infinito_nao_bloqueia():
+    """Testa que um laço infinito esgota o orçamento sem impedir os demais"""
+    escalonador = Escalonador(fatia=100, orcamento=Orcamento(instrucoes=50000))
+    infinito = escalonador.submeter(compilar_programa(INFINITO))
+    contadores = [escalonador.submeter(compilar_programa(CONTADOR), []) for _ in range(10)]
+    asyncio.run(escalonador.executar())
+
+    assert infinito.estado == Execucao.ORCAMENTO_EXCEDIDO
+    assert all(c.estado == Estado.FINALIZADO and c.saida == ["50"] for c in contadores)
+    # Os contadores terminam bem antes do laço infinito
+    assert max(c.terminada_em for c in contadores) < infinito.terminada_em
+    metricas = escalonador.metricas()
+    assert metricas["programas"] == 11
+    assert metricas["estados"] == {Estado.FINALIZADO: 10, Execucao.ORCAMENTO_EXCEDIDO: 1}
+    print("✓ test_escalonador_laco_infinito_nao_bloqueia passou")
+
+
+def test_escalonador_orcamento_de_saida():
+    """Testa o orçamento de bytes escritos"""
+    codigo = "function main() { while (1 == 1) { console.log(\"spam\"); } }"
+    escalonador = Escalonador(fatia=100, orcamento=Orcamento(saida=1000))
+    execucao = escalonador.submeter(compilar_programa(codigo))
+    asyncio.run(escalonador.executar())
+
+    assert execucao.estado == Execucao.ORCAMENTO_EXCEDIDO
+    assert "saída" in execucao.erro
+    print("✓ test_escalonador_orcamento_de_saida passou")
+
+
+def test_escalonador_entrada_assincrona():
+    """Testa read() alimentado por um iterável assíncrono"""
+    async def fonte():
+        for valor in ["3", "2", "1", "0"]:
+            await asyncio.sleep(0.001)
+            yield valor
+
+    async def cenario():
+        escalonador = Escalonador(fatia=100)
+        eco = escalonador.submeter(compilar_programa(ECO), fonte())
+        contador = escalonador.submeter(compilar_programa(CONTADOR), [])
+        await escalonador.executar()
+        return eco, contador
+
+    eco, contador = asyncio.run(cenario())
+    assert eco.estado == Estado.FINALIZADO
+    assert eco.saida == ["3", "2", "1"]
+    assert contador.terminada_em < eco.terminada_em
+    print("✓ test_escalonador_entrada_assincrona passou")
+
+
+def test_escalonador_recursao_sem_laco():
+    """Testa que recursão sem while respeita a fatia e o orçamento de instruções"""
+    recursivo = ("function f(n: number) { if (n > 0) { f(n - 1); f(n - 1); } } "
+                 "function main() { f(22); }")
+    escalonador = Escalonador(fatia=100, orcamento=Orcamento(instrucoes=1000))
+    execucao = escalonador.submeter(compilar_programa(recursivo))
+    contador = escalonador.submeter(compilar_programa(CONTADOR), [])
+    asyncio.run(escalonador.executar())
+
+    assert execucao.estado == Execucao.ORCAMENTO_EXCEDIDO
+    # O excesso fica limitado ao corpo de uma função, não à recursão inteira
+    assert execucao.maquina.instrucoes < 1100
+    assert contador.estado == Estado.FINALIZADO and contador.saida == ["50"]
+    print("✓ test_escalonador_recursao_sem_laco passou")
+
+
+def test_escalonador_memoria_dentro_da_fatia():
+    """Testa que 'x = x * x' esgota o orçamento de memória sem esperar o fim da fatia"""
+    # Só começa a multiplicar depois de o laço já estar compilado
+    quadrado = ("function main() { let x: number; let i: number; x = 2; "
+                "while (1 == 1) { i = i + 1; if (i > 300) { x = x * x; } } }")
+    for compilar in (False, True):
+        escalonador = Escalonador(fatia=100000, orcamento=Orcamento(memoria=10**6))
+        execucao = escalonador.submeter(compilar_programa(quadrado))
+        execucao.maquina.compilar = compilar
+        contador = escalonador.submeter(compilar_programa(CONTADOR), [])
+        asyncio.run(asyncio.wait_for(escalonador.executar(), 10))
+
+        assert execucao.estado == Execucao.ORCAMENTO_EXCEDIDO
+        assert "memória" in execucao.erro
+        assert contador.estado == Estado.FINALIZADO
+        assert any(execucao.maquina.compilados.values()) == compilar
+    print("✓ test_escalonador_memoria_dentro_da_fatia passou")
+
+
+def test_escalonador_falha_interna_de_um_programa():
+    """Testa que exceções fora de ExecutionError só derrubam o programa que as levantou"""
+    escalonador = Escalonador(fatia=100)
+    falho = escalonador.submeter(compilar_programa(CONTADOR), [])
+
+    def estourar(limite=None):
+        raise MemoryError("sem memória")
+    falho.maquina.executar = estourar
+    contador = escalonador.submeter(compilar_programa(CONTADOR), [])
+    asyncio.run(escalonador.executar())
+
+    assert falho.estado == Estado.ERRO and "MemoryError" in falho.erro
+    assert contador.estado == Estado.FINALIZADO and contador.saida == ["50"]
+    print("✓ test_escalonador_falha_interna_de_um_programa passou")
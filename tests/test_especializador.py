@@ -0,0 +1,107 @@
+"""
+Test Suite - Testes para o avaliador parcial (especialização por entradas conhecidas)
+"""
+
+import sys
+import os
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.gerador import compilar_programa
+from src.instrucoes import OpCode
+from src.maquina import MaquinaVirtual, ExecutionError
+from src.especializador import especializar, gerar_fonte
+
+SOMA_PONDERADA = """function main() {
+    let modo: number;
+    let n: number;
+    let escala: float;
+    let i: number;
+    let x: number;
+    let soma: float;
+    read(modo);
+    read(n);
+    read(escala);
+    while (i < n) {
+        read(x);
+        if (modo == 1) {
+            soma = soma + x * escala;
+        } else {
+            soma = soma - x;
+        }
+        i = i + 1;
+    }
+    if (modo == 1 && soma > 10.0) {
+        console.log("grande");
+    }
+    console.log(soma);
+}
+"""
+
+
+def arvore(codigo):
+    return Parser(Lexer(codigo).tokenize()).parse()
+
+
+def executar(codigo, entrada):
+    maquina = MaquinaVirtual(compilar_programa(codigo), entrada)
+    maquina.executar()
+    return maquina.saida
+
+
+@pytest.mark.parametrize("conhecidos, restante", [
+    (["1", "3", "0.5"], ["4", "8", "15"]),
+    (["2", "2", "1.0"], ["4", "5"]),
+    (["1", "4"], ["2.0", "30", "1", "2", "3"]),
+    ([], ["1", "1", "3.0", "7"]),
+])
+def test_residual_equivale_ao_original(conhecidos, restante):
+    """Testa que residual + resto da entrada escreve o mesmo que o original + entrada toda"""
+    residual, consumidos = especializar(arvore(SOMA_PONDERADA), conhecidos)
+    assert consumidos == len(conhecidos)
+    fonte = gerar_fonte(residual)
+    assert executar(fonte, restante) == executar(SOMA_PONDERADA, conhecidos + restante)
+
+
+def test_leituras_condicoes_e_laco_somem():
+    """Testa que leituras conhecidas somem, o if é resolvido e o while é desenrolado"""
+    residual, _ = especializar(arvore(SOMA_PONDERADA), ["2", "3", "1.0"])
+    fonte = gerar_fonte(residual)
+    programa = compilar_programa(fonte)
+    assert "if" not in fonte and "while" not in fonte
+    assert programa.ops.count(OpCode.READ) == 3          # só os três valores de x
+    assert programa.ops.count(OpCode.JUMP_FALSE) == 0
+
+    # Acima do orçamento, o laço continua residual (com modo já resolvido)
+    residual, _ = especializar(arvore(SOMA_PONDERADA), ["2", "3", "1.0"], orcamento=2)
+    fonte = gerar_fonte(residual)
+    assert "while (i < 3)" in fonte and "modo" not in fonte.split("let soma: float;")[1]
+    assert executar(fonte, ["4", "5", "6"]) == ["-15.0"]
+
+
+def test_erros_ficam_para_a_execucao():
+    """Testa que divisão por zero e entradas inválidas não são dobradas"""
+    codigo = """function main() {
+    let d: number;
+    let q: number;
+    read(d);
+    q = 10 / d;
+    console.log(q);
+}
+"""
+    residual, consumidos = especializar(arvore(codigo), ["0"])
+    assert consumidos == 1
+    with pytest.raises(ExecutionError) as erro:
+        MaquinaVirtual(compilar_programa(gerar_fonte(residual))).executar()
+    assert "Divisão por zero" in str(erro.value)
+
+    # Valor inválido: o read() fica no residual e recebe o valor na execução
+    residual, consumidos = especializar(arvore(codigo), ["abc"])
+    assert consumidos == 0
+    with pytest.raises(ExecutionError, match="Valor de entrada inválido"):
+        MaquinaVirtual(compilar_programa(gerar_fonte(residual)), ["abc"]).executar()
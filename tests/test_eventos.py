@@ -0,0 +1,88 @@
+"""
+Test Suite - Testes para a análise sintática dirigida a eventos
+"""
+
+import sys
+import os
+import tracemalloc
+from collections import Counter
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.lexer import Lexer
+from src.parser import Parser, SyntaxError
+from src.eventos import ParserEventos
+from src.token_types import TokenType
+
+DIRETORIO_TESTES = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_eventos_seguem_a_gramatica():
+    """Testa contagens, nomes e a ordem dos terminais no programa de exemplo"""
+    with open(os.path.join(DIRETORIO_TESTES, "programa_ckp2_sexta.mc"), encoding='utf-8') as f:
+        codigo = f.read()
+    contagem, nomes, terminais = Counter(), set(), []
+    parser = ParserEventos(Lexer(codigo).gerar_tokens())
+    parser.ao_entrar(lambda producao, inicio: contagem.update([producao]),
+                     'condicional', 'repeticao', 'leitura')
+    parser.ao_consumir(lambda token: nomes.add(token.valor), 'ID')
+    parser.ao_consumir(terminais.append)
+    assert parser.parse() is None
+
+    assert contagem == Counter(condicional=2, repeticao=1, leitura=2)
+    assert nomes == {"numero", "pares", "impares", "soma"}
+    campos = lambda tokens: [(t.tipo, t.valor, t.linha, t.coluna) for t in tokens]
+    assert campos(terminais) == campos(Lexer(codigo).tokenize()[:-1])
+    # Produções sem inscritos continuam sendo os métodos da classe
+    assert 'fator' not in vars(parser) and 'condicional' in vars(parser)
+
+
+def test_intervalos_de_tokens():
+    """Testa o primeiro e o último token de cada produção, inclusive aninhadas"""
+    intervalos = []
+    codigo = "function main() { let x: number; x = (1 + 2) * x; }"
+    ParserEventos(Lexer(codigo).gerar_tokens()).ao_sair(
+        lambda producao, inicio, fim: intervalos.append((producao, inicio.coluna, fim.coluna)),
+        'atribuicao', 'fator', 'declaracoes').parse()
+    assert intervalos == [("declaracoes", 19, 32), ("fator", 39, 39), ("fator", 43, 43),
+                          ("fator", 38, 44), ("fator", 48, 48), ("atribuicao", 34, 49)]
+
+    with pytest.raises(SyntaxError) as erro:
+        ParserEventos(Lexer("function main() { x = ; }").gerar_tokens()).parse()
+    with pytest.raises(SyntaxError) as esperado:
+        Parser(Lexer("function main() { x = ; }").tokenize()).parse()
+    assert str(erro.value) == str(esperado.value)
+
+
+def test_peek_token_em_sequencia():
+    """Testa peek_token com offsets crescentes e o consumo do que foi espiado"""
+    parser = ParserEventos(Lexer("function main() { }").gerar_tokens())
+    assert [parser.peek_token(k).valor for k in (1, 2, 3)] == ["main", "(", ")"]
+    assert parser.peek_token(10).tipo == TokenType.EOF
+    valores = []
+    while parser.current_token.tipo != TokenType.EOF:
+        valores.append(parser.current_token.valor)
+        parser.advance()
+    assert valores == ["function", "main", "(", ")", "{", "}"]
+
+
+def test_memoria_nao_cresce_com_o_programa():
+    """Testa que um programa grande é validado sem guardar tokens nem a árvore"""
+    def pico(comandos):
+        corpo = "\n".join(f"if (x < {i}) {{ x = x + {i} * (y - 2); }} else {{ console.log(x); }}"
+                          for i in range(comandos))
+        codigo = "function main() { let x: number; let y: number;\n" + corpo + "\n}"
+        contagem = Counter()
+        parser = ParserEventos(Lexer(codigo).gerar_tokens())
+        parser.ao_entrar(lambda producao, inicio: contagem.update([producao]), 'condicional')
+        tracemalloc.start()
+        parser.parse()
+        maximo = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert contagem["condicional"] == comandos
+        return maximo
+
+    assert pico(1500) < 2 * pico(150) + 4096
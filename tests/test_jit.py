@@ -0,0 +1,111 @@
+"""
+Test Suite - Testes para a compilação de laços quentes (JIT)
+"""
+
+import sys
+import os
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.gerador import compilar_programa
+from src.maquina import MaquinaVirtual, FilaEntrada, Estado, ExecutionError
+
+ANINHADO = """
+function main() {
+    let i: number;
+    let j: number;
+    let s: float;
+    let t: number;
+    while (i < 40) {
+        j = 0;
+        while (j < i) {
+            s = s + j / 3.0;
+            if ((j % 3 == 0) || (j > 30)) {
+                t = t + j / 2;
+            } else {
+                t = t - 1;
+            }
+            j = j + 1;
+        }
+        i = i + 1;
+        console.log(t);
+    }
+    console.log(s);
+}
+"""
+
+DIVISAO = """
+function main() {
+    let x: number;
+    let k: number;
+    read(x);
+    while (x > 0) {
+        k = k + 100 / (x - 3);
+        console.log(k);
+        read(x);
+    }
+}
+"""
+
+
+def executar(codigo, entrada=(), compilar=True, fatia=None, aberta=False):
+    fila = FilaEntrada([] if aberta else entrada, fechada=not aberta)
+    maquina = MaquinaVirtual(compilar_programa(codigo), fila, compilar=compilar)
+    maquina.LIMIAR_COMPILACAO = 3
+    pendentes = list(entrada)
+    paradas = []
+    while True:
+        estado = maquina.executar(fatia)
+        paradas.append((estado, maquina.pc, maquina.instrucoes))
+        if estado == Estado.AGUARDANDO_ENTRADA:
+            fila.fornecer(pendentes.pop(0)) if pendentes else fila.fechar()
+        elif estado != Estado.PRONTO:
+            return maquina, paradas
+
+
+@pytest.mark.parametrize("fatia", [None, 13, 50, 500])
+def test_laco_compilado_equivale_ao_interpretador(fatia):
+    """Testa saída, variáveis, contagem de instruções e pontos de parada"""
+    interpretado, paradas_i = executar(ANINHADO, compilar=False, fatia=fatia)
+    compilado, paradas_c = executar(ANINHADO, fatia=fatia)
+    assert any(compilado.programa.compilados.values())
+    assert compilado.saida == interpretado.saida
+    assert compilado.variaveis == interpretado.variaveis
+    assert paradas_c == paradas_i
+
+
+def test_read_sem_dados_devolve_ao_interpretador():
+    """Testa que o laço compilado suspende em read() e continua depois"""
+    valores = ["4", "5", "7", "9", "8", "6", "0"]
+    interpretado, paradas_i = executar(DIVISAO, valores, compilar=False, aberta=True)
+    compilado, paradas_c = executar(DIVISAO, valores, aberta=True)
+    assert compilado.saida == interpretado.saida
+    assert paradas_c == paradas_i
+
+
+def test_erro_no_laco_compilado_relata_a_linha():
+    """Testa a desotimização num erro: a divisão por zero aponta a linha certa"""
+    with pytest.raises(ExecutionError) as erro:
+        executar(DIVISAO, ["9", "8", "7", "6", "5", "4", "3", "2", "0"])
+    assert erro.value.linha == 7 and "Divisão por zero" in str(erro.value)
+
+
+@pytest.mark.parametrize("corpo", [
+    # if sem else terminando num if/else de else vazio: o JUMP é do if interno
+    "if (i > 0) { if (x == 0) { x = 0; } else { } }",
+    "if (i > 0) { if (i > 1) { if (x == 0) { x = 1; } else { } } }",
+    # else vazio do próprio if
+    "if (i > 0) { x = x + 1; } else { }",
+])
+def test_else_vazio_conta_as_mesmas_instrucoes(corpo):
+    """Testa que o JUMP de um else vazio é atribuído ao if que o emitiu"""
+    codigo = ("function main() { let i: number; let x: number; "
+              f"while (i < 1000) {{ {corpo} i = i + 1; }} console.log(x); }}")
+    interpretado, paradas_i = executar(codigo, compilar=False)
+    compilado, paradas_c = executar(codigo)
+    assert any(compilado.programa.compilados.values())
+    assert compilado.saida == interpretado.saida
+    assert paradas_c == paradas_i
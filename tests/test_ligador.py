@@ -0,0 +1,132 @@
+"""
+Test Suite - Testes para funções, compilação separada e ligação
+"""
+
+import sys
+import os
+import tempfile
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.gerador import compilar_unidade, compilar_programa, SemanticError
+from src.ligador import ligar, LinkError, BuildError, Construtor
+from src.maquina import MaquinaVirtual
+
+UTIL = """
+function mostrar_dobro(x: float) {
+    let d: float;
+    d = x * 2;
+    console.log(d);
+}
+
+function contar(n: number) {
+    let i: number;
+    while (i < n) { i = i + 1; }
+    mostrar_dobro(i);
+}
+"""
+
+MAIN = """
+function main() {
+    let k: number;
+    read(k);
+    contar(k);
+}
+"""
+
+
+def executar(programa, entrada=()):
+    maquina = MaquinaVirtual(programa, list(entrada))
+    maquina.executar()
+    return maquina.saida
+
+
+def escrever(diretorio, nome, codigo):
+    caminho = os.path.join(diretorio, nome)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(codigo)
+    return caminho
+
+
+def test_funcoes_mesmo_arquivo():
+    """Testa chamadas com parâmetros, conversão de tipos e recursão"""
+    codigo = """
+    function contagem(n: number) {
+        if (n > 0) {
+            console.log(n);
+            contagem(n - 1);
+        }
+    }
+    function main() {
+        contagem(3.7);
+    }
+    """
+    assert executar(compilar_programa(codigo)) == ["3", "2", "1"]
+    print("✓ test_funcoes_mesmo_arquivo passou")
+
+
+def test_ligacao_de_unidades():
+    """Testa a ligação de unidades compiladas separadamente"""
+    util = compilar_unidade(UTIL, "util.mc")
+    principal = compilar_unidade(MAIN, "main.mc", util.definidas())
+    programa = ligar([util, principal])
+
+    assert executar(programa, ["5"]) == ["10.0"]
+    print("✓ test_ligacao_de_unidades passou")
+
+
+def test_erros_de_ligacao():
+    """Testa função não definida, duplicada e assinatura desatualizada"""
+    try:
+        compilar_unidade(MAIN, "main.mc")
+        assert False, "chamada a função desconhecida não foi detectada"
+    except SemanticError as e:
+        assert "contar" in e.message
+
+    util = compilar_unidade(UTIL, "util.mc")
+    try:
+        ligar([util])
+        assert False, "ausência de main não foi detectada"
+    except LinkError:
+        pass
+
+    principal = compilar_unidade(MAIN, "main.mc", {"contar": ["FLOAT"]})
+    try:
+        ligar([util, principal])
+        assert False, "assinatura desatualizada não foi detectada"
+    except LinkError as e:
+        assert e.unidade == "main.mc"
+    print("✓ test_erros_de_ligacao passou")
+
+
+def test_construcao_incremental():
+    """Testa que só as unidades mudadas (ou dependentes) são recompiladas"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        util = escrever(diretorio, "util.mc", UTIL)
+        principal = escrever(diretorio, "main.mc", MAIN)
+        cache = os.path.join(diretorio, "cache")
+
+        programa = Construtor(cache).construir([util, principal])
+        assert executar(programa, ["2"]) == ["4.0"]
+
+        # Nada mudou: nenhuma recompilação
+        construtor = Construtor(cache)
+        construtor.construir([util, principal])
+        assert construtor.relatorio["recompiladas"] == []
+        assert construtor.grafo_dependencias()[principal] == [util]
+
+        # Corpo mudou, assinatura não: só util.mc
+        escrever(diretorio, "util.mc", UTIL.replace("x * 2", "x * 3"))
+        programa = construtor.construir([util, principal])
+        assert construtor.relatorio["recompiladas"] == [util]
+        assert executar(programa, ["2"]) == ["6.0"]
+
+        # Assinatura mudou: main.mc é recompilado por dependência e falha
+        escrever(diretorio, "util.mc", UTIL.replace("contar(n: number)", "contar(n: number, m: number)"))
+        try:
+            construtor.construir([util, principal])
+            assert False, "chamada com aridade errada não foi detectada"
+        except BuildError as e:
+            assert e.unidade == principal
+    print("✓ test_construcao_incremental passou")
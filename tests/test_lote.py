@@ -0,0 +1,136 @@
+"""
+Test Suite - Testes para a compilação em lote
+"""
+
+import sys
+import os
+import io
+import json
+import tempfile
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.lote import compilar_fonte, compilar_lote
+
+DIRETORIO_TESTES = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_compilar_fonte_diagnostico():
+    """Testa o diagnóstico compacto de erros sintáticos e léxicos"""
+    assert compilar_fonte("function main() { let x: number; }")["ok"]
+
+    resultado = compilar_fonte("function main() { let x: number }")
+    assert not resultado["ok"]
+    assert resultado["linha"] == 1
+
+    resultado = compilar_fonte("function main() { let x: number; x = 1 @ 2; }")
+    assert not resultado["ok"]
+    assert "Léxico" in resultado["erro"]
+    print("✓ test_compilar_fonte_diagnostico passou")
+
+
+def test_compilar_lote_diretorio():
+    """Testa a saída em JSON lines e o resumo do modo em lote"""
+    saida = io.StringIO()
+    resumo = compilar_lote(DIRETORIO_TESTES, processos=2, saida=saida)
+    linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+
+    assert resumo["arquivos"] == 2
+    assert resumo["ok"] == 1 and resumo["falhas"] == 1
+    assert linhas[-1] == {"resumo": resumo}
+    assert {os.path.basename(l["arquivo"]) for l in linhas[:-1]} == {
+        "programa_ckp2_sexta.mc", "programa_erro.mc"}
+    print("✓ test_compilar_lote_diretorio passou")
+
+
+def test_compilar_lote_fail_fast():
+    """Testa a interrupção na primeira falha"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome, codigo in [("a.mc", "function main() { let x: number }"),
+                             ("b.mc", "function main() { let x: number; }"),
+                             ("c.mc", "function main() { let x: number; }")]:
+            with open(os.path.join(diretorio, nome), 'w', encoding='utf-8') as f:
+                f.write(codigo)
+        resumo = compilar_lote(diretorio, processos=1, parar_no_erro=True)
+
+    assert resumo["arquivos"] == 1
+    assert resumo["falhas"] == 1
+    assert resumo["interrompido"]
+    print("✓ test_compilar_lote_fail_fast passou")
+
+
+def test_compilar_lote_arquivo_patologico():
+    """Testa que um arquivo que estoura a recursão do parser falha sozinho"""
+    aninhado = "function main() { let x: number; x = " + "(" * 400 + "1" + ")" * 400 + "; }"
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome, codigo in [("a.mc", "function main() { let x: number; }"),
+                             ("b.mc", aninhado),
+                             ("c.mc", "function main() { let x: number; }")]:
+            with open(os.path.join(diretorio, nome), 'w', encoding='utf-8') as f:
+                f.write(codigo)
+        saida = io.StringIO()
+        resumo = compilar_lote(diretorio, processos=1, saida=saida)
+    linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()[:-1]]
+
+    assert resumo["arquivos"] == 3
+    assert resumo["ok"] == 2 and resumo["falhas"] == 1
+    falha, = [l for l in linhas if not l["ok"]]
+    assert os.path.basename(falha["arquivo"]) == "b.mc"
+    assert "RecursionError" in falha["erro"]
+    print("✓ test_compilar_lote_arquivo_patologico passou")
+
+
+def test_lexer_parser_em_threads():
+    """Testa que Lexer e Parser funcionam em várias threads ao mesmo tempo"""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.lexer import Lexer
+    from src.parser import Parser
+
+    with pytest.raises(TypeError):
+        Lexer.PALAVRAS_RESERVADAS['var'] = 'LET'
+
+    # Sem EOF, o Parser trabalha numa cópia e não altera a lista recebida
+    tokens = [t for t in Lexer("function main() { let x: number; }").tokenize() if t.tipo != "EOF"]
+    Parser(tokens).parse()
+    assert tokens[-1].tipo != "EOF"
+
+    fontes = [f"function main() {{ let x{i}: number; while (x{i} < {i}) {{ x{i} = x{i} + 1; }} }}"
+              if i % 3 else f"function main() {{ let x{i}: number x{i} = {i}; }}"
+              for i in range(300)]
+    serial = [compilar_fonte(fonte) for fonte in fontes]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(compilar_fonte, fontes)) == serial
+    print("✓ test_lexer_parser_em_threads passou")
+
+
+def test_compilar_lote_threads(monkeypatch):
+    """Testa o executor de threads e a escolha automática conforme o GIL"""
+    from src.lote import escolher_executor
+
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+    assert escolher_executor("auto") == "threads"
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: True, raising=False)
+    assert escolher_executor("auto") == "processes"
+    assert escolher_executor("threads") == "threads"
+    with pytest.raises(ValueError):
+        escolher_executor("fibras")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for i in range(50):
+            codigo = "function main() { let x: number; }" if i % 4 else "function main() { x }"
+            with open(os.path.join(diretorio, f"p{i:02d}.mc"), 'w', encoding='utf-8') as f:
+                f.write(codigo)
+        resultados = {}
+        for executor in ("threads", "processes"):
+            saida = io.StringIO()
+            resumo = compilar_lote(diretorio, processos=3, saida=saida, executor=executor)
+            assert resumo["executor"] == executor
+            linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()[:-1]]
+            resultados[executor] = sorted((l["arquivo"], l["ok"], l["erro"]) for l in linhas)
+
+    assert resultados["threads"] == resultados["processes"]
+    assert sum(ok for _, ok, _ in resultados["threads"]) == 37
+    print("✓ test_compilar_lote_threads passou")
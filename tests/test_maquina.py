@@ -0,0 +1,99 @@
+"""
+Test Suite - Testes para a geração de código e a máquina virtual
+"""
+
+import sys
+import os
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.arvore import Programa, Repeticao, Binaria
+from src.gerador import compilar_programa, SemanticError
+from src.maquina import MaquinaVirtual, FilaEntrada, Estado, ExecutionError
+
+
+def executar(codigo, entrada=()):
+    maquina = MaquinaVirtual(compilar_programa(codigo), list(entrada))
+    maquina.executar()
+    return maquina.saida
+
+
+def test_parser_constroi_arvore():
+    """Testa a árvore devolvida por parse() e a precedência dos operadores"""
+    codigo = "function main() { let x: number; while (x < 10) { x = 2 + 3 * x; } }"
+    arvore = Parser(Lexer(codigo).tokenize()).parse()
+
+    assert isinstance(arvore, Programa)
+    main = arvore.funcoes[0]
+    assert main.nome == "main"
+    assert main.declaracoes[0].nome == "x"
+    laco = main.comandos[0]
+    assert isinstance(laco, Repeticao)
+    expressao = laco.corpo.comandos[0].expressao
+    assert isinstance(expressao, Binaria) and expressao.operador == "PLUS"
+    assert expressao.direita.operador == "MULT"
+    print("✓ test_parser_constroi_arvore passou")
+
+
+def test_maquina_programa_exemplo():
+    """Testa a execução do programa de exemplo do checkpoint"""
+    with open(os.path.join(os.path.dirname(__file__), "programa_ckp2_sexta.mc"), encoding='utf-8') as f:
+        saida = executar(f.read(), ["4", "7", "2", "-1"])
+
+    assert saida == ["Total de números pares:", "2", "Total de números ímpares:", "1",
+                     "Soma total dos números:", "13"]
+    print("✓ test_maquina_programa_exemplo passou")
+
+
+def test_maquina_aritmetica_e_tipos():
+    """Testa divisão truncada, resto com sinal e conversão na atribuição"""
+    codigo = """function main() {
+        let n: number;
+        let r: float;
+        n = (0 - 7) / 2;  console.log(n);
+        n = (0 - 7) % 2;  console.log(n);
+        n = 7.9;          console.log(n);
+        r = 7 / 2;        console.log(r);
+        r = 7.0 / 2;      console.log(r);
+    }"""
+    assert executar(codigo) == ["-3", "-1", "7", "3.0", "3.5"]
+    print("✓ test_maquina_aritmetica_e_tipos passou")
+
+
+def test_maquina_erros():
+    """Testa erros semânticos e de execução"""
+    try:
+        compilar_programa("function main() { x = 1; }")
+        assert False, "variável não declarada não foi detectada"
+    except SemanticError as e:
+        assert e.linha == 1
+
+    try:
+        executar("function main() { let x: number;\n x = 1 / x; }")
+        assert False, "divisão por zero não foi detectada"
+    except ExecutionError as e:
+        assert e.linha == 2
+    print("✓ test_maquina_erros passou")
+
+
+def test_maquina_fatias_e_entrada_assincrona():
+    """Testa a suspensão por limite de instruções e em read() sem dados"""
+    programa = compilar_programa("""function main() {
+        let i: number;
+        while (i < 1000) { i = i + 1; }
+        read(i);
+        console.log(i);
+    }""")
+    entrada = FilaEntrada()
+    maquina = MaquinaVirtual(programa, entrada)
+
+    assert maquina.executar(limite=100) == Estado.PRONTO
+    assert maquina.instrucoes < 200
+    assert maquina.executar() == Estado.AGUARDANDO_ENTRADA
+    entrada.fornecer("42")
+    assert maquina.executar() == Estado.FINALIZADO
+    assert maquina.saida == ["42"]
+    print("✓ test_maquina_fatias_e_entrada_assincrona passou")
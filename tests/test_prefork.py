@@ -0,0 +1,112 @@
+"""
+Test Suite - Testes do modo pré-fork (execução de muitas entradas em processos)
+"""
+
+import sys
+import os
+import io
+import gc
+import tempfile
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ligador import compilar_e_ligar
+from src.maquina import MaquinaVirtual, EntradaArquivo, SaidaArquivo, ExecutionError, Estado
+from src.prefork import PoolPreFork, congelado, imagem, memoria_processo
+
+FONTE = """function main() {
+    let n: number;
+    let i: number;
+    let s: number;
+    read(n);
+    while (i < n) {
+        s = s + i * i;
+        i = i + 1;
+    }
+    console.log(s);
+    console.log((100 / n));
+}
+"""
+
+
+def executar_direto(programa, dados):
+    saida = io.StringIO()
+    maquina = MaquinaVirtual(programa, EntradaArquivo(io.BytesIO(dados.encode())),
+                             SaidaArquivo(saida))
+    try:
+        estado = maquina.executar()
+    except ExecutionError:
+        estado = Estado.ERRO
+    return estado, saida.getvalue()
+
+
+def test_pool_mesma_saida_que_execucao_direta():
+    programa = compilar_e_ligar([("prog.mc", FONTE)])
+    with tempfile.TemporaryDirectory() as diretorio:
+        casos = {}
+        for k, dados in enumerate(["5\n", "300\n", "0\n", "abc\n"] * 5):
+            caminho = os.path.join(diretorio, f"caso{k:02d}.txt")
+            with open(caminho, 'w') as f:
+                f.write(dados)
+            casos[caminho] = dados
+        pool = PoolPreFork(programa, processos=2)
+        resultados = {r["entrada"]: r for r in pool.executar(sorted(casos))}
+
+        assert set(resultados) == set(casos)
+        for caminho, dados in casos.items():
+            estado, esperado = executar_direto(programa, dados)
+            resultado = resultados[caminho]
+            assert resultado["estado"] == estado
+            with open(caminho + ".out", encoding='utf-8') as f:
+                assert f.read() == esperado
+        # Divisão por zero (n = 0) e entrada inválida viram resultados com erro
+        assert sum(r["estado"] == Estado.ERRO for r in resultados.values()) == 10
+        assert all(r["erro"] for r in resultados.values() if r["estado"] == Estado.ERRO)
+
+    if memoria_processo() is not None:
+        resumo = pool.resumo_memoria()
+        assert resumo["processos"] == len(pool.trabalhadores) >= 1
+        assert resumo["pss"] <= resumo["rss"]
+
+
+@pytest.mark.skipif(memoria_processo() is None, reason="requer /proc/<pid>/smaps_rollup")
+def test_memoria_processo():
+    memoria = memoria_processo()
+    for campo in ("rss", "pss", "compartilhada", "privada", "privada_suja"):
+        assert memoria[campo] >= 0
+    assert memoria["rss"] == memoria["compartilhada"] + memoria["privada"]
+    assert memoria_processo(pid=2 ** 22 + 7) is None
+
+
+def test_imagem_imutavel_e_gc_descongelado():
+    programa = compilar_e_ligar([("prog.mc", FONTE)])
+    copia = imagem(programa)
+    assert isinstance(copia.ops, memoryview) and copia.ops.readonly
+    assert imagem(copia) is copia
+    assert executar_direto(copia, "7\n") == executar_direto(programa, "7\n")
+
+    with congelado():
+        assert gc.get_freeze_count() > 0
+    assert gc.get_freeze_count() == 0
+
+
+def test_pool_sem_fork_recebe_a_imagem(monkeypatch, tmp_path):
+    """Testa que, com spawn (sem herança do pai), os filhos recebem o programa"""
+    import multiprocessing
+    from src import prefork
+    monkeypatch.setattr(prefork, "contexto_fork", lambda: multiprocessing.get_context("spawn"))
+    monkeypatch.setattr(prefork, "_programa", None)
+    assert not prefork.herda_memoria()
+
+    programa = compilar_e_ligar([("prog.mc", FONTE)])
+    caminho = str(tmp_path / "caso.txt")
+    with open(caminho, 'w') as f:
+        f.write("5\n")
+    resultados = list(PoolPreFork(programa, processos=1).executar([caminho]))
+
+    assert [r["estado"] for r in resultados] == [Estado.FINALIZADO]
+    with open(caminho + ".out", encoding='utf-8') as f:
+        assert f.read() == executar_direto(programa, "5\n")[1]
@@ -0,0 +1,136 @@
+"""
+Test Suite - Testes para o daemon de compilação
+"""
+
+import sys
+import os
+import asyncio
+import json
+import tempfile
+import threading
+import time
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.servidor import ServidorCompilacao, Histograma
+from src.cliente import ClienteCompilacao
+
+
+def _iniciar_servidor(caminho_socket, tempo_ocioso=30.0):
+    """Executa o servidor numa thread e espera o socket aparecer"""
+    servidor = ServidorCompilacao(caminho_socket, tempo_ocioso)
+    thread = threading.Thread(target=asyncio.run, args=(servidor.servir(),), daemon=True)
+    thread.start()
+    for _ in range(200):
+        if os.path.exists(caminho_socket):
+            break
+        time.sleep(0.01)
+    return servidor, thread
+
+
+def test_histograma_percentis():
+    """Testa as faixas de potências de 2 do histograma"""
+    histograma = Histograma()
+    for micros in (3, 3, 3, 100):
+        histograma.registrar(micros / 1e6)
+
+    assert histograma.total == 4
+    assert histograma.percentil(0.5) == 4
+    assert histograma.percentil(1.0) == 128
+    print("✓ test_histograma_percentis passou")
+
+
+def test_servidor_compila_e_encerra():
+    """Testa compilação por fonte e por caminho, estatísticas e encerramento"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_socket = os.path.join(diretorio, "mc.sock")
+        servidor, thread = _iniciar_servidor(caminho_socket)
+
+        with ClienteCompilacao(caminho_socket) as cliente:
+            assert cliente.compilar_fonte("function main() { let x: number; }")["ok"]
+            resultado = cliente.compilar_fonte("function main() { let x: number }")
+            assert not resultado["ok"] and resultado["linha"] == 1
+            resultado = cliente.compilar_arquivo(os.path.join(diretorio, "inexistente.mc"))
+            assert not resultado["ok"]
+
+            stats = cliente.estatisticas()
+            assert stats["pedidos"]["compilar"] == 3
+            assert stats["latencia"]["compilar"]["total"] == 3
+            cliente.encerrar_servidor()
+
+        thread.join(5)
+        assert not thread.is_alive()
+        assert not os.path.exists(caminho_socket)
+    print("✓ test_servidor_compila_e_encerra passou")
+
+
+def test_servidor_tempo_ocioso():
+    """Testa o encerramento automático por ociosidade"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_socket = os.path.join(diretorio, "mc.sock")
+        servidor, thread = _iniciar_servidor(caminho_socket, tempo_ocioso=0.2)
+        thread.join(5)
+        assert not thread.is_alive()
+    print("✓ test_servidor_tempo_ocioso passou")
+
+
+def test_servidor_ocioso_com_cliente_conectado(caplog):
+    """Testa que uma conexão aberta (ex.: um editor) não impede o encerramento"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_socket = os.path.join(diretorio, "mc.sock")
+        servidor, thread = _iniciar_servidor(caminho_socket, tempo_ocioso=0.3)
+
+        with ClienteCompilacao(caminho_socket) as cliente:
+            assert cliente.pedir({"op": "ping"})["ok"]
+            thread.join(5)
+            assert not thread.is_alive()
+            # O servidor fechou a conexão do cliente
+            assert cliente.socket.recv(1) == b""
+        assert not os.path.exists(caminho_socket)
+    assert not [r for r in caplog.records if r.levelname == "ERROR"]
+    print("✓ test_servidor_ocioso_com_cliente_conectado passou")
+
+
+def test_servidor_rejeita_campos_que_nao_sao_texto():
+    """Testa que 'fonte' e 'caminho' precisam ser strings"""
+    servidor = ServidorCompilacao("nao-usado.sock")
+    resposta = servidor.processar(b'{"op": "compilar", "caminho": 0}')
+    assert not resposta["ok"] and "caminho" in resposta["erro"]
+    resposta = servidor.processar(b'{"op": "compilar", "fonte": 42, "id": 7}')
+    assert not resposta["ok"] and "fonte" in resposta["erro"] and resposta["id"] == 7
+    assert servidor.erros == 2
+    print("✓ test_servidor_rejeita_campos_que_nao_sao_texto passou")
+
+
+def test_servidor_pedidos_invalidos_e_excecoes():
+    """Testa ops desconhecidas ou não hasheáveis e exceções inesperadas por pedido"""
+    servidor = ServidorCompilacao("nao-usado.sock")
+    assert not servidor.processar(b'{"op": ["x"]}')["ok"]
+    for i in range(50):
+        assert not servidor.processar(f'{{"op": "op{i}"}}'.encode())["ok"]
+    assert servidor.pedidos == {"invalido": 51}
+    assert set(servidor.latencias) == {"invalido"}
+
+    aninhado = "function main() { let x: number; x = " + "(" * 300 + "1" + ")" * 300 + "; }"
+    resposta = servidor.processar(json.dumps({"fonte": aninhado, "id": 1}).encode())
+    assert not resposta["ok"] and resposta["id"] == 1
+    assert servidor.processar(b'{"op": "ping"}')["ok"]
+    print("✓ test_servidor_pedidos_invalidos_e_excecoes passou")
+
+
+def test_servidor_linha_maior_que_o_limite(monkeypatch):
+    """Testa que um pedido maior que o limite recebe erro e a conexão continua"""
+    monkeypatch.setattr(ServidorCompilacao, "LIMITE_PEDIDO", 1024)
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_socket = os.path.join(diretorio, "mc.sock")
+        servidor, thread = _iniciar_servidor(caminho_socket)
+
+        with ClienteCompilacao(caminho_socket) as cliente:
+            resposta = cliente.compilar_fonte("function main() { let x: number; }" * 300)
+            assert not resposta["ok"] and "1024" in resposta["erro"]
+            assert cliente.pedir({"op": "ping"})["ok"]
+            cliente.encerrar_servidor()
+        thread.join(5)
+        assert not thread.is_alive()
+    print("✓ test_servidor_linha_maior_que_o_limite passou")
@@ -0,0 +1,133 @@
+"""
+Test Suite - Testes para o índice de similaridade por impressões digitais
+"""
+
+import sys
+import os
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.similaridade import IndiceSimilaridade, impressoes
+
+ORIGINAL = """function main() {
+    let n: number;
+    let i: number;
+    let soma: number;
+    read(n);
+    while (i < n) {
+        if (i % 2 == 0) {
+            soma = soma + i * 3;
+        } else {
+            soma = soma - 1;
+        }
+        i = i + 1;
+    }
+    console.log(soma);
+}
+"""
+
+# Mesma estrutura: nomes, literais e espaçamento trocados
+COPIA = """function main() { let total: number; let k: number; let acc: number;
+read(total); while (k < total) { if (k % 7 == 1) { acc = acc + k * 9; }
+else { acc = acc - 5; } k = k + 2; } console.log(acc); }
+"""
+
+OUTRO = """function mostra(x: float) {
+    console.log(x);
+}
+function main() {
+    let a: float;
+    read(a);
+    mostra(a / 2.0);
+    console.log("fim");
+}
+"""
+
+
+def escrever(diretorio, nome, codigo):
+    caminho = diretorio / nome
+    caminho.write_text(codigo, encoding='utf-8')
+    return str(caminho)
+
+
+def test_impressoes_ignoram_nomes_e_literais():
+    """Testa que renomear, trocar literais e reformatar não muda as impressões"""
+    assert impressoes(ORIGINAL) == impressoes(COPIA)
+    assert impressoes(ORIGINAL) and not impressoes(ORIGINAL) & impressoes(OUTRO)
+    assert impressoes("") == set()
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_consulta_encontra_a_copia(tmp_path, processos):
+    """Testa a construção (serial e paralela) e a consulta top-K"""
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    original = escrever(corpus, "original.mc", ORIGINAL)
+    escrever(corpus, "copia.mc", COPIA)
+    escrever(corpus, "outro.mc", OUTRO)
+    escrever(corpus, "invalido.mc", "function main() { x = 1 @ 2; }")
+
+    with IndiceSimilaridade(str(tmp_path / "indice.db")) as indice:
+        resumo = indice.adicionar(str(corpus), processos=processos)
+        assert (resumo["novos"], resumo["falhas"], len(indice)) == (3, 1, 3)
+        similares = indice.consultar_arquivo(original, top=5)
+
+    assert [os.path.basename(r["arquivo"]) for r in similares] == ["copia.mc"]
+    assert similares[0]["similaridade"] == 1.0 and similares[0]["contencao"] == 1.0
+
+
+def test_insercao_incremental(tmp_path):
+    """Testa que só arquivos novos ou alterados são reprocessados"""
+    banco = str(tmp_path / "indice.db")
+    primeiro = escrever(tmp_path, "a.mc", ORIGINAL)
+    with IndiceSimilaridade(banco, k=5, janela=4) as indice:
+        assert indice.adicionar([primeiro], processos=1)["novos"] == 1
+
+    segundo = escrever(tmp_path, "b.mc", OUTRO)
+    with IndiceSimilaridade(banco) as indice:
+        # Os parâmetros gravados no índice prevalecem sobre os padrões
+        assert (indice.k, indice.janela) == (5, 4)
+        resumo = indice.adicionar([primeiro, segundo], processos=1)
+        assert (resumo["novos"], resumo["inalterados"]) == (1, 1)
+        assert indice.consultar(OUTRO, top=1)[0]["arquivo"] == segundo
+
+        escrever(tmp_path, "b.mc", COPIA + "\n")
+        resumo = indice.adicionar([primeiro, segundo], processos=1)
+        assert (resumo["atualizados"], resumo["inalterados"]) == (1, 1)
+        assert all(r["similaridade"] < 0.5 for r in indice.consultar(OUTRO))
+        similares = indice.consultar(ORIGINAL)
+        assert {r["arquivo"] for r in similares} == {primeiro, segundo}
+        assert all(r["similaridade"] == 1.0 for r in similares)
+
+
+def test_codigos_fixos_e_caminhos_relativos(tmp_path, monkeypatch):
+    """Testa a tabela fixa de códigos e a exclusão do próprio arquivo por caminho relativo"""
+    from src.similaridade import CODIGOS
+    from src.token_types import TokenType
+    tipos = {valor for nome, valor in vars(TokenType).items() if not nome.startswith('_')}
+    assert set(CODIGOS) == tipos
+    assert sorted(CODIGOS.values()) == list(range(1, len(CODIGOS) + 1))
+    # Códigos gravados em índices existentes não podem mudar
+    assert (CODIGOS[TokenType.ID], CODIGOS[TokenType.WHILE]) == (16, 39)
+
+    monkeypatch.chdir(tmp_path)
+    escrever(tmp_path, "a.mc", ORIGINAL)
+    escrever(tmp_path, "b.mc", COPIA)
+    with IndiceSimilaridade("indice.db") as indice:
+        assert indice.adicionar(["./a.mc", "b.mc"], processos=1)["novos"] == 2
+        assert indice.adicionar(["a.mc"], processos=1)["inalterados"] == 1
+        similares = indice.consultar_arquivo("a.mc")
+    assert [os.path.basename(r["arquivo"]) for r in similares] == ["b.mc"]
+    print("✓ test_codigos_fixos_e_caminhos_relativos passou")
+
+
+def test_similar_sem_arquivos_e_erro_de_uso(tmp_path):
+    """Testa que --similar sem arquivos para consultar termina com erro de uso"""
+    import subprocess
+    main = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    resultado = subprocess.run([sys.executable, main, "--index", str(tmp_path / "i.db"),
+                                "--similar"], capture_output=True, text=True)
+    assert resultado.returncode == 2 and "--similar" in resultado.stderr